@@ -50,6 +50,26 @@ def unit_tests(session: nox.Session):
     session.run("pytest", "-vvv", "--cov=src/boto3_assume", "--cov-report", "term-missing", "tests/unit")
 
 
+@nox.session(
+    name="benchmarks",
+    python=False,
+    venv_backend="none"
+)
+def benchmarks(session: nox.Session):
+    """Run the benchmarks in the current venv and save the results to ./.benchmarks, comparing against the last saved run.
+
+    Extra arguments are passed to pytest, ie fail on a regression with ``nox -s benchmarks -- --benchmark-compare-fail=mean:10%``
+    """
+    session.run(
+        "pytest",
+        "tests/benchmarks",
+        "--benchmark-autosave",
+        "--benchmark-compare",
+        "--benchmark-sort=name",
+        *session.posargs
+    )
+
+
 @nox.session(name="dev-venv")
 def dev_venv_setup(session: nox.Session):
     session.install("-U", "pip", "build")
@@ -22,16 +22,114 @@ __version__ = "0.2.1"
 __all__ = [
     "assume_role_session",
     "assume_role",
+    "assume_role_chain",
+    "assume_roles",
+    "assume_role_with_saml",
+    "assume_role_with_web_identity",
+    "AssumeRoleSessionManager",
+    "BackgroundRefresher",
+    "BaseCredentialCache",
+    "broker_session",
+    "CachedClientSession",
+    "ContainerCredentialsServer",
+    "CredentialBroker",
+    "CredentialCache",
+    "FileCredentialCache",
+    "InMemoryRefreshMetrics",
+    "RefreshMetrics",
+    "ResiliencePolicy",
+    "RoleConfig",
+    "RoleConfigProvider",
+    "StatsDRefreshMetrics",
+    "STSRateLimiter",
+    "STSClientPool",
+    "STSEndpointSelector",
+    "warm",
+    "warm_sessions",
     "Boto3AssumeError",
+    "CredentialBrokerError",
     "ForbiddenKWArgError",
-    "MissingKWArgError"
+    "MissingKWArgError",
+    "RefreshCircuitOpenError",
+    "RefreshWindowError",
+    "RoleConfigError"
 ]
 
-from boto3_assume.core import assume_role_session, assume_role
-from boto3_assume.exceptions import Boto3AssumeError, ForbiddenKWArgError, MissingKWArgError
+from importlib import import_module
+from importlib.util import find_spec
+from typing import Any, TYPE_CHECKING
 
-try:
-    from boto3_assume.aio_core import assume_role_aio_session
-    __all__.append("assume_role_aio_session")
-except ModuleNotFoundError as error: # pragma: no cover
-    pass
+from boto3_assume.exceptions import Boto3AssumeError, CredentialBrokerError, ForbiddenKWArgError, MissingKWArgError, RefreshCircuitOpenError, RefreshWindowError, RoleConfigError
+
+# public names and the modules they are imported from on first use,
+# so importing the package does not import boto3, botocore or aioboto3
+_LAZY_IMPORTS = {
+    "assume_role_session": "boto3_assume.core",
+    "assume_role": "boto3_assume.core",
+    "assume_role_chain": "boto3_assume.core",
+    "assume_roles": "boto3_assume.core",
+    "assume_role_with_saml": "boto3_assume.core",
+    "assume_role_with_web_identity": "boto3_assume.core",
+    "AssumeRoleSessionManager": "boto3_assume.session_manager",
+    "BackgroundRefresher": "boto3_assume.background_refresh",
+    "BaseCredentialCache": "boto3_assume.credential_cache",
+    "broker_session": "boto3_assume.broker",
+    "CachedClientSession": "boto3_assume.cached_session",
+    "ContainerCredentialsServer": "boto3_assume.container_credentials",
+    "CredentialBroker": "boto3_assume.broker",
+    "CredentialCache": "boto3_assume.credential_cache",
+    "FileCredentialCache": "boto3_assume.credential_cache",
+    "InMemoryRefreshMetrics": "boto3_assume.metrics",
+    "RefreshMetrics": "boto3_assume.metrics",
+    "ResiliencePolicy": "boto3_assume.resilience",
+    "RoleConfig": "boto3_assume.role_config",
+    "RoleConfigProvider": "boto3_assume.role_config",
+    "StatsDRefreshMetrics": "boto3_assume.metrics",
+    "STSRateLimiter": "boto3_assume.rate_limiter",
+    "STSClientPool": "boto3_assume.sts_client_pool",
+    "STSEndpointSelector": "boto3_assume.sts_endpoints",
+    "warm": "boto3_assume.core",
+    "warm_sessions": "boto3_assume.core"
+}
+_AIO_LAZY_IMPORTS = {
+    "AIOAssumeRoleResult": "boto3_assume.aio_core",
+    "AIOAssumeSession": "boto3_assume.aio_core",
+    "assume_role_aio_session": "boto3_assume.aio_core",
+    "assume_role_async": "boto3_assume.aio_core",
+    "assume_roles_async": "boto3_assume.aio_core"
+}
+if find_spec("aioboto3") is not None:
+    _LAZY_IMPORTS.update(_AIO_LAZY_IMPORTS)
+    __all__.extend(_AIO_LAZY_IMPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(_LAZY_IMPORTS[name]), name)
+    # cache it so later lookups skip __getattr__
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING: # pragma: no cover
+    from boto3_assume.aio_core import AIOAssumeRoleResult, AIOAssumeSession, assume_role_aio_session, assume_role_async, assume_roles_async
+    from boto3_assume.background_refresh import BackgroundRefresher
+    from boto3_assume.broker import broker_session, CredentialBroker
+    from boto3_assume.cached_session import CachedClientSession
+    from boto3_assume.container_credentials import ContainerCredentialsServer
+    from boto3_assume.core import assume_role_session, assume_role, assume_role_chain, assume_roles, assume_role_with_saml, assume_role_with_web_identity, warm, warm_sessions
+    from boto3_assume.credential_cache import BaseCredentialCache, CredentialCache, FileCredentialCache
+    from boto3_assume.metrics import InMemoryRefreshMetrics, RefreshMetrics, StatsDRefreshMetrics
+    from boto3_assume.rate_limiter import STSRateLimiter
+    from boto3_assume.resilience import ResiliencePolicy
+    from boto3_assume.role_config import RoleConfig, RoleConfigProvider
+    from boto3_assume.session_manager import AssumeRoleSessionManager
+    from boto3_assume.sts_client_pool import STSClientPool
+    from boto3_assume.sts_endpoints import STSEndpointSelector
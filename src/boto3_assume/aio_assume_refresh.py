@@ -1,34 +1,187 @@
 
 
-from typing import Any, Dict
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 import aioboto3
+from aiobotocore.credentials import AioDeferredRefreshableCredentials
 
-from boto3_assume.assume_refresh import AssumeRefresh
+from boto3_assume.assume_refresh import _RefreshWindows, AssumeRefresh
+from boto3_assume.metrics import _error_code, RefreshMetrics
+from boto3_assume.rate_limiter import STSRateLimiter
+
+
+class _AIOSTSClientHolder:
+    """Long lived ``aioboto3`` STS client shared by one or more ``AIOAssumeRefresh`` instances.
+
+    The client context is entered on first use and exited when the last user releases it.
+    """
+
+    def __init__(
+        self,
+        source_session: aioboto3.Session,
+        sts_client_kwargs: Dict[str, Any]
+    ):
+        self._source_session = source_session
+        self._sts_client_kwargs = sts_client_kwargs
+        self._sts_client_context = None
+        self._sts_client = None
+        self._references = 0
+        self._lock = asyncio.Lock()
+
+
+    def acquire(self) -> None:
+        self._references += 1
+
+
+    async def get(self):
+        async with self._lock:
+            if self._sts_client is None:
+                sts_client_context = self._source_session.client("sts", **self._sts_client_kwargs)
+                self._sts_client = await sts_client_context.__aenter__()
+                self._sts_client_context = sts_client_context
+
+            return self._sts_client
+
+
+    async def release(self) -> None:
+        async with self._lock:
+            self._references -= 1
+            if self._references > 0 or self._sts_client_context is None:
+                return
+
+            await self._sts_client_context.__aexit__(None, None, None)
+            self._sts_client_context = None
+            self._sts_client = None
 
 
 class AIOAssumeRefresh(AssumeRefresh):
 
     def __init__(
-        self, 
+        self,
         source_session: aioboto3.Session,
         sts_client_kwargs: Dict[str, Any],
-        assume_role_kwargs: Dict[str, Any]
+        assume_role_kwargs: Dict[str, Any],
+        reuse_sts_client: bool = False,
+        sts_client_holder: Optional[_AIOSTSClientHolder] = None,
+        metrics: Optional[RefreshMetrics] = None,
+        sts_rate_limiter: Optional[STSRateLimiter] = None
     ):
         self._source_session = source_session
         self._sts_client_kwargs = sts_client_kwargs
         self._assume_role_kwargs = assume_role_kwargs
+        self._metrics = metrics
+        self._sts_rate_limiter = sts_rate_limiter
+        self._expiry_time = None
+        self._access_key = None
+        self._sts_client_holder = None
+        if reuse_sts_client:
+            if sts_client_holder is None:
+                sts_client_holder = _AIOSTSClientHolder(
+                    source_session=source_session,
+                    sts_client_kwargs=sts_client_kwargs
+                )
 
+            sts_client_holder.acquire()
+            self._sts_client_holder = sts_client_holder
+
+
+    async def aclose(self) -> None:
+        """Release the long lived STS client, it is closed once no other refreshers share it.
+        """
+        sts_client_holder = self._sts_client_holder
+        self._sts_client_holder = None
+        if sts_client_holder is not None:
+            await sts_client_holder.release()
+
+
+    def _format_credentials(self, creds: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'access_key': creds['AccessKeyId'],
+            'secret_key': creds['SecretAccessKey'],
+            'token': creds['SessionToken'],
+            'expiry_time': self._serialize_if_needed(creds['Expiration']),
+        }
+
+
+    async def _call_sts(self) -> Dict[str, Any]:
+        if self._sts_client_holder is not None:
+            # keep the client open between refreshes so connections are reused, it is released in aclose()
+            sts_client = await self._sts_client_holder.get()
+            response = await sts_client.assume_role(**self._assume_role_kwargs)
+            return self._format_credentials(response['Credentials'])
 
-    async def refresh(self) -> Dict[str, Any]:
         # since this always needs to be a context manager we have to create the client every time
         async with self._source_session.client("sts", **self._sts_client_kwargs) as sts_client:
             response = await sts_client.assume_role(**self._assume_role_kwargs)
-            creds = response['Credentials']
-            return {
-                'access_key': creds['AccessKeyId'],
-                'secret_key': creds['SecretAccessKey'],
-                'token': creds['SessionToken'],
-                'expiry_time': self._serialize_if_needed(creds['Expiration']),
-            }
+            return self._format_credentials(response['Credentials'])
+
+
+    async def _wait_for_rate_limiter(self) -> None:
+        queue_depth = self._sts_rate_limiter.queue_depth
+        wait = await self._sts_rate_limiter.acquire_async(time_to_expiry=self._time_to_expiry())
+        if self._metrics is not None:
+            self._metrics.on_rate_limit(role_arn=self._assume_role_kwargs["RoleArn"], wait=wait, queue_depth=queue_depth)
+
+
+    async def refresh(self) -> Dict[str, Any]:
+        if self._metrics is not None:
+            self._record_refresh()
+
+        if self._sts_rate_limiter is not None:
+            await self._wait_for_rate_limiter()
+
+        if self._metrics is None:
+            return self._record_credentials(await self._call_sts())
+
+        start = time.perf_counter()
+        try:
+            credentials = await self._call_sts()
+        except Exception as error:
+            self._metrics.on_sts_call(
+                role_arn=self._assume_role_kwargs["RoleArn"],
+                latency=time.perf_counter() - start,
+                error_code=_error_code(error)
+            )
+            raise
+
+        self._metrics.on_sts_call(
+            role_arn=self._assume_role_kwargs["RoleArn"],
+            latency=time.perf_counter() - start,
+            error_code=None
+        )
+
+        return self._record_credentials(credentials)
+
+
+class AIOAssumeRoleCredentials(_RefreshWindows, AioDeferredRefreshableCredentials):
+    """Async deferred refreshable credentials with configurable and adaptive refresh windows.
+    """
+
+    def __init__(
+        self,
+        refresh_using: Callable[[], Awaitable[Dict[str, Any]]],
+        method: str,
+        advisory_refresh_timeout: Optional[float] = None,
+        mandatory_refresh_timeout: Optional[float] = None,
+        adaptive_refresh: bool = False
+    ):
+        super().__init__(refresh_using=refresh_using, method=method)
+        self._configure_refresh_windows(
+            advisory_refresh_timeout=advisory_refresh_timeout,
+            mandatory_refresh_timeout=mandatory_refresh_timeout,
+            adaptive_refresh=adaptive_refresh
+        )
+
+
+    async def _protected_refresh(self, is_mandatory: bool) -> None:
+        if not self._adaptive_refresh:
+            return await super()._protected_refresh(is_mandatory)
 
+        expiry_time = self._expiry_time
+        start = time.perf_counter()
+        await super()._protected_refresh(is_mandatory)
+        # failed advisory refreshes are swallowed, only adapt to new credentials
+        if self._expiry_time != expiry_time:
+            self._adapt_refresh_windows(time.perf_counter() - start)
@@ -1,11 +1,15 @@
 
-from typing import Any, Dict, Optional
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
 import warnings
 
 import aioboto3
 from aiobotocore.credentials import AioDeferredRefreshableCredentials
 
-from boto3_assume.aio_assume_refresh import AIOAssumeRefresh
+from boto3_assume.aio_assume_refresh import AIOAssumeRefresh, AIOAssumeRoleCredentials, _AIOSTSClientHolder
+from boto3_assume.core import _validate_kwargs
+from boto3_assume.metrics import RefreshMetrics
+from boto3_assume.rate_limiter import STSRateLimiter
 
 
 def assume_role_aio_session(
@@ -15,7 +19,7 @@ def assume_role_aio_session(
     sts_client_kwargs: Optional[Dict[str, Any]] = None,
     assume_role_kwargs: Optional[Dict[str, Any]] = None
 ) -> aioboto3.Session:
-    """**DEPRECATED** - Please see the [``aioboto3-assume``](https://github.com/btemplep/aioboto3-assume) package. 
+    """**DEPRECATED** - Please see the new ``assume_role_async`` function. 
     
     Generate an assume role ``aioboto3`` session, that will automatically refresh credentials.
 
@@ -38,7 +42,7 @@ def assume_role_aio_session(
         The assumed role session.
     """
     warnings.warn(
-        "The `assume_role_aio_session` function is deprecated and will be removed. Please see the [`aioboto3-assume`](https://github.com/btemplep/aioboto3-assume) package.",
+        "The `assume_role_aio_session` function is deprecated and will be removed. Please use the `assume_role_async` function.",
         category=DeprecationWarning,
         stacklevel=2
     )
@@ -61,3 +65,300 @@ def assume_role_aio_session(
     )
     
     return assume_sess
+
+
+class AIOAssumeSession(aioboto3.Session):
+    """``aioboto3`` session with automatically refreshing assume role credentials and a long lived STS client.
+
+    Close the STS client with ``aclose()`` or by using the session as an async context manager.
+    """
+
+    def __init__(
+        self,
+        assume_refresh: AIOAssumeRefresh,
+        advisory_refresh_timeout: Optional[float] = None,
+        mandatory_refresh_timeout: Optional[float] = None,
+        adaptive_refresh: bool = False,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self._assume_refresh = assume_refresh
+        self._session._credentials = AIOAssumeRoleCredentials(
+            refresh_using=assume_refresh.refresh,
+            method="sts-assume-role",
+            advisory_refresh_timeout=advisory_refresh_timeout,
+            mandatory_refresh_timeout=mandatory_refresh_timeout,
+            adaptive_refresh=adaptive_refresh
+        )
+
+
+    async def __aenter__(self) -> "AIOAssumeSession":
+        return self
+
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+
+    async def aclose(self) -> None:
+        """Close the STS client used to refresh credentials.
+
+        Clients already created from this session are not closed.
+        """
+        await self._assume_refresh.aclose()
+
+
+def assume_role_async(
+    source_session: aioboto3.Session,
+    assume_role_kwargs: Dict[str, Any],
+    sts_client_kwargs: Dict[str, Any] = None,
+    target_session_kwargs: Dict[str, Any] = None,
+    metrics: Optional[RefreshMetrics] = None,
+    advisory_refresh_timeout: Optional[float] = None,
+    mandatory_refresh_timeout: Optional[float] = None,
+    adaptive_refresh: bool = False,
+    sts_rate_limiter: Optional[STSRateLimiter] = None
+) -> AIOAssumeSession:
+    """Generate an assume role ``aioboto3`` session, that will automatically refresh credentials.
+
+    Unlike ``assume_role_aio_session``, the STS client is created on the first refresh and kept open,
+    so refreshes reuse the same connections. 
+    Close it with ``await assume_session.aclose()`` or by using the session with ``async with``.
+
+    Parameters
+    ----------
+    source_session : aioboto3.Session
+        Source session to assume the role from. Must be a session that will automatically refresh its own credentials.
+    assume_role_kwargs : Dict[str, Any]
+        Keyword arguments to pass when calling `assume_role <https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sts/client/assume_role.html>`_. with an STS client.
+        Must at least provide ``RoleArn`` and ``RoleSessionName`` as outlined in the boto3 docs.
+    sts_client_kwargs : Dict[str, Any], default=None
+        Kwargs to pass when creating the STS client.
+        Note that you should not pass in the ``service_name`` or credentials here. 
+    target_session_kwargs : Dict[str, Any], default=None
+        Keyword arguments to pass when creating a the new target ``aioboto3`` session.
+        Note that you should only pass in `region_name` or `aws_account_id` or other variables that will not effect credentials or credential refreshing. 
+    metrics : Optional[RefreshMetrics], default=None
+        Receives an event for every refresh and STS call, see ``assume_role``.
+    advisory_refresh_timeout : Optional[float], default=None
+        Seconds before expiry to start refreshing credentials in the background of API calls, see ``assume_role``.
+    mandatory_refresh_timeout : Optional[float], default=None
+        Seconds before expiry that API calls wait for refreshed credentials, see ``assume_role``.
+    adaptive_refresh : bool, default=False
+        Adapt the refresh windows to the credential lifetime and STS latency, see ``assume_role``.
+    sts_rate_limiter : Optional[STSRateLimiter], default=None
+        Limiter that every STS call waits on, share one between sync and async sessions to rate limit the whole process, see ``assume_role``.
+
+    Returns
+    -------
+    AIOAssumeSession
+        The assumed role session with automatic credential refreshing.
+
+    Raises
+    ------
+    ForbiddenKWArgError
+        One of the kwargs function parameters includes a keyword argument that is not allowed for boto3-assume.
+    MissingKWArgError
+        One of the kwargs function parameters is missing a necessary keyword argument.
+    RefreshWindowError
+        ``mandatory_refresh_timeout`` is not less than ``advisory_refresh_timeout``.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import aioboto3
+        from boto3_assume import assume_role_async
+
+        async with assume_role_async(
+            source_session=aioboto3.Session(),
+            assume_role_kwargs={
+                "RoleArn": "arn:aws:iam::123412341234:role/my_role",
+                "RoleSessionName": "my-role-session"
+            }
+        ) as assume_session:
+            async with assume_session.client("sts") as sts_client:
+                print(await sts_client.get_caller_identity())
+    """
+    sts_client_kwargs, target_session_kwargs = _validate_kwargs(
+        assume_role_kwargs=assume_role_kwargs,
+        sts_client_kwargs=sts_client_kwargs,
+        target_session_kwargs=target_session_kwargs
+    )
+
+    return AIOAssumeSession(
+        assume_refresh=AIOAssumeRefresh(
+            source_session=source_session,
+            sts_client_kwargs=sts_client_kwargs,
+            assume_role_kwargs=assume_role_kwargs,
+            reuse_sts_client=True,
+            metrics=metrics,
+            sts_rate_limiter=sts_rate_limiter
+        ),
+        advisory_refresh_timeout=advisory_refresh_timeout,
+        mandatory_refresh_timeout=mandatory_refresh_timeout,
+        adaptive_refresh=adaptive_refresh,
+        **target_session_kwargs
+    )
+
+
+class AIOAssumeRoleResult(NamedTuple):
+    """Result of assuming one role with ``assume_roles_async``.
+    """
+    assume_role_kwargs: Dict[str, Any]
+    """The ``assume_role_kwargs`` for this role."""
+    session: Optional[AIOAssumeSession]
+    """The assumed role session, or ``None`` if the credentials could not be fetched."""
+    error: Optional[Exception]
+    """The error from fetching credentials, or ``None`` on success."""
+
+
+async def _fetch_result(
+    assume_role_kwargs: Dict[str, Any],
+    assume_sess: AIOAssumeSession,
+    semaphore: asyncio.Semaphore
+) -> AIOAssumeRoleResult:
+    async with semaphore:
+        try:
+            creds = await assume_sess.get_credentials()
+            await creds.get_frozen_credentials()
+        except Exception as error:
+            await assume_sess.aclose()
+            return AIOAssumeRoleResult(assume_role_kwargs=assume_role_kwargs, session=None, error=error)
+
+    return AIOAssumeRoleResult(assume_role_kwargs=assume_role_kwargs, session=assume_sess, error=None)
+
+
+async def assume_roles_async(
+    source_session: aioboto3.Session,
+    assume_role_kwargs_list: List[Dict[str, Any]],
+    sts_client_kwargs: Dict[str, Any] = None,
+    target_session_kwargs: Dict[str, Any] = None,
+    max_concurrency: int = 10,
+    metrics: Optional[RefreshMetrics] = None,
+    advisory_refresh_timeout: Optional[float] = None,
+    mandatory_refresh_timeout: Optional[float] = None,
+    adaptive_refresh: bool = False,
+    sts_rate_limiter: Optional[STSRateLimiter] = None
+) -> AsyncIterator[AIOAssumeRoleResult]:
+    """Assume many roles concurrently, yielding each result as soon as its credentials are fetched.
+
+    All of the sessions share one long lived STS client, which is closed once every returned session has been closed with ``aclose()``.
+    Sessions that failed are closed before their result is yielded.
+
+    Parameters
+    ----------
+    source_session : aioboto3.Session
+        Source session to assume the roles from. Must be a session that will automatically refresh its own credentials.
+    assume_role_kwargs_list : List[Dict[str, Any]]
+        ``assume_role_kwargs`` for each role to assume, see ``assume_role_async``.
+    sts_client_kwargs : Dict[str, Any], default=None
+        Kwargs to pass when creating the shared STS client, see ``assume_role_async``.
+    target_session_kwargs : Dict[str, Any], default=None
+        Keyword arguments to pass when creating each target session, see ``assume_role_async``.
+    max_concurrency : int, default=10
+        Maximum number of ``assume_role`` calls in flight at the same time.
+    metrics : Optional[RefreshMetrics], default=None
+        Receives refresh events for every session, see ``assume_role_async``.
+    advisory_refresh_timeout : Optional[float], default=None
+        Seconds before expiry to start refreshing credentials in the background of API calls, see ``assume_role_async``.
+    mandatory_refresh_timeout : Optional[float], default=None
+        Seconds before expiry that API calls wait for refreshed credentials, see ``assume_role_async``.
+    adaptive_refresh : bool, default=False
+        Adapt the refresh windows to the credential lifetime and STS latency, see ``assume_role_async``.
+    sts_rate_limiter : Optional[STSRateLimiter], default=None
+        Limiter that every STS call waits on, see ``assume_role``.
+
+    Yields
+    ------
+    AIOAssumeRoleResult
+        The session or error for each role, in the order they complete.
+
+    Raises
+    ------
+    ForbiddenKWArgError
+        One of the kwargs function parameters includes a keyword argument that is not allowed for boto3-assume.
+    MissingKWArgError
+        One of the kwargs function parameters is missing a necessary keyword argument.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import aioboto3
+        from boto3_assume import assume_roles_async
+
+        async for result in assume_roles_async(
+            source_session=aioboto3.Session(),
+            assume_role_kwargs_list=[
+                {
+                    "RoleArn": f"arn:aws:iam::{account_id}:role/my_role",
+                    "RoleSessionName": "my-role-session"
+                }
+                for account_id in account_ids
+            ],
+            max_concurrency=50
+        ):
+            if result.error is not None:
+                print(f"Failed to assume {result.assume_role_kwargs['RoleArn']}: {result.error}")
+                continue
+
+            async with result.session as assume_session:
+                ...
+    """
+    if not assume_role_kwargs_list:
+        return
+
+    for assume_role_kwargs in assume_role_kwargs_list:
+        validated_sts_client_kwargs, validated_target_session_kwargs = _validate_kwargs(
+            assume_role_kwargs=assume_role_kwargs,
+            sts_client_kwargs=sts_client_kwargs,
+            target_session_kwargs=target_session_kwargs
+        )
+
+    sts_client_holder = _AIOSTSClientHolder(
+        source_session=source_session,
+        sts_client_kwargs=validated_sts_client_kwargs
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = []
+    unclaimed_sessions = {}
+    for assume_role_kwargs in assume_role_kwargs_list:
+        assume_sess = AIOAssumeSession(
+            assume_refresh=AIOAssumeRefresh(
+                source_session=source_session,
+                sts_client_kwargs=validated_sts_client_kwargs,
+                assume_role_kwargs=assume_role_kwargs,
+                reuse_sts_client=True,
+                sts_client_holder=sts_client_holder,
+                metrics=metrics,
+                sts_rate_limiter=sts_rate_limiter
+            ),
+            advisory_refresh_timeout=advisory_refresh_timeout,
+            mandatory_refresh_timeout=mandatory_refresh_timeout,
+            adaptive_refresh=adaptive_refresh,
+            **validated_target_session_kwargs
+        )
+        unclaimed_sessions[id(assume_sess)] = assume_sess
+        tasks.append(
+            asyncio.ensure_future(
+                _fetch_result(
+                    assume_role_kwargs=assume_role_kwargs,
+                    assume_sess=assume_sess,
+                    semaphore=semaphore
+                )
+            )
+        )
+
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            unclaimed_sessions.pop(id(result.session), None)
+            yield result
+    finally:
+        # the caller stopped early, so close the sessions it will never see
+        for task in tasks:
+            task.cancel()
+
+        for assume_sess in unclaimed_sessions.values():
+            await assume_sess.aclose()
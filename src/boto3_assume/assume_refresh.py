@@ -1,24 +1,141 @@
 
 
 import datetime
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import weakref
 
 import boto3
+from botocore.credentials import DeferredRefreshableCredentials
+from botocore.utils import parse_timestamp
+
+from boto3_assume.credential_cache import _utc_now, BaseCredentialCache, credential_cache_key
+from boto3_assume.exceptions import RefreshCircuitOpenError, RefreshWindowError
+from boto3_assume.metrics import _error_code, RefreshMetrics
+from boto3_assume.rate_limiter import STSRateLimiter
+from boto3_assume.resilience import _CircuitBreaker, ResiliencePolicy
+from boto3_assume.single_flight import SingleFlight
+from boto3_assume.sts_client_pool import STSClientPool
+from boto3_assume.sts_endpoints import _should_fail_over, STSEndpointSelector
+from boto3_assume.utils import register_fork_reset
+
+
+# refreshes for the same role key from any session in the process share one STS call
+_single_flight = SingleFlight()
 
 
 class AssumeRefresh:
 
+    # STS client method called for every refresh, subclasses use the other assume role operations
+    _STS_OPERATION = "assume_role"
+
     def __init__(
-        self, 
+        self,
         source_session: boto3.Session,
         sts_client_kwargs: Dict[str, Any],
-        assume_role_kwargs: Dict[str, Any]
+        assume_role_kwargs: Dict[str, Any],
+        credential_cache: Optional[BaseCredentialCache] = None,
+        sts_client_pool: Optional[STSClientPool] = None,
+        metrics: Optional[RefreshMetrics] = None,
+        sts_regions: Optional[List[str]] = None,
+        sts_endpoint_selector: Optional[STSEndpointSelector] = None,
+        sts_rate_limiter: Optional[STSRateLimiter] = None
     ):
         self._source_session = source_session
         self._sts_client_kwargs = sts_client_kwargs
         self._assume_role_kwargs = assume_role_kwargs
-        self._sts_client = self._source_session.client("sts", **self._sts_client_kwargs)
-    
+        self._credential_cache = credential_cache
+        self._sts_client_pool = sts_client_pool
+        self._metrics = metrics
+        self._expiry_time: Optional[datetime.datetime] = None
+        self._access_key: Optional[str] = None
+        # set by the credentials this refreshes, their refresh windows decide which cached credentials are fresh enough
+        self._credentials: Optional["weakref.ref[AssumeRoleCredentials]"] = None
+        self._sts_client_instance = None
+        self._sts_client_lock = threading.Lock()
+        self._sts_client_release = None
+        self._sts_regions = sts_regions
+        self._sts_endpoint_selector = sts_endpoint_selector
+        self._sts_rate_limiter = sts_rate_limiter
+        self._regional_sts_clients: Dict[str, Any] = {}
+        self._regional_sts_client_releases: List[weakref.finalize] = []
+        register_fork_reset(self._reset_sts_client)
+
+
+    def _reset_sts_client(self) -> None:
+        # botocore clients and their connection pools are not fork safe, so a forked child creates its own client on the next refresh
+        for release in [self._sts_client_release, *self._regional_sts_client_releases]:
+            if release is not None:
+                release.detach()
+
+        self._sts_client_release = None
+        self._sts_client_instance = None
+        self._regional_sts_clients = {}
+        self._regional_sts_client_releases = []
+        self._sts_client_lock = threading.Lock()
+
+
+    def _create_sts_client(self, sts_client_kwargs: Dict[str, Any]):
+        if self._sts_client_pool is None:
+            return self._source_session.client("sts", **sts_client_kwargs), None
+
+        key, sts_client = self._sts_client_pool.acquire(
+            source_session=self._source_session,
+            sts_client_kwargs=sts_client_kwargs
+        )
+
+        return sts_client, weakref.finalize(self, self._sts_client_pool.release, key)
+
+
+    @property
+    def _sts_client(self):
+        # creating a client is expensive, so wait until the first refresh and then reuse it
+        if self._sts_client_instance is None:
+            with self._sts_client_lock:
+                if self._sts_client_instance is None:
+                    self._sts_client_instance, self._sts_client_release = self._create_sts_client(self._sts_client_kwargs)
+
+        return self._sts_client_instance
+
+
+    def _regional_sts_client(self, region: str):
+        sts_client = self._regional_sts_clients.get(region)
+        if sts_client is None:
+            with self._sts_client_lock:
+                if region not in self._regional_sts_clients:
+                    sts_client, release = self._create_sts_client(
+                        self._sts_endpoint_selector.client_kwargs(region=region, sts_client_kwargs=self._sts_client_kwargs)
+                    )
+                    if release is not None:
+                        self._regional_sts_client_releases.append(release)
+
+                    self._regional_sts_clients[region] = sts_client
+
+                sts_client = self._regional_sts_clients[region]
+
+        return sts_client
+
+
+    def _assume_role_regional(self) -> Dict[str, Any]:
+        error = None
+        for region in self._sts_endpoint_selector.order(self._sts_regions):
+            start = time.perf_counter()
+            try:
+                response = getattr(self._regional_sts_client(region), self._STS_OPERATION)(**self._sts_call_kwargs())
+            except Exception as region_error:
+                if not _should_fail_over(region_error):
+                    raise
+
+                self._sts_endpoint_selector.record_failure(region)
+                error = region_error
+                continue
+
+            self._sts_endpoint_selector.record_success(region=region, latency=time.perf_counter() - start)
+            return response
+
+        raise error
+
 
     def _serialize_if_needed(self, value):
         if isinstance(value, datetime.datetime):
@@ -27,8 +144,15 @@ class AssumeRefresh:
         return value
 
 
-    def refresh(self) -> Dict[str, Any]:
-        creds = self._sts_client.assume_role(**self._assume_role_kwargs)['Credentials']
+    def _sts_call_kwargs(self) -> Dict[str, Any]:
+        return self._assume_role_kwargs
+
+
+    def _call_sts(self) -> Dict[str, Any]:
+        if self._sts_regions is None:
+            creds = getattr(self._sts_client, self._STS_OPERATION)(**self._sts_call_kwargs())['Credentials']
+        else:
+            creds = self._assume_role_regional()['Credentials']
 
         return {
             'access_key': creds['AccessKeyId'],
@@ -37,3 +161,304 @@ class AssumeRefresh:
             'expiry_time': self._serialize_if_needed(creds['Expiration']),
         }
 
+
+    def _time_to_expiry(self) -> Optional[float]:
+        if self._expiry_time is None:
+            return None
+
+        return (self._expiry_time - _utc_now()).total_seconds()
+
+
+    def _wait_for_rate_limiter(self) -> None:
+        queue_depth = self._sts_rate_limiter.queue_depth
+        wait = self._sts_rate_limiter.acquire(time_to_expiry=self._time_to_expiry())
+        if self._metrics is not None:
+            self._metrics.on_rate_limit(role_arn=self._assume_role_kwargs["RoleArn"], wait=wait, queue_depth=queue_depth)
+
+
+    def _fetch_credentials(self) -> Dict[str, Any]:
+        if self._sts_rate_limiter is not None:
+            self._wait_for_rate_limiter()
+
+        if self._metrics is None:
+            return self._call_sts()
+
+        start = time.perf_counter()
+        try:
+            credentials = self._call_sts()
+        except Exception as error:
+            self._metrics.on_sts_call(
+                role_arn=self._assume_role_kwargs["RoleArn"],
+                latency=time.perf_counter() - start,
+                error_code=_error_code(error)
+            )
+            raise
+
+        self._metrics.on_sts_call(
+            role_arn=self._assume_role_kwargs["RoleArn"],
+            latency=time.perf_counter() - start,
+            error_code=None
+        )
+
+        return credentials
+
+
+    def _record_refresh(self) -> None:
+        self._metrics.on_refresh(role_arn=self._assume_role_kwargs["RoleArn"], time_to_expiry=self._time_to_expiry())
+
+
+    def _record_credentials(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+        # remember the expiry so the next refresh can report how close to expiry it happened, and queue by it
+        self._expiry_time = parse_timestamp(credentials['expiry_time'])
+        self._access_key = credentials['access_key']
+
+        return credentials
+
+
+    def refresh(self) -> Dict[str, Any]:
+        if self._metrics is None:
+            return self._record_credentials(self._refresh())
+
+        self._record_refresh()
+        if self._credential_cache is None:
+            return self._record_credentials(self._refresh())
+
+        fetched = False
+
+        def fetch() -> Dict[str, Any]:
+            nonlocal fetched
+            fetched = True
+            return self._fetch_credentials()
+
+        credentials = self._refresh(fetch=fetch)
+        if fetched:
+            self._metrics.on_cache_miss(role_arn=self._assume_role_kwargs["RoleArn"])
+        else:
+            self._metrics.on_cache_hit(role_arn=self._assume_role_kwargs["RoleArn"])
+
+        return self._record_credentials(credentials)
+
+
+    def _cache_key(self) -> str:
+        return credential_cache_key(
+            source_session=self._source_session,
+            sts_client_kwargs=self._sts_client_kwargs,
+            assume_role_kwargs=self._assume_role_kwargs
+        )
+
+
+    def _cache_min_remaining(self) -> Optional[float]:
+        credentials = None if self._credentials is None else self._credentials()
+        if credentials is None:
+            return None
+
+        # a first fetch can use anything the session would not block on, a refresh needs credentials outside the window it refreshes in
+        if self._expiry_time is None:
+            return credentials._mandatory_refresh_timeout
+
+        return credentials._advisory_refresh_timeout
+
+
+    def _refresh(self, fetch: Optional[Callable[[], Dict[str, Any]]] = None) -> Dict[str, Any]:
+        if fetch is None:
+            fetch = self._fetch_credentials
+
+        key = self._cache_key()
+        if self._credential_cache is None:
+            return dict(_single_flight.do(key=key, function=fetch))
+
+        min_remaining = self._cache_min_remaining()
+        credentials = self._credential_cache.get_or_fetch(key=key, fetch=fetch, min_remaining=min_remaining)
+        if credentials['access_key'] == self._access_key:
+            # the cache handed back the credentials being refreshed, ie a background refresh ahead of the advisory window
+            self._credential_cache.invalidate(key)
+            credentials = self._credential_cache.get_or_fetch(key=key, fetch=fetch, min_remaining=min_remaining)
+
+        return credentials
+
+
+# adaptive refresh keeps the mandatory window at least this many seconds, or this many times the STS latency
+_ADAPTIVE_MIN_MANDATORY_REFRESH = 30
+_ADAPTIVE_LATENCY_MULTIPLIER = 10
+# weight of the newest STS latency in the moving average
+_ADAPTIVE_LATENCY_WEIGHT = 0.3
+
+
+class _RefreshWindows:
+    """Custom and adaptive refresh windows shared by the sync and async assume role credentials.
+    """
+
+    def _configure_refresh_windows(
+        self,
+        advisory_refresh_timeout: Optional[float],
+        mandatory_refresh_timeout: Optional[float],
+        adaptive_refresh: bool
+    ) -> None:
+        if advisory_refresh_timeout is not None:
+            self._advisory_refresh_timeout = advisory_refresh_timeout
+
+        if mandatory_refresh_timeout is not None:
+            self._mandatory_refresh_timeout = mandatory_refresh_timeout
+
+        # with no advisory window left, every refresh would block API calls
+        if self._mandatory_refresh_timeout >= self._advisory_refresh_timeout:
+            raise RefreshWindowError(
+                f"mandatory_refresh_timeout ({self._mandatory_refresh_timeout}) must be less than "
+                f"advisory_refresh_timeout ({self._advisory_refresh_timeout}), pass both to shrink the refresh windows."
+            )
+
+        # adaptive windows never grow past the configured ones
+        self._max_advisory_refresh_timeout = self._advisory_refresh_timeout
+        self._max_mandatory_refresh_timeout = self._mandatory_refresh_timeout
+        self._adaptive_refresh = adaptive_refresh
+        self._sts_latency: Optional[float] = None
+
+
+    def _adapt_refresh_windows(self, latency: float) -> None:
+        if self._sts_latency is None:
+            self._sts_latency = latency
+        else:
+            self._sts_latency += _ADAPTIVE_LATENCY_WEIGHT * (latency - self._sts_latency)
+
+        lifetime = self._seconds_remaining()
+        # only block request threads close enough to expiry that a slow STS call could still finish in time
+        mandatory_refresh_timeout = min(
+            self._max_mandatory_refresh_timeout,
+            max(_ADAPTIVE_MIN_MANDATORY_REFRESH, _ADAPTIVE_LATENCY_MULTIPLIER * max(latency, self._sts_latency)),
+            lifetime / 4
+        )
+        # use the credentials for about two thirds of their lifetime before trying to refresh them
+        advisory_refresh_timeout = min(
+            self._max_advisory_refresh_timeout,
+            mandatory_refresh_timeout + lifetime / 3
+        )
+        self._mandatory_refresh_timeout = mandatory_refresh_timeout
+        self._advisory_refresh_timeout = max(advisory_refresh_timeout, mandatory_refresh_timeout)
+
+
+def _revalidate(credentials_ref: "weakref.ref[AssumeRoleCredentials]") -> None:
+    # only a weak reference is kept between attempts, so sessions can be garbage collected while STS is down
+    attempt = 0
+    while True:
+        credentials = credentials_ref()
+        if credentials is None:
+            return
+
+        delay = credentials._revalidate_once(attempt=attempt)
+        del credentials
+        if delay is None:
+            return
+
+        time.sleep(delay)
+        attempt += 1
+
+
+class AssumeRoleCredentials(_RefreshWindows, DeferredRefreshableCredentials):
+    """Deferred refreshable credentials with configurable and adaptive refresh windows, and optional stale while revalidate refreshing.
+    """
+
+    def __init__(
+        self,
+        refresh_using: Callable[[], Dict[str, Any]],
+        method: str,
+        advisory_refresh_timeout: Optional[float] = None,
+        mandatory_refresh_timeout: Optional[float] = None,
+        adaptive_refresh: bool = False,
+        resilience: Optional[ResiliencePolicy] = None
+    ):
+        super().__init__(refresh_using=refresh_using, method=method)
+        self._configure_refresh_windows(
+            advisory_refresh_timeout=advisory_refresh_timeout,
+            mandatory_refresh_timeout=mandatory_refresh_timeout,
+            adaptive_refresh=adaptive_refresh
+        )
+        assume_refresh = getattr(refresh_using, "__self__", None)
+        if isinstance(assume_refresh, AssumeRefresh):
+            # weak, the credentials already keep the refresher alive
+            assume_refresh._credentials = weakref.ref(self)
+
+        self._resilience = resilience
+        self._circuit_breaker = None
+        if resilience is not None:
+            self._circuit_breaker = _CircuitBreaker(
+                failure_threshold=resilience.failure_threshold,
+                reset_timeout=resilience.reset_timeout
+            )
+
+        self._revalidation_thread: Optional[threading.Thread] = None
+        self._revalidation_lock = threading.Lock()
+
+
+    def _refresh(self) -> None:
+        if self._resilience is None or self._frozen_credentials is None or self._is_expired():
+            return super()._refresh()
+
+        # the current credentials are still valid, keep using them and refresh in the background
+        if self.refresh_needed(self._advisory_refresh_timeout):
+            self._start_revalidation()
+
+
+    def _start_revalidation(self) -> None:
+        with self._revalidation_lock:
+            # threads from before a fork are not alive in the child
+            if self._revalidation_thread is not None and self._revalidation_thread.is_alive():
+                return
+
+            self._revalidation_thread = threading.Thread(
+                target=_revalidate,
+                args=(weakref.ref(self),),
+                name="boto3-assume-revalidate",
+                daemon=True
+            )
+            self._revalidation_thread.start()
+
+
+    def _revalidate_once(self, attempt: int) -> Optional[float]:
+        with self._refresh_lock:
+            if not self.refresh_needed(self._advisory_refresh_timeout):
+                return None
+
+            try:
+                self._protected_refresh(is_mandatory=True)
+            except RefreshCircuitOpenError:
+                return self._circuit_breaker.retry_after()
+            except Exception:
+                return self._resilience.backoff(attempt)
+
+        return None
+
+
+    def _protected_refresh(self, is_mandatory: bool) -> None:
+        if not self._adaptive_refresh and self._circuit_breaker is None:
+            return super()._protected_refresh(is_mandatory)
+
+        if self._circuit_breaker is not None and not self._circuit_breaker.allow():
+            if not is_mandatory:
+                return
+
+            raise RefreshCircuitOpenError(
+                f"STS refreshes are paused for {self._circuit_breaker.retry_after():.1f} seconds after repeated failures."
+            ) from self._circuit_breaker.last_error
+
+        expiry_time = self._expiry_time
+        start = time.perf_counter()
+        try:
+            super()._protected_refresh(is_mandatory)
+        except Exception as error:
+            if self._circuit_breaker is not None:
+                self._circuit_breaker.record_failure(error)
+
+            raise
+
+        # failed advisory refreshes are swallowed, only count and adapt to new credentials
+        if self._expiry_time == expiry_time:
+            if self._circuit_breaker is not None:
+                self._circuit_breaker.release_probe()
+
+            return
+
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.record_success()
+
+        if self._adaptive_refresh:
+            self._adapt_refresh_windows(time.perf_counter() - start)
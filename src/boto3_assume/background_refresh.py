@@ -0,0 +1,185 @@
+"""Refresh assume role credentials on a background thread before they are needed.
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+import weakref
+
+from botocore.credentials import RefreshableCredentials
+
+from boto3_assume.utils import register_fork_reset
+
+
+class BackgroundRefresher:
+    """Refreshes credentials on a scheduler thread ahead of botocore's advisory refresh window.
+
+    botocore refreshes credentials lazily, inside whichever API call first enters the refresh window.
+    Registering credentials with a ``BackgroundRefresher`` renews them before that window starts, so request threads never wait on STS.
+    Only weak references to the credentials are kept, so registered sessions can still be garbage collected.
+
+    Parameters
+    ----------
+    lead_time : float, default=60
+        Seconds before the advisory refresh window to refresh the credentials.
+    jitter : float, default=30
+        Up to this many seconds are randomly added to ``lead_time`` for each refresh,
+        so many sessions created at the same time don't refresh at the same time.
+        Each refresh is checked against its own jittered lead time, so the spread is kept.
+    retry_interval : float, default=10
+        Seconds to wait before trying again when a refresh fails,
+        or when the credentials are so short lived that they are always in the advisory window.
+    poll_interval : float, default=5
+        Seconds between checks for credentials that have not been fetched for the first time yet.
+    """
+
+    def __init__(
+        self,
+        lead_time: float = 60,
+        jitter: float = 30,
+        retry_interval: float = 10,
+        poll_interval: float = 5
+    ):
+        self._lead_time = lead_time
+        self._jitter = jitter
+        self._retry_interval = retry_interval
+        self._poll_interval = poll_interval
+        # (wake up time, tie breaker, credentials, lead time including jitter)
+        self._schedule: List[Tuple[float, int, weakref.ref, float]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        register_fork_reset(self._restart_after_fork)
+
+
+    def __enter__(self) -> "BackgroundRefresher":
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+    def __len__(self) -> int:
+        return len(self._schedule)
+
+
+    def _start(self) -> None:
+        # precondition: self._condition is held
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run,
+            name="boto3-assume-background-refresh",
+            daemon=True
+        )
+        self._thread.start()
+
+
+    def _restart_after_fork(self) -> None:
+        # the scheduler thread does not exist in a forked child
+        self._condition = threading.Condition()
+        self._thread = None
+        if self._schedule and not self._stopped:
+            with self._condition:
+                self._start()
+
+
+    def register(self, credentials: RefreshableCredentials) -> None:
+        """Start refreshing credentials in the background.
+
+        Parameters
+        ----------
+        credentials : RefreshableCredentials
+            Credentials of an assume role session, ie ``assume_session.get_credentials()``.
+        """
+        lead_time = self._jittered_lead_time()
+        with self._condition:
+            self._push(delay=self._next_delay(credentials, lead_time), lead_time=lead_time, credentials=credentials)
+            if self._thread is None:
+                self._start()
+
+            self._condition.notify()
+
+
+    def stop(self) -> None:
+        """Stop the scheduler thread and forget all registered credentials.
+        """
+        with self._condition:
+            self._stopped = True
+            self._schedule.clear()
+            thread = self._thread
+            self._thread = None
+            self._condition.notify()
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+
+    def _push(self, delay: float, lead_time: float, credentials: RefreshableCredentials) -> None:
+        # precondition: self._condition is held
+        heapq.heappush(
+            self._schedule,
+            (time.monotonic() + delay, next(self._counter), weakref.ref(credentials), lead_time)
+        )
+
+
+    def _jittered_lead_time(self) -> float:
+        return self._lead_time + random.uniform(0, self._jitter)
+
+
+    def _next_delay(self, credentials: RefreshableCredentials, lead_time: float) -> float:
+        if credentials._expiry_time is None:
+            return self._poll_interval
+
+        delay = credentials._seconds_remaining() - credentials._advisory_refresh_timeout - lead_time
+
+        return max(delay, 0)
+
+
+    def _refresh(self, credentials: RefreshableCredentials, lead_time: float) -> Tuple[float, float]:
+        with credentials._refresh_lock:
+            # the wake up time was moved earlier by the jitter, so the check has to include it as well
+            if credentials.refresh_needed(credentials._advisory_refresh_timeout + lead_time):
+                # advisory refreshes log and swallow errors, so request threads keep using the current credentials
+                credentials._protected_refresh(is_mandatory=False)
+
+        lead_time = self._jittered_lead_time()
+        delay = self._next_delay(credentials, lead_time)
+        if delay <= 0:
+            return self._retry_interval, lead_time
+
+        return delay, lead_time
+
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped and (
+                    not self._schedule
+                    or self._schedule[0][0] > time.monotonic()
+                ):
+                    timeout = self._schedule[0][0] - time.monotonic() if self._schedule else None
+                    self._condition.wait(timeout=timeout)
+
+                if self._stopped:
+                    return
+
+                _, _, credentials_ref, lead_time = heapq.heappop(self._schedule)
+
+            credentials = credentials_ref()
+            if credentials is None:
+                continue
+
+            if credentials._expiry_time is None:
+                delay = self._poll_interval
+            else:
+                delay, lead_time = self._refresh(credentials, lead_time)
+
+            with self._condition:
+                if not self._stopped:
+                    self._push(delay=delay, lead_time=lead_time, credentials=credentials)
+
+            del credentials
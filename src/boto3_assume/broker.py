@@ -0,0 +1,228 @@
+"""Share one assume role session's credentials with other local processes over a Unix socket.
+"""
+import datetime
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.credentials import DeferredRefreshableCredentials, ReadOnlyCredentials
+
+from boto3_assume.exceptions import CredentialBrokerError
+
+
+def _current_credentials(session: boto3.Session) -> Tuple[ReadOnlyCredentials, datetime.datetime]:
+    credentials = session.get_credentials()
+    # make sure the credentials are fetched and fresh first
+    credentials.get_frozen_credentials()
+    # read the expiry before the credentials, if a refresh happens in between the clients just refresh early
+    expiry_time = credentials._expiry_time
+
+    return credentials.get_frozen_credentials(), expiry_time
+
+
+class _BrokerRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> None:
+        try:
+            response = self.server.broker._current_credentials()
+        except Exception as error:
+            response = {"error": f"{type(error).__name__}: {error}"}
+
+        self.wfile.write(json.dumps(response).encode("utf-8"))
+
+
+class _BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class CredentialBroker:
+    """Serve the credentials of an assume role session to other processes over a Unix socket.
+
+    Create the broker in a parent process before forking workers,
+    then create sessions in the workers with ``broker_session``.
+    Only the parent refreshes credentials, so N workers cost one STS call per refresh cycle instead of N.
+
+    Parameters
+    ----------
+    session : boto3.Session
+        Assume role session that owns the credentials, ie from ``assume_role``.
+    socket_path : str
+        Path of the Unix socket to listen on. Only the current user can connect to it.
+    """
+
+    def __init__(
+        self,
+        session: boto3.Session,
+        socket_path: str
+    ):
+        self._session = session
+        self._socket_path = socket_path
+        self._server: Optional[_BrokerServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+
+    def __enter__(self) -> "CredentialBroker":
+        self.start()
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+    @property
+    def socket_path(self) -> str:
+        return self._socket_path
+
+
+    def _current_credentials(self) -> Dict[str, Any]:
+        frozen_credentials, expiry_time = _current_credentials(self._session)
+
+        return {
+            "access_key": frozen_credentials.access_key,
+            "secret_key": frozen_credentials.secret_key,
+            "token": frozen_credentials.token,
+            "expiry_time": expiry_time.isoformat()
+        }
+
+
+    def start(self) -> None:
+        """Start serving credentials on a background thread.
+        """
+        if self._server is not None:
+            return
+
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _BrokerServer(self._socket_path, _BrokerRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+        self._server.broker = self
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="boto3-assume-credential-broker",
+            daemon=True
+        )
+        self._thread.start()
+
+
+    def stop(self) -> None:
+        """Stop serving credentials and remove the socket.
+
+        Only the process that started the broker stops it, so calling ``stop`` in a forked worker does nothing.
+        """
+        if self._server is None or self._pid != os.getpid():
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+
+
+class BrokerRefresh:
+
+    def __init__(
+        self,
+        socket_path: str,
+        timeout: float = 30
+    ):
+        self._socket_path = socket_path
+        self._timeout = timeout
+
+
+    def refresh(self) -> Dict[str, Any]:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as broker_socket:
+                broker_socket.settimeout(self._timeout)
+                broker_socket.connect(self._socket_path)
+                chunks = []
+                while True:
+                    chunk = broker_socket.recv(4096)
+                    if not chunk:
+                        break
+
+                    chunks.append(chunk)
+        except OSError as error:
+            raise CredentialBrokerError(f"Unable to get credentials from the broker at '{self._socket_path}': {error}") from error
+
+        response = json.loads(b"".join(chunks).decode("utf-8"))
+        if "error" in response:
+            raise CredentialBrokerError(f"The broker at '{self._socket_path}' failed to get credentials: {response['error']}")
+
+        return response
+
+
+def broker_session(
+    socket_path: str,
+    target_session_kwargs: Dict[str, Any] = None,
+    timeout: float = 30
+) -> boto3.Session:
+    """Generate a ``boto3`` session that gets its credentials from a ``CredentialBroker``.
+
+    Parameters
+    ----------
+    socket_path : str
+        Path of the broker's Unix socket.
+    target_session_kwargs : Dict[str, Any], default=None
+        Keyword arguments to pass when creating the new `boto3 Session <https://boto3.amazonaws.com/v1/documentation/api/latest/reference/core/session.html>`_.
+        Note that you should only pass in `region_name` or other variables that will not effect credentials or credential refreshing.
+    timeout : float, default=30
+        Seconds to wait for the broker to respond.
+
+    Returns
+    -------
+    boto3.Session
+        Session whose credentials are refreshed from the broker.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import multiprocessing
+
+        import boto3
+        from boto3_assume import assume_role, broker_session, CredentialBroker
+
+        def worker(socket_path):
+            session = broker_session(socket_path)
+            print(session.client("sts").get_caller_identity())
+
+        assume_session = assume_role(
+            source_session=boto3.Session(),
+            assume_role_kwargs={
+                "RoleArn": "arn:aws:iam::123412341234:role/my_role",
+                "RoleSessionName": "my-role-session"
+            }
+        )
+        with CredentialBroker(session=assume_session, socket_path="/tmp/my-role.sock") as broker:
+            workers = [multiprocessing.Process(target=worker, args=(broker.socket_path,)) for _ in range(4)]
+            for process in workers:
+                process.start()
+
+            for process in workers:
+                process.join()
+    """
+    if target_session_kwargs is None:
+        target_session_kwargs = {}
+
+    session = boto3.Session(**target_session_kwargs)
+    session._session._credentials = DeferredRefreshableCredentials(
+        refresh_using=BrokerRefresh(socket_path=socket_path, timeout=timeout).refresh,
+        method="boto3-assume-broker"
+    )
+
+    return session
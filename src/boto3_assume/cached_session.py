@@ -0,0 +1,77 @@
+"""``boto3`` session that reuses the clients and resources it creates.
+"""
+import copy
+import threading
+from typing import Any, Dict, Hashable
+
+import boto3
+
+from boto3_assume.utils import _hashable, hashable_kwargs
+
+
+def _copy_config(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    # botocore updates the options of the config it is given in place, which would change the cache key of the next call
+    if kwargs.get("config") is None:
+        return kwargs
+
+    return {**kwargs, "config": copy.deepcopy(kwargs["config"])}
+
+
+class CachedClientSession(boto3.Session):
+    """``boto3`` session that caches its clients and resources, keyed on the service and arguments.
+
+    Clients are thread safe, so one client is shared by every thread.
+    Resources are not thread safe, so each thread gets its own.
+    Cached clients and resources share the session's refreshable credentials, so they keep working after every refresh.
+
+    ``botocore.config.Config`` arguments match by their options, so a new but equal ``Config`` for every call hits the cache.
+    Other arguments that are objects match by identity, so create them once and reuse them to hit the cache.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clients: Dict[Hashable, Any] = {}
+        self._clients_lock = threading.Lock()
+        self._resources = threading.local()
+
+
+    def client(self, *args, **kwargs):
+        if getattr(self._resources, "creating", False):
+            # boto3 creates a new client for each resource with a new config, caching them would only leak memory
+            return super().client(*args, **kwargs)
+
+        key = (_hashable(args), hashable_kwargs(kwargs))
+        client = self._clients.get(key)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = super().client(*args, **_copy_config(kwargs))
+                    self._clients[key] = client
+
+        return client
+
+
+    def resource(self, *args, **kwargs):
+        resources = getattr(self._resources, "cache", None)
+        if resources is None:
+            resources = self._resources.cache = {}
+
+        key = (_hashable(args), hashable_kwargs(kwargs))
+        if key not in resources:
+            self._resources.creating = True
+            try:
+                resources[key] = super().resource(*args, **_copy_config(kwargs))
+            finally:
+                self._resources.creating = False
+
+        return resources[key]
+
+
+    def clear_cache(self) -> None:
+        """Drop the cached clients, and the resources cached for the current thread.
+        """
+        with self._clients_lock:
+            self._clients = {}
+
+        self._resources.cache = {}
@@ -0,0 +1,178 @@
+"""Serve an assume role session's credentials to local processes in any language over the container credentials protocol.
+"""
+import datetime
+import hmac
+import http.server
+import json
+import os
+import secrets
+import socket
+import threading
+from typing import Dict, Optional
+
+import boto3
+
+from boto3_assume.broker import _current_credentials
+
+
+class _ContainerCredentialsHandler(http.server.BaseHTTPRequestHandler):
+
+    def _send_json(self, status: int, body: Dict[str, str]) -> None:
+        response = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+
+    def do_GET(self) -> None:
+        server = self.server.container_credentials_server
+        if self.path != server.path:
+            self._send_json(404, {"Code": "NotFound", "Message": f"No credentials at {self.path}"})
+            return
+
+        if not hmac.compare_digest(self.headers.get("Authorization", ""), server.auth_token):
+            self._send_json(401, {"Code": "Unauthorized", "Message": "Missing or invalid authorization token"})
+            return
+
+        try:
+            frozen_credentials, expiry_time = _current_credentials(server._session)
+        except Exception as error:
+            self._send_json(500, {"Code": type(error).__name__, "Message": str(error)})
+            return
+
+        self._send_json(200, {
+            "AccessKeyId": frozen_credentials.access_key,
+            "SecretAccessKey": frozen_credentials.secret_key,
+            "Token": frozen_credentials.token,
+            "Expiration": expiry_time.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        })
+
+
+    def log_message(self, format: str, *args) -> None:
+        # every request carries credentials, keep them out of stderr
+        pass
+
+
+class _ContainerCredentialsHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _IPv6ContainerCredentialsHTTPServer(_ContainerCredentialsHTTPServer):
+    address_family = socket.AF_INET6
+
+
+class ContainerCredentialsServer:
+    """Serve the credentials of an assume role session over HTTP with the ECS container credentials protocol.
+
+    Any AWS SDK or the AWS CLI picks the credentials up from the ``AWS_CONTAINER_CREDENTIALS_FULL_URI``
+    and ``AWS_CONTAINER_AUTHORIZATION_TOKEN`` environment variables, so sidecars and subprocesses
+    written in any language share this session's refresh cycle instead of each assuming the role.
+    Requests without the authorization token are rejected.
+
+    Parameters
+    ----------
+    session : boto3.Session
+        Assume role session that owns the credentials, ie from ``assume_role``.
+    host : str, default="127.0.0.1"
+        Address to listen on. SDKs only accept plain HTTP credential endpoints on loopback addresses.
+    port : int, default=0
+        Port to listen on. By default the OS picks a free port.
+    auth_token : Optional[str], default=None
+        Token clients must send in the ``Authorization`` header. By default a new random token.
+    path : str, default="/credentials"
+        URL path to serve the credentials on.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import os
+        import subprocess
+
+        from boto3_assume import ContainerCredentialsServer
+
+        with ContainerCredentialsServer(session=assume_session) as server:
+            subprocess.run(["aws", "sts", "get-caller-identity"], env={**os.environ, **server.environ})
+    """
+
+    def __init__(
+        self,
+        session: boto3.Session,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        auth_token: Optional[str] = None,
+        path: str = "/credentials"
+    ):
+        self._session = session
+        self._host = host
+        self._port = port
+        self.auth_token = secrets.token_urlsafe(32) if auth_token is None else auth_token
+        self.path = path
+        self._server: Optional[_ContainerCredentialsHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+
+    def __enter__(self) -> "ContainerCredentialsServer":
+        self.start()
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+    @property
+    def url(self) -> str:
+        """Full URL of the credentials endpoint. Only known once the server is started when ``port`` is 0.
+        """
+        host, port = self._server.server_address[:2] if self._server is not None else (self._host, self._port)
+        if ":" in host:
+            host = f"[{host}]"
+
+        return f"http://{host}:{port}{self.path}"
+
+
+    @property
+    def environ(self) -> Dict[str, str]:
+        """Environment variables that point AWS SDKs at this server, pass them to subprocesses.
+        """
+        return {
+            "AWS_CONTAINER_CREDENTIALS_FULL_URI": self.url,
+            "AWS_CONTAINER_AUTHORIZATION_TOKEN": self.auth_token
+        }
+
+
+    def start(self) -> None:
+        """Start serving credentials on a background thread.
+        """
+        if self._server is not None:
+            return
+
+        server_class = _IPv6ContainerCredentialsHTTPServer if ":" in self._host else _ContainerCredentialsHTTPServer
+        self._server = server_class((self._host, self._port), _ContainerCredentialsHandler)
+        self._server.container_credentials_server = self
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="boto3-assume-container-credentials",
+            daemon=True
+        )
+        self._thread.start()
+
+
+    def stop(self) -> None:
+        """Stop serving credentials.
+
+        Only the process that started the server stops it, so calling ``stop`` in a forked child does nothing.
+        """
+        if self._server is None or self._pid != os.getpid():
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
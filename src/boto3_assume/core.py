@@ -1,12 +1,31 @@
 
-from typing import Any, Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type
 import warnings
+import weakref
 
 import boto3
+import botocore.session
 from botocore.credentials import DeferredRefreshableCredentials
+from botocore.exceptions import ClientError
+from botocore.loaders import Loader
 
-from boto3_assume.assume_refresh import AssumeRefresh
+from boto3_assume.assume_refresh import AssumeRefresh, AssumeRoleCredentials
+from boto3_assume.background_refresh import BackgroundRefresher
+from boto3_assume.cached_session import CachedClientSession
+from boto3_assume.credential_cache import BaseCredentialCache
+from boto3_assume.federated_refresh import _unsigned_sts_client_kwargs, AssumeRoleWithSAMLRefresh, AssumeRoleWithWebIdentityRefresh
 from boto3_assume.exceptions import ForbiddenKWArgError, MissingKWArgError
+from boto3_assume.metrics import RefreshMetrics
+from boto3_assume.rate_limiter import STSRateLimiter
+from boto3_assume.resilience import ResiliencePolicy
+from boto3_assume.sts_client_pool import STSClientPool
+from boto3_assume.sts_endpoints import _default_sts_endpoint_selector, STSEndpointSelector
+from boto3_assume.utils import _THROTTLING_ERROR_CODES
 
 
 def assume_role_session(
@@ -70,11 +89,183 @@ def _check_forbidden_keys(name: str, kwargs: dict, forbidden_keys: list) -> None
             raise ForbiddenKWArgError(f"{name} cannot contain the '{key}' key when used with boto3-assume.")
 
 
+def _validate_kwargs(
+    assume_role_kwargs: Dict[str, Any],
+    sts_client_kwargs: Optional[Dict[str, Any]],
+    target_session_kwargs: Optional[Dict[str, Any]],
+    required_keys: Tuple[str, ...] = ("RoleArn", "RoleSessionName")
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    if any(key not in assume_role_kwargs for key in required_keys):
+        raise MissingKWArgError(f"assume_role_kwargs must include the {' and '.join(required_keys)} keys.")
+
+    if sts_client_kwargs is None:
+        sts_client_kwargs = {}
+    else:
+        _check_forbidden_keys(
+            name="sts_client_kwargs", 
+            kwargs=sts_client_kwargs, 
+            forbidden_keys=[
+                "service_name",
+                "aws_access_key_id",
+                "aws_secret_access_key",
+                "aws_session_token"
+            ]
+        )
+
+    if target_session_kwargs is None:
+        target_session_kwargs = {}
+    else:
+        _check_forbidden_keys(
+            name="target_session_kwargs",
+            kwargs=target_session_kwargs,
+            forbidden_keys=[
+                "aws_access_key_id",
+                "aws_secret_access_key",
+                "aws_session_token",
+                "botocore_session",
+                "profile_name"
+            ]
+        )
+
+    return sts_client_kwargs, target_session_kwargs
+
+
+class _SearchPaths(list):
+    # boto3 appends its own data path to the loader of every session it creates
+    def append(self, path: str) -> None:
+        if path not in self:
+            super().append(path)
+
+
+_shared_loaders: "weakref.WeakKeyDictionary[Loader, Loader]" = weakref.WeakKeyDictionary()
+_shared_loaders_lock = threading.Lock()
+
+
+def _shared_loader(source_session: boto3.Session) -> Loader:
+    source_loader = source_session._session.get_component("data_loader")
+    if isinstance(source_loader.search_paths, _SearchPaths):
+        # the source session is itself a session with a shared loader, ie a hop in a role chain
+        return source_loader
+
+    with _shared_loaders_lock:
+        loader = _shared_loaders.get(source_loader)
+        if loader is None:
+            loader = Loader(
+                extra_search_paths=_SearchPaths(source_loader.search_paths),
+                file_loader=source_loader.file_loader,
+                include_default_search_paths=False
+            )
+            _shared_loaders[source_loader] = loader
+
+    return loader
+
+
+def _target_session(
+    session_class: type,
+    source_session: boto3.Session,
+    target_session_kwargs: Dict[str, Any],
+    share_loader: bool
+) -> boto3.Session:
+    if not share_loader:
+        return session_class(**target_session_kwargs)
+
+    # service models and endpoint data are parsed once per source session, instead of once per session
+    botocore_session = botocore.session.get_session()
+    botocore_session.register_component("data_loader", _shared_loader(source_session))
+
+    return session_class(botocore_session=botocore_session, **target_session_kwargs)
+
+
+def _build_assume_session(
+    refresh_class: Type[AssumeRefresh],
+    refresh_kwargs: Dict[str, Any],
+    method: str,
+    source_session: boto3.Session,
+    assume_role_kwargs: Dict[str, Any],
+    sts_client_kwargs: Dict[str, Any],
+    target_session_kwargs: Dict[str, Any],
+    credential_cache: Optional[BaseCredentialCache] = None,
+    sts_client_pool: Optional[STSClientPool] = None,
+    background_refresher: Optional[BackgroundRefresher] = None,
+    metrics: Optional[RefreshMetrics] = None,
+    prefetch: bool = False,
+    advisory_refresh_timeout: Optional[float] = None,
+    mandatory_refresh_timeout: Optional[float] = None,
+    adaptive_refresh: bool = False,
+    resilience: Optional[ResiliencePolicy] = None,
+    regional_sts: bool = False,
+    sts_failover_regions: Optional[List[str]] = None,
+    sts_endpoint_selector: Optional[STSEndpointSelector] = None,
+    cache_clients: bool = False,
+    share_loader: bool = False,
+    sts_rate_limiter: Optional[STSRateLimiter] = None
+) -> boto3.Session:
+    # shared by every assume role operation, the kwargs have already been validated
+    session_class = CachedClientSession if cache_clients else boto3.Session
+    assume_sess = _target_session(
+        session_class=session_class,
+        source_session=source_session,
+        target_session_kwargs=target_session_kwargs,
+        share_loader=share_loader
+    )
+    sts_regions = None
+    if regional_sts or sts_failover_regions:
+        region = assume_sess.region_name or sts_client_kwargs.get("region_name")
+        if region is None:
+            raise MissingKWArgError("regional_sts needs a region, set region_name in target_session_kwargs or sts_client_kwargs.")
+
+        sts_regions = [region, *[r for r in sts_failover_regions or [] if r != region]]
+        if sts_endpoint_selector is None:
+            sts_endpoint_selector = _default_sts_endpoint_selector
+
+    assume_sess._session._credentials = AssumeRoleCredentials(
+        refresh_using=refresh_class(
+            **refresh_kwargs,
+            source_session=source_session,
+            sts_client_kwargs=sts_client_kwargs,
+            assume_role_kwargs=assume_role_kwargs,
+            credential_cache=credential_cache,
+            sts_client_pool=sts_client_pool,
+            metrics=metrics,
+            sts_regions=sts_regions,
+            sts_endpoint_selector=sts_endpoint_selector,
+            sts_rate_limiter=sts_rate_limiter
+        ).refresh,
+        method=method,
+        advisory_refresh_timeout=advisory_refresh_timeout,
+        mandatory_refresh_timeout=mandatory_refresh_timeout,
+        adaptive_refresh=adaptive_refresh,
+        resilience=resilience
+    )
+    if prefetch:
+        warm(assume_sess)
+
+    if background_refresher is not None:
+        background_refresher.register(assume_sess._session._credentials)
+    
+    return assume_sess
+
+
 def assume_role(
     source_session: boto3.Session,
     assume_role_kwargs: Dict[str, Any],
     sts_client_kwargs: Dict[str, Any] = None,
-    target_session_kwargs: Dict[str, Any] = None
+    target_session_kwargs: Dict[str, Any] = None,
+    credential_cache: Optional[BaseCredentialCache] = None,
+    sts_client_pool: Optional[STSClientPool] = None,
+    background_refresher: Optional[BackgroundRefresher] = None,
+    metrics: Optional[RefreshMetrics] = None,
+    prefetch: bool = False,
+    advisory_refresh_timeout: Optional[float] = None,
+    mandatory_refresh_timeout: Optional[float] = None,
+    adaptive_refresh: bool = False,
+    resilience: Optional[ResiliencePolicy] = None,
+    regional_sts: bool = False,
+    sts_failover_regions: Optional[List[str]] = None,
+    sts_endpoint_selector: Optional[STSEndpointSelector] = None,
+    cache_clients: bool = False,
+    share_loader: bool = False,
+    sts_rate_limiter: Optional[STSRateLimiter] = None
 ) -> boto3.Session:
     """Generate an assume role ``boto3`` session, that will automatically refresh credentials.
 
@@ -93,6 +284,58 @@ def assume_role(
         Keyword arguments to pass when creating a the new target `boto3 Session <https://boto3.amazonaws.com/v1/documentation/api/latest/reference/core/session.html>`_.
         By default no arguments are passed. 
         Note that you should only pass in `region_name` or `aws_account_id` or other variables that will not effect credentials or credential refreshing. 
+    credential_cache : Optional[BaseCredentialCache], default=None
+        Cache to share credentials between all sessions that assume the same role from the same source identity.
+        Use a ``CredentialCache`` to share them within a process, or a ``FileCredentialCache`` to share them between processes.
+        By default every session gets and refreshes its own credentials.
+    sts_client_pool : Optional[STSClientPool], default=None
+        Pool to share one STS client between all sessions created from the same ``source_session`` and ``sts_client_kwargs``.
+        By default every session creates its own STS client.
+    background_refresher : Optional[BackgroundRefresher], default=None
+        Refresh the credentials on the refresher's background thread before they enter botocore's refresh window,
+        so API calls never wait on STS once the credentials have been fetched.
+        By default credentials are refreshed by whichever API call first needs them refreshed.
+    metrics : Optional[RefreshMetrics], default=None
+        Receives an event for every refresh, STS call and cache lookup, ie an ``InMemoryRefreshMetrics`` or ``StatsDRefreshMetrics``.
+        By default nothing is recorded.
+    prefetch : bool, default=False
+        Fetch the credentials before returning, so the first API call does not wait on STS.
+        By default the credentials are fetched by the first API call.
+    advisory_refresh_timeout : Optional[float], default=None
+        Seconds before expiry that one API call tries to refresh the credentials while the others keep using the current ones.
+        Refresh errors are ignored in this window. By default botocore's 15 minutes is used.
+    mandatory_refresh_timeout : Optional[float], default=None
+        Seconds before expiry that every API call waits for the credentials to be refreshed, and refresh errors are raised.
+        Must be less than ``advisory_refresh_timeout``. By default botocore's 10 minutes is used.
+    adaptive_refresh : bool, default=False
+        Shrink the refresh windows after every refresh based on the lifetime of the new credentials and how long STS took to return them,
+        so short lived credentials are used for about two thirds of their lifetime instead of being refreshed on almost every call.
+        The windows never grow past ``advisory_refresh_timeout`` and ``mandatory_refresh_timeout``.
+    resilience : Optional[ResiliencePolicy], default=None
+        Keep serving the current credentials while they are valid and refresh them on a background thread,
+        retrying with backoff and a circuit breaker, so API calls only see STS errors once the credentials have expired.
+        By default an API call waits on STS in the mandatory refresh window and gets its errors.
+    regional_sts : bool, default=False
+        Call the STS endpoint in the target session's region, or ``region_name`` from ``sts_client_kwargs`` if the target session has none.
+        By default the STS client uses whatever endpoint ``sts_client_kwargs`` resolves to.
+    sts_failover_regions : Optional[List[str]], default=None
+        Regions to fail over to when the regional STS endpoint has connection errors, timeouts, throttling or server errors.
+        Implies ``regional_sts``. Refreshes go to the fastest healthy region.
+    sts_endpoint_selector : Optional[STSEndpointSelector], default=None
+        Records the latency and health of each region and picks the one to call.
+        By default one selector is shared by every session in the process.
+    cache_clients : bool, default=False
+        Return a ``CachedClientSession`` that reuses its clients and resources,
+        so code that calls ``session.client(...)`` for every request does not rebuild the client each time.
+        By default a plain ``boto3.Session`` is returned.
+    share_loader : bool, default=False
+        Share one botocore data loader between every session assumed from the same ``source_session``,
+        so service models are loaded and parsed once per source session, instead of once per session.
+        By default every session loads its own copy of the models it uses.
+    sts_rate_limiter : Optional[STSRateLimiter], default=None
+        Token bucket that every STS call from this session waits on before it is sent.
+        Pass the same limiter to every session to keep the process under the STS request rate limit,
+        refreshes of the credentials closest to expiry go first. By default STS calls are not rate limited.
 
     Returns
     -------
@@ -101,10 +344,15 @@ def assume_role(
 
     Raises
     ------
+    botocore.exceptions.ClientError
+        STS failed to return credentials when ``prefetch`` is ``True``.
     ForbiddenKWArgError
         One of the kwargs function parameters includes a keyword argument that is not allowed for boto3-assume.
     MissingKWArgError
-        One of the kwargs function parameters is missing a necessary keyword argument.
+        One of the kwargs function parameters is missing a necessary keyword argument,
+        or no region is configured for ``regional_sts``.
+    RefreshWindowError
+        ``mandatory_refresh_timeout`` is not less than ``advisory_refresh_timeout``.
     
     Examples
     --------
@@ -123,46 +371,574 @@ def assume_role(
             }
         )
     """
-    if "RoleArn" not in assume_role_kwargs or "RoleSessionName" not in assume_role_kwargs:
-        raise MissingKWArgError("assume_role_kwargs must include the RoleArn and RoleSessionName keys.")
+    sts_client_kwargs, target_session_kwargs = _validate_kwargs(
+        assume_role_kwargs=assume_role_kwargs,
+        sts_client_kwargs=sts_client_kwargs,
+        target_session_kwargs=target_session_kwargs
+    )
 
-    if sts_client_kwargs is None:
-        sts_client_kwargs = {}
-    else:
-        _check_forbidden_keys(
-            name="sts_client_kwargs", 
-            kwargs=sts_client_kwargs, 
-            forbidden_keys=[
-                "service_name",
-                "aws_access_key_id",
-                "aws_secret_access_key",
-                "aws_session_token"
-            ]
+    return _build_assume_session(
+        refresh_class=AssumeRefresh,
+        refresh_kwargs={},
+        method="sts-assume-role",
+        source_session=source_session,
+        assume_role_kwargs=assume_role_kwargs,
+        sts_client_kwargs=sts_client_kwargs,
+        target_session_kwargs=target_session_kwargs,
+        credential_cache=credential_cache,
+        sts_client_pool=sts_client_pool,
+        background_refresher=background_refresher,
+        metrics=metrics,
+        prefetch=prefetch,
+        advisory_refresh_timeout=advisory_refresh_timeout,
+        mandatory_refresh_timeout=mandatory_refresh_timeout,
+        adaptive_refresh=adaptive_refresh,
+        resilience=resilience,
+        regional_sts=regional_sts,
+        sts_failover_regions=sts_failover_regions,
+        sts_endpoint_selector=sts_endpoint_selector,
+        cache_clients=cache_clients,
+        share_loader=share_loader,
+        sts_rate_limiter=sts_rate_limiter
+    )
+
+
+def assume_role_with_web_identity(
+    assume_role_kwargs: Optional[Dict[str, Any]] = None,
+    web_identity_token_file: Optional[str] = None,
+    source_session: Optional[boto3.Session] = None,
+    sts_client_kwargs: Dict[str, Any] = None,
+    target_session_kwargs: Dict[str, Any] = None,
+    **assume_role_options
+) -> boto3.Session:
+    """Generate a ``boto3`` session from ``AssumeRoleWithWebIdentity``, that will automatically refresh credentials.
+
+    The token file is read on every refresh that finds it has been modified, so rotated tokens are picked up
+    without reading the file for every refresh.
+    The STS calls are not signed, so no source credentials are needed.
+
+    Parameters
+    ----------
+    assume_role_kwargs : Optional[Dict[str, Any]], default=None
+        Keyword arguments to pass when calling `assume_role_with_web_identity <https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sts/client/assume_role_with_web_identity.html>`_.
+        By default ``RoleArn`` and ``RoleSessionName`` are read from the ``AWS_ROLE_ARN`` and ``AWS_ROLE_SESSION_NAME`` environment variables.
+        EKS only sets ``AWS_ROLE_ARN``, so without either a ``RoleSessionName`` like botocore's ``botocore-session-<timestamp>`` is used.
+        Do not pass ``WebIdentityToken``, it is read from ``web_identity_token_file``.
+    web_identity_token_file : Optional[str], default=None
+        Path of the file with the web identity token. By default the ``AWS_WEB_IDENTITY_TOKEN_FILE`` environment variable.
+    source_session : Optional[boto3.Session], default=None
+        Session to create the STS client from. By default a new ``boto3.Session()``.
+    sts_client_kwargs : Dict[str, Any], default=None
+        Kwargs to pass when creating the STS client, see ``assume_role``.
+    target_session_kwargs : Dict[str, Any], default=None
+        Keyword arguments to pass when creating the new target session, see ``assume_role``.
+    **assume_role_options
+        Other ``assume_role`` options, ie ``credential_cache``, ``metrics`` or ``resilience``.
+
+    Returns
+    -------
+    boto3.Session
+        The assumed role session with automatic credential refreshing.
+
+    Raises
+    ------
+    ForbiddenKWArgError
+        One of the kwargs function parameters includes a keyword argument that is not allowed for boto3-assume.
+    MissingKWArgError
+        One of the kwargs function parameters is missing a necessary keyword argument, or there is no token file.
+
+    Examples
+    --------
+    Assume the IAM role of an EKS service account:
+
+    .. code-block:: python
+
+        from boto3_assume import assume_role_with_web_identity
+
+        assume_session = assume_role_with_web_identity()
+    """
+    assume_role_kwargs = dict(assume_role_kwargs or {})
+    for key, env_var in [("RoleArn", "AWS_ROLE_ARN"), ("RoleSessionName", "AWS_ROLE_SESSION_NAME")]:
+        if key not in assume_role_kwargs and os.environ.get(env_var):
+            assume_role_kwargs[key] = os.environ[env_var]
+
+    assume_role_kwargs.setdefault("RoleSessionName", f"botocore-session-{int(time.time())}")
+    _check_forbidden_keys(name="assume_role_kwargs", kwargs=assume_role_kwargs, forbidden_keys=["WebIdentityToken"])
+    if web_identity_token_file is None:
+        web_identity_token_file = os.environ.get("AWS_WEB_IDENTITY_TOKEN_FILE")
+        if web_identity_token_file is None:
+            raise MissingKWArgError("web_identity_token_file must be passed or set with AWS_WEB_IDENTITY_TOKEN_FILE.")
+
+    sts_client_kwargs, target_session_kwargs = _validate_kwargs(
+        assume_role_kwargs=assume_role_kwargs,
+        sts_client_kwargs=sts_client_kwargs,
+        target_session_kwargs=target_session_kwargs
+    )
+
+    return _build_assume_session(
+        refresh_class=AssumeRoleWithWebIdentityRefresh,
+        refresh_kwargs={"web_identity_token_file": web_identity_token_file},
+        method="sts-assume-role-with-web-identity",
+        source_session=boto3.Session() if source_session is None else source_session,
+        assume_role_kwargs=assume_role_kwargs,
+        sts_client_kwargs=_unsigned_sts_client_kwargs(sts_client_kwargs),
+        target_session_kwargs=target_session_kwargs,
+        **assume_role_options
+    )
+
+
+def assume_role_with_saml(
+    assume_role_kwargs: Dict[str, Any],
+    saml_assertion: Callable[[], str],
+    source_session: Optional[boto3.Session] = None,
+    sts_client_kwargs: Dict[str, Any] = None,
+    target_session_kwargs: Dict[str, Any] = None,
+    **assume_role_options
+) -> boto3.Session:
+    """Generate a ``boto3`` session from ``AssumeRoleWithSAML``, that will automatically refresh credentials.
+
+    SAML assertions expire after a few minutes, so ``saml_assertion`` is called for a new one every time STS is called.
+    The STS calls are not signed, so no source credentials are needed.
+
+    Parameters
+    ----------
+    assume_role_kwargs : Dict[str, Any]
+        Keyword arguments to pass when calling `assume_role_with_saml <https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sts/client/assume_role_with_saml.html>`_.
+        Must at least provide ``RoleArn`` and ``PrincipalArn``. Do not pass ``SAMLAssertion``.
+    saml_assertion : Callable[[], str]
+        Returns a new base64 encoded SAML assertion from your identity provider.
+    source_session : Optional[boto3.Session], default=None
+        Session to create the STS client from. By default a new ``boto3.Session()``.
+    sts_client_kwargs : Dict[str, Any], default=None
+        Kwargs to pass when creating the STS client, see ``assume_role``.
+    target_session_kwargs : Dict[str, Any], default=None
+        Keyword arguments to pass when creating the new target session, see ``assume_role``.
+    **assume_role_options
+        Other ``assume_role`` options, ie ``credential_cache``, ``metrics`` or ``resilience``.
+
+    Returns
+    -------
+    boto3.Session
+        The assumed role session with automatic credential refreshing.
+
+    Raises
+    ------
+    ForbiddenKWArgError
+        One of the kwargs function parameters includes a keyword argument that is not allowed for boto3-assume.
+    MissingKWArgError
+        One of the kwargs function parameters is missing a necessary keyword argument.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        from boto3_assume import assume_role_with_saml
+
+        assume_session = assume_role_with_saml(
+            assume_role_kwargs={
+                "RoleArn": "arn:aws:iam::123412341234:role/my_role",
+                "PrincipalArn": "arn:aws:iam::123412341234:saml-provider/my_idp"
+            },
+            saml_assertion=my_idp.get_assertion
         )
-    
-    if target_session_kwargs is None:
-        target_session_kwargs = {}
-    else:
-        _check_forbidden_keys(
-            name="target_session_kwargs",
-            kwargs=target_session_kwargs,
-            forbidden_keys=[
-                "aws_access_key_id",
-                "aws_secret_access_key",
-                "aws_session_token",
-                "botocore_session",
-                "profile_name"
+    """
+    _check_forbidden_keys(name="assume_role_kwargs", kwargs=assume_role_kwargs, forbidden_keys=["SAMLAssertion"])
+    sts_client_kwargs, target_session_kwargs = _validate_kwargs(
+        assume_role_kwargs=assume_role_kwargs,
+        sts_client_kwargs=sts_client_kwargs,
+        target_session_kwargs=target_session_kwargs,
+        required_keys=("RoleArn", "PrincipalArn")
+    )
+
+    return _build_assume_session(
+        refresh_class=AssumeRoleWithSAMLRefresh,
+        refresh_kwargs={"saml_assertion": saml_assertion},
+        method="sts-assume-role-with-saml",
+        source_session=boto3.Session() if source_session is None else source_session,
+        assume_role_kwargs=assume_role_kwargs,
+        sts_client_kwargs=_unsigned_sts_client_kwargs(sts_client_kwargs),
+        target_session_kwargs=target_session_kwargs,
+        **assume_role_options
+    )
+
+
+def warm(
+    assume_session: boto3.Session,
+    background: bool = False
+) -> Optional["Future[None]"]:
+    """Fetch the credentials of an assume role session before its first API call.
+
+    Parameters
+    ----------
+    assume_session : boto3.Session
+        Session to fetch credentials for, ie from ``assume_role``.
+    background : bool, default=False
+        Fetch the credentials on a background thread and return a ``Future`` instead of waiting for them.
+
+    Returns
+    -------
+    Optional[Future[None]]
+        When ``background`` is ``True``, a future that completes once the credentials are fetched, 
+        and raises the error from STS if they could not be.
+
+    Raises
+    ------
+    botocore.exceptions.ClientError
+        STS failed to return credentials when ``background`` is ``False``.
+
+    Examples
+    --------
+    Start fetching credentials at startup, and wait for them before serving requests:
+
+    .. code-block:: python
+
+        import boto3
+        from boto3_assume import assume_role, warm
+
+        assume_session = assume_role(
+            source_session=boto3.Session(),
+            assume_role_kwargs={
+                "RoleArn": "arn:aws:iam::123412341234:role/my_role",
+                "RoleSessionName": "my-role-session"
+            }
+        )
+        warm_future = warm(assume_session, background=True)
+        ...
+        warm_future.result()
+    """
+    if not background:
+        assume_session.get_credentials().get_frozen_credentials()
+        return None
+
+    future: "Future[None]" = Future()
+
+    def fetch() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            assume_session.get_credentials().get_frozen_credentials()
+        except BaseException as error:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+    threading.Thread(target=fetch, name="boto3-assume-warm", daemon=True).start()
+
+    return future
+
+
+_ROLE_CHAINING_MAX_DURATION = 60 * 60
+
+
+def assume_role_chain(
+    source_session: boto3.Session,
+    assume_role_kwargs_list: List[Dict[str, Any]],
+    sts_client_kwargs: Dict[str, Any] = None,
+    target_session_kwargs: Dict[str, Any] = None,
+    cache_clients: bool = False,
+    **assume_role_options
+) -> boto3.Session:
+    """Generate a ``boto3`` session by assuming a chain of roles, ie source -> hub role -> spoke role.
+
+    Each hop in the chain is its own assume role session with its own credentials, 
+    and each hop only refreshes when its own credentials need refreshing.
+
+    AWS limits role chaining sessions to 1 hour, so ``DurationSeconds`` is lowered to 3600 for every hop after the first.
+
+    Parameters
+    ----------
+    source_session : boto3.Session
+        Source session to assume the first role from. Must be a session that will automatically refresh its own credentials.
+    assume_role_kwargs_list : List[Dict[str, Any]]
+        ``assume_role_kwargs`` for each hop in the chain, in order, see ``assume_role``.
+    sts_client_kwargs : Dict[str, Any], default=None
+        Kwargs to pass when creating the STS client for every hop, see ``assume_role``.
+    target_session_kwargs : Dict[str, Any], default=None
+        Keyword arguments to pass when creating the final target session, see ``assume_role``.
+        Only ``region_name`` is passed to the sessions for the hops in between.
+    cache_clients : bool, default=False
+        Reuse the clients and resources the returned session creates, see ``assume_role``.
+    **assume_role_options
+        Other ``assume_role`` options used for every hop, ie ``credential_cache``, ``metrics`` or ``share_loader``.
+
+    Returns
+    -------
+    boto3.Session
+        The assumed role session for the last role in the chain.
+
+    Raises
+    ------
+    ForbiddenKWArgError
+        One of the kwargs function parameters includes a keyword argument that is not allowed for boto3-assume.
+    MissingKWArgError
+        One of the kwargs function parameters is missing a necessary keyword argument, or ``assume_role_kwargs_list`` is empty.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import boto3
+        from boto3_assume import assume_role_chain
+
+        assume_session = assume_role_chain(
+            source_session=boto3.Session(),
+            assume_role_kwargs_list=[
+                {
+                    "RoleArn": "arn:aws:iam::123412341234:role/hub_role",
+                    "RoleSessionName": "my-hub-session"
+                },
+                {
+                    "RoleArn": "arn:aws:iam::432143214321:role/spoke_role",
+                    "RoleSessionName": "my-spoke-session"
+                }
             ]
         )
-    
-    assume_sess = boto3.Session(**target_session_kwargs)
-    assume_sess._session._credentials = DeferredRefreshableCredentials(
-        refresh_using=AssumeRefresh(
+    """
+    if not assume_role_kwargs_list:
+        raise MissingKWArgError("assume_role_kwargs_list must include at least one role.")
+
+    hop_session_kwargs = {}
+    if target_session_kwargs is not None and "region_name" in target_session_kwargs:
+        hop_session_kwargs["region_name"] = target_session_kwargs["region_name"]
+
+    assume_sess = source_session
+    for hop, assume_role_kwargs in enumerate(assume_role_kwargs_list):
+        if hop > 0 and assume_role_kwargs.get("DurationSeconds", 0) > _ROLE_CHAINING_MAX_DURATION:
+            assume_role_kwargs = {**assume_role_kwargs, "DurationSeconds": _ROLE_CHAINING_MAX_DURATION}
+
+        is_last_hop = hop == len(assume_role_kwargs_list) - 1
+        assume_sess = assume_role(
+            source_session=assume_sess,
+            assume_role_kwargs=assume_role_kwargs,
+            sts_client_kwargs=sts_client_kwargs,
+            target_session_kwargs=target_session_kwargs if is_last_hop else hop_session_kwargs,
+            cache_clients=cache_clients if is_last_hop else False,
+            **assume_role_options
+        )
+
+    return assume_sess
+
+
+class _AdaptiveBackoff:
+    """Delay shared between workers that grows while STS is throttling and shrinks again on success.
+    """
+
+    def __init__(self, base: float, maximum: float):
+        self._base = base
+        self._maximum = maximum
+        self._delay = 0.0
+        self._lock = threading.Lock()
+
+
+    def wait(self) -> None:
+        delay = self._delay
+        if delay > 0:
+            time.sleep(random.uniform(delay / 2, delay))
+
+
+    def throttled(self) -> None:
+        with self._lock:
+            self._delay = min(self._maximum, max(self._base, self._delay * 2))
+
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self._delay = self._delay / 2 if self._delay > self._base else 0.0
+
+
+def _prefetch_credentials(
+    assume_sess: boto3.Session,
+    max_attempts: int,
+    backoff: _AdaptiveBackoff
+) -> None:
+    for attempt in range(1, max_attempts + 1):
+        backoff.wait()
+        try:
+            assume_sess.get_credentials().get_frozen_credentials()
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") not in _THROTTLING_ERROR_CODES or attempt == max_attempts:
+                raise
+
+            backoff.throttled()
+        else:
+            backoff.succeeded()
+            return
+
+
+def warm_sessions(
+    assume_sessions: Dict[Hashable, boto3.Session],
+    max_workers: int = 10,
+    max_attempts: int = 5,
+    backoff_base: float = 0.5,
+    backoff_max: float = 20.0
+) -> Dict[Hashable, Exception]:
+    """Fetch the credentials of many assume role sessions concurrently, ie at service startup.
+
+    Parameters
+    ----------
+    assume_sessions : Dict[Hashable, boto3.Session]
+        Sessions to fetch credentials for, keyed by any name you like.
+    max_workers : int, default=10
+        Maximum number of threads fetching credentials at the same time.
+    max_attempts : int, default=5
+        Maximum number of attempts to fetch credentials for a session when STS is throttling.
+    backoff_base : float, default=0.5
+        Delay in seconds that all workers wait after STS starts throttling.
+        The delay doubles on every throttling error and halves again on every success.
+    backoff_max : float, default=20.0
+        Maximum delay in seconds that workers wait between calls while STS is throttling.
+
+    Returns
+    -------
+    Dict[Hashable, Exception]
+        The errors for the sessions whose credentials could not be fetched, with the same keys as ``assume_sessions``.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import boto3
+        from boto3_assume import assume_role, warm_sessions
+
+        source_session = boto3.Session()
+        assume_sessions = {
+            account_id: assume_role(
+                source_session=source_session,
+                assume_role_kwargs={
+                    "RoleArn": f"arn:aws:iam::{account_id}:role/my_role",
+                    "RoleSessionName": "my-role-session"
+                }
+            )
+            for account_id in ["123412341234", "432143214321"]
+        }
+        errors = warm_sessions(assume_sessions)
+    """
+    errors: Dict[Hashable, Exception] = {}
+    backoff = _AdaptiveBackoff(base=backoff_base, maximum=backoff_max)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            key: executor.submit(
+                _prefetch_credentials,
+                assume_sess=assume_sess,
+                max_attempts=max_attempts,
+                backoff=backoff
+            )
+            for key, assume_sess in assume_sessions.items()
+        }
+        for key, future in futures.items():
+            error = future.exception()
+            if error is not None:
+                errors[key] = error
+
+    return errors
+
+
+def assume_roles(
+    source_session: boto3.Session,
+    assume_role_kwargs_list: List[Dict[str, Any]],
+    sts_client_kwargs: Dict[str, Any] = None,
+    target_session_kwargs: Dict[str, Any] = None,
+    sts_client_pool: Optional[STSClientPool] = None,
+    prefetch: bool = False,
+    max_workers: int = 10,
+    max_attempts: int = 5,
+    backoff_base: float = 0.5,
+    backoff_max: float = 20.0,
+    **assume_role_options
+) -> Tuple[Dict[int, boto3.Session], Dict[int, Exception]]:
+    """Generate many assume role ``boto3`` sessions at once, optionally fetching their credentials concurrently.
+
+    Parameters
+    ----------
+    source_session : boto3.Session
+        Source session to assume the roles from. Must be a session that will automatically refresh its own credentials.
+    assume_role_kwargs_list : List[Dict[str, Any]]
+        ``assume_role_kwargs`` for each role to assume, see ``assume_role``.
+        The same role can be in the list more than once, ie with a different ``RoleSessionName`` or ``Policy``.
+    sts_client_kwargs : Dict[str, Any], default=None
+        Kwargs to pass when creating the STS client, see ``assume_role``.
+    target_session_kwargs : Dict[str, Any], default=None
+        Keyword arguments to pass when creating each target session, see ``assume_role``.
+    sts_client_pool : Optional[STSClientPool], default=None
+        Pool to share STS clients between sessions, see ``assume_role``.
+        By default a new pool is created for the batch, so all of the sessions share one STS client.
+    prefetch : bool, default=False
+        Fetch the credentials for every session before returning, instead of on the first API call.
+        Sessions whose credentials could not be fetched are returned in the errors instead.
+    max_workers : int, default=10
+        Maximum number of threads fetching credentials at the same time when ``prefetch`` is ``True``.
+    max_attempts : int, default=5
+        Maximum number of attempts to fetch credentials for a role when STS is throttling.
+    backoff_base : float, default=0.5
+        Delay in seconds that all workers wait after STS starts throttling.
+        The delay doubles on every throttling error and halves again on every success.
+    backoff_max : float, default=20.0
+        Maximum delay in seconds that workers wait between calls while STS is throttling.
+    **assume_role_options
+        Other ``assume_role`` options used for every session, ie ``credential_cache``, ``metrics`` or ``share_loader``.
+
+    Returns
+    -------
+    Tuple[Dict[int, boto3.Session], Dict[int, Exception]]
+        The assumed role sessions and the errors from fetching credentials,
+        both keyed by the index of their ``assume_role_kwargs`` in ``assume_role_kwargs_list``.
+
+    Raises
+    ------
+    ForbiddenKWArgError
+        One of the kwargs function parameters includes a keyword argument that is not allowed for boto3-assume.
+    MissingKWArgError
+        One of the kwargs function parameters is missing a necessary keyword argument.
+
+    Examples
+    --------
+    Assume the same role in many accounts and fetch all of the credentials up front:
+
+    .. code-block:: python
+
+        import boto3
+        from boto3_assume import assume_roles
+
+        account_ids = ["123412341234", "432143214321"]
+        sessions, errors = assume_roles(
+            source_session=boto3.Session(),
+            assume_role_kwargs_list=[
+                {
+                    "RoleArn": f"arn:aws:iam::{account_id}:role/my_role",
+                    "RoleSessionName": "my-role-session"
+                }
+                for account_id in account_ids
+            ],
+            prefetch=True
+        )
+        account_sessions = {account_ids[i]: assume_session for i, assume_session in sessions.items()}
+    """
+    if sts_client_pool is None:
+        sts_client_pool = STSClientPool()
+
+    assume_sessions: Dict[int, boto3.Session] = {}
+    for i, assume_role_kwargs in enumerate(assume_role_kwargs_list):
+        assume_sessions[i] = assume_role(
             source_session=source_session,
+            assume_role_kwargs=assume_role_kwargs,
             sts_client_kwargs=sts_client_kwargs,
-            assume_role_kwargs=assume_role_kwargs
-        ).refresh,
-        method="sts-assume-role"
+            target_session_kwargs=target_session_kwargs,
+            sts_client_pool=sts_client_pool,
+            **assume_role_options
+        )
+
+    if not prefetch:
+        return assume_sessions, {}
+
+    errors = warm_sessions(
+        assume_sessions=assume_sessions,
+        max_workers=max_workers,
+        max_attempts=max_attempts,
+        backoff_base=backoff_base,
+        backoff_max=backoff_max
     )
-    
-    return assume_sess
+    for i in errors:
+        del assume_sessions[i]
+
+    return assume_sessions, errors
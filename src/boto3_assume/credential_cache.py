@@ -0,0 +1,448 @@
+"""Credential caches that can be shared between assume role sessions.
+"""
+import collections
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None
+
+import boto3
+from botocore.utils import parse_timestamp
+
+from boto3_assume.single_flight import SingleFlight
+from boto3_assume.utils import register_fork_reset
+
+
+# botocore's advisory refresh window, cached credentials inside it would be refreshed again straight away
+_ADVISORY_REFRESH_TIMEOUT = 15 * 60
+
+
+def _utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _source_identity(source_session: boto3.Session) -> Optional[str]:
+    creds = source_session.get_credentials()
+    if creds is None:
+        return source_session.profile_name
+
+    return creds.get_frozen_credentials().access_key
+
+
+def credential_cache_key(
+    source_session: Optional[boto3.Session],
+    sts_client_kwargs: Dict[str, Any],
+    assume_role_kwargs: Dict[str, Any],
+    sts_operation: str = "assume_role"
+) -> str:
+    """Create a predictable cache key for an assume role call.
+
+    The key is a hash of the normalized ``assume_role_kwargs``, the STS region/endpoint and the identity of the source session,
+    so two sessions only share credentials when they would have received the same credentials from STS.
+
+    Parameters
+    ----------
+    source_session : Optional[boto3.Session]
+        Source session the role is assumed from, ``None`` for operations that do not use the source credentials.
+    sts_client_kwargs : Dict[str, Any]
+        Kwargs used to create the STS client.
+    assume_role_kwargs : Dict[str, Any]
+        Kwargs used to call ``assume_role``.
+    sts_operation : str, default="assume_role"
+        STS client method the credentials come from, ie ``assume_role_with_web_identity``.
+
+    Returns
+    -------
+    str
+        Hex digest that is safe to use as a dictionary key or file name.
+    """
+    key_data = {
+        "source_identity": None if source_session is None else _source_identity(source_session),
+        "sts_region_name": sts_client_kwargs.get("region_name"),
+        "sts_endpoint_url": sts_client_kwargs.get("endpoint_url"),
+        "assume_role_kwargs": assume_role_kwargs
+    }
+    # keys for assume_role are unchanged, so existing file caches stay valid
+    if sts_operation != "assume_role":
+        key_data["sts_operation"] = sts_operation
+
+    key_json = json.dumps(key_data, sort_keys=True, separators=(",", ":"), default=str)
+
+    return hashlib.sha1(key_json.encode("utf-8")).hexdigest()
+
+
+class BaseCredentialCache:
+    """Base class for credential caches that can be passed to ``assume_role``.
+    """
+
+    def get(self, key: str, min_remaining: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Get cached credentials if they are still fresh.
+
+        Parameters
+        ----------
+        key : str
+            Cache key from ``credential_cache_key``.
+        min_remaining : Optional[float], default=None
+            Seconds the credentials must have left to be fresh. By default the cache's own ``min_remaining``.
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            Credentials in the format returned by ``AssumeRefresh.refresh`` or ``None`` if there are no fresh credentials.
+        """
+        raise NotImplementedError("get()")
+
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Dict[str, Any]],
+        min_remaining: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Get cached credentials, or fetch and cache new ones.
+
+        Parameters
+        ----------
+        key : str
+            Cache key from ``credential_cache_key``.
+        fetch : Callable[[], Dict[str, Any]]
+            Function that retrieves new credentials from STS.
+        min_remaining : Optional[float], default=None
+            Seconds the cached credentials must have left to be used. By default the cache's own ``min_remaining``.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Credentials in the format returned by ``AssumeRefresh.refresh``.
+        """
+        raise NotImplementedError("get_or_fetch()")
+
+
+    def invalidate(self, key: str) -> None:
+        """Remove a set of credentials from the cache.
+
+        Parameters
+        ----------
+        key : str
+            Cache key from ``credential_cache_key``.
+        """
+        raise NotImplementedError("invalidate()")
+
+
+    def clear(self) -> None:
+        """Remove all credentials from the cache.
+        """
+        raise NotImplementedError("clear()")
+
+
+class CredentialCache(BaseCredentialCache):
+    """Thread safe, bounded, in memory cache of assumed role credentials.
+
+    Pass the same instance to multiple ``assume_role`` calls so that all sessions for the same role share
+    one set of temporary credentials and one refresh cycle.
+    Concurrent refreshes for the same key are collapsed into a single STS call.
+
+    Parameters
+    ----------
+    max_size : int, default=1024
+        Maximum number of credential sets to keep.
+        Expired entries are evicted first, then the least recently used.
+    min_remaining : int, default=900
+        Cached credentials are only handed out while they have more than this many seconds left before they expire,
+        unless the caller asks for another threshold.
+        Assume role sessions pass their own refresh windows, so this is only used by direct ``get`` and ``get_or_fetch`` calls.
+        The default matches botocore's advisory refresh window.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        min_remaining: int = _ADVISORY_REFRESH_TIMEOUT
+    ):
+        self._max_size = max_size
+        self._min_remaining = min_remaining
+        self._entries: "collections.OrderedDict[str, Dict[str, Any]]" = collections.OrderedDict()
+        self._expiry_times: Dict[str, datetime.datetime] = {}
+        self._single_flight = SingleFlight()
+        self._lock = threading.Lock()
+        register_fork_reset(self._reset_locks)
+
+
+    def _reset_locks(self) -> None:
+        # the lock may have been held by a thread that does not exist in a forked child
+        self._lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def _seconds_remaining(self, key: str) -> float:
+        return (self._expiry_times[key] - _utc_now()).total_seconds()
+
+
+    def _pop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._expiry_times.pop(key, None)
+
+
+    def _store(self, key: str, creds: Dict[str, Any]) -> None:
+        self._entries[key] = creds
+        self._entries.move_to_end(key)
+        self._expiry_times[key] = parse_timestamp(creds["expiry_time"])
+        if len(self._entries) <= self._max_size:
+            return
+
+        for expired_key in [k for k in self._entries if self._seconds_remaining(k) <= 0]:
+            self._pop(expired_key)
+
+        while len(self._entries) > self._max_size:
+            self._pop(next(iter(self._entries)))
+
+
+    def _get_fresh(self, key: str, min_remaining: Optional[float]) -> Optional[Dict[str, Any]]:
+        # precondition: self._lock is held
+        if key not in self._entries:
+            return None
+
+        seconds_remaining = self._seconds_remaining(key)
+        if seconds_remaining <= 0:
+            self._pop(key)
+            return None
+
+        # credentials too old for this caller may still be fresh enough for another one with a shorter refresh window
+        if seconds_remaining <= (self._min_remaining if min_remaining is None else min_remaining):
+            return None
+
+        self._entries.move_to_end(key)
+
+        return dict(self._entries[key])
+
+
+    def get(self, key: str, min_remaining: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Get cached credentials if they are still fresh.
+
+        Parameters
+        ----------
+        key : str
+            Cache key from ``credential_cache_key``.
+        min_remaining : Optional[float], default=None
+            Seconds the credentials must have left to be fresh. By default the cache's own ``min_remaining``.
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            Credentials in the format returned by ``AssumeRefresh.refresh`` or ``None`` if there are no fresh credentials.
+        """
+        with self._lock:
+            return self._get_fresh(key, min_remaining)
+
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Dict[str, Any]],
+        min_remaining: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Get cached credentials, or fetch and cache new ones.
+
+        Only one thread calls ``fetch`` for a key at a time,
+        any other threads asking for the same key wait for and share its result or error.
+
+        Parameters
+        ----------
+        key : str
+            Cache key from ``credential_cache_key``.
+        fetch : Callable[[], Dict[str, Any]]
+            Function that retrieves new credentials from STS.
+        min_remaining : Optional[float], default=None
+            Seconds the cached credentials must have left to be used. By default the cache's own ``min_remaining``.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Credentials in the format returned by ``AssumeRefresh.refresh``.
+        """
+        with self._lock:
+            creds = self._get_fresh(key, min_remaining)
+
+        if creds is None:
+            creds = self._single_flight.do(
+                key=key,
+                function=lambda: self._fetch_and_store(key=key, fetch=fetch, min_remaining=min_remaining)
+            )
+
+        return dict(creds)
+
+
+    def _fetch_and_store(
+        self,
+        key: str,
+        fetch: Callable[[], Dict[str, Any]],
+        min_remaining: Optional[float]
+    ) -> Dict[str, Any]:
+        with self._lock:
+            # another thread may have stored fresh credentials since this one looked
+            creds = self._get_fresh(key, min_remaining)
+
+        if creds is not None:
+            return creds
+
+        creds = fetch()
+        with self._lock:
+            self._store(key=key, creds=creds)
+
+        return creds
+
+
+    def invalidate(self, key: str) -> None:
+        """Remove a set of credentials from the cache.
+
+        Parameters
+        ----------
+        key : str
+            Cache key from ``credential_cache_key``.
+        """
+        with self._lock:
+            self._pop(key)
+
+
+    def clear(self) -> None:
+        """Remove all credentials from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._expiry_times.clear()
+
+
+class FileCredentialCache(BaseCredentialCache):
+    """Credential cache stored as files in a directory, so it can be shared between processes.
+
+    Similar to the AWS CLI's ``~/.aws/cli/cache``, this lets short lived processes skip the STS call on startup
+    when another process already has valid credentials for the same role.
+
+    - Files are written atomically and are only readable by the current user.
+    - A lock file per key makes sure only one process at a time calls STS for a role.
+      Locking uses ``fcntl`` and is skipped on platforms without it.
+
+    Parameters
+    ----------
+    directory : Optional[str], default=None
+        Directory to store the credentials in. Created if it does not exist.
+        By default ``~/.aws/boto3-assume/cache``.
+    min_remaining : int, default=900
+        Cached credentials are only used while they have more than this many seconds left before they expire,
+        unless the caller asks for another threshold, see ``CredentialCache``.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        min_remaining: int = _ADVISORY_REFRESH_TIMEOUT
+    ):
+        if directory is None:
+            directory = os.path.join(os.path.expanduser("~"), ".aws", "boto3-assume", "cache")
+
+        self._directory = directory
+        self._min_remaining = min_remaining
+
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self._directory, f"{key}.{extension}")
+
+
+    def _ensure_directory(self) -> None:
+        os.makedirs(self._directory, mode=0o700, exist_ok=True)
+
+
+    @contextlib.contextmanager
+    def _lock(self, key: str) -> Iterator[None]:
+        self._ensure_directory()
+        lock_fd = os.open(self._path(key, "lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+
+            yield
+        finally:
+            # closing the file releases the lock
+            os.close(lock_fd)
+
+
+    def _write(self, key: str, creds: Dict[str, Any]) -> None:
+        self._ensure_directory()
+        # mkstemp creates the file readable and writable only by the current user
+        temp_fd, temp_path = tempfile.mkstemp(dir=self._directory, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(temp_fd, "w") as temp_file:
+                json.dump(creds, temp_file)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+
+            os.replace(temp_path, self._path(key, "json"))
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_path)
+
+            raise
+
+
+    def get(self, key: str, min_remaining: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key, "json")) as creds_file:
+                creds = json.load(creds_file)
+
+            expiry_time = parse_timestamp(creds["expiry_time"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if (expiry_time - _utc_now()).total_seconds() <= (self._min_remaining if min_remaining is None else min_remaining):
+            return None
+
+        return creds
+
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Dict[str, Any]],
+        min_remaining: Optional[float] = None
+    ) -> Dict[str, Any]:
+        creds = self.get(key, min_remaining)
+        if creds is not None:
+            return creds
+
+        with self._lock(key):
+            # another process may have refreshed the credentials while we waited for the lock
+            creds = self.get(key, min_remaining)
+            if creds is not None:
+                return creds
+
+            creds = fetch()
+            self._write(key=key, creds=creds)
+
+            return creds
+
+
+    def invalidate(self, key: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path(key, "json"))
+
+
+    def clear(self) -> None:
+        if not os.path.isdir(self._directory):
+            return
+
+        for file_name in os.listdir(self._directory):
+            if file_name.endswith(".json"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self._directory, file_name))
@@ -2,16 +2,32 @@
 """
 __all__ = [
     "Boto3AssumeError",
+    "CredentialBrokerError",
     "ForbiddenKWArgError",
-    "MissingKWArgError"
+    "MissingKWArgError",
+    "RefreshCircuitOpenError",
+    "RefreshWindowError",
+    "RoleConfigError"
 ]
 class Boto3AssumeError(Exception):
     """Base exception for boto3-assume
     """
     pass
 
+class CredentialBrokerError(Boto3AssumeError):
+    pass
+
 class ForbiddenKWArgError(Boto3AssumeError):
     pass
 
 class MissingKWArgError(Boto3AssumeError):
-    pass
\ No newline at end of file
+    pass
+
+class RefreshCircuitOpenError(Boto3AssumeError):
+    pass
+
+class RefreshWindowError(Boto3AssumeError):
+    pass
+
+class RoleConfigError(Boto3AssumeError):
+    pass
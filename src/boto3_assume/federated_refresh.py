@@ -0,0 +1,83 @@
+"""Refresh credentials with ``AssumeRoleWithWebIdentity`` and ``AssumeRoleWithSAML``, using the same machinery as ``AssumeRefresh``.
+"""
+import os
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from botocore import UNSIGNED
+from botocore.config import Config
+
+from boto3_assume.assume_refresh import AssumeRefresh
+from boto3_assume.credential_cache import credential_cache_key
+
+
+# shared so pooled STS clients for the same kwargs are still shared
+_UNSIGNED_CONFIG = Config(signature_version=UNSIGNED)
+
+
+def _unsigned_sts_client_kwargs(sts_client_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    # these operations are authenticated by the token or assertion, not by the source session's credentials
+    config = sts_client_kwargs.get("config")
+    if config is None:
+        config = _UNSIGNED_CONFIG
+    else:
+        config = config.merge(_UNSIGNED_CONFIG)
+
+    return {**sts_client_kwargs, "config": config}
+
+
+class _FederatedRefresh(AssumeRefresh):
+
+    def _cache_key(self) -> str:
+        # the source session's credentials are not used, so they are not part of the key
+        return credential_cache_key(
+            source_session=None,
+            sts_client_kwargs=self._sts_client_kwargs,
+            assume_role_kwargs=self._assume_role_kwargs,
+            sts_operation=self._STS_OPERATION
+        )
+
+
+class AssumeRoleWithWebIdentityRefresh(_FederatedRefresh):
+    """Refresh credentials with ``AssumeRoleWithWebIdentity``, reading the token from a file.
+
+    The file is only read again when its modification time changes, ie when the kubelet rotates an EKS service account token.
+    """
+
+    _STS_OPERATION = "assume_role_with_web_identity"
+
+    def __init__(self, web_identity_token_file: str, **kwargs):
+        super().__init__(**kwargs)
+        self._web_identity_token_file = web_identity_token_file
+        self._web_identity_token: Optional[Tuple[int, str]] = None
+
+
+    def _read_web_identity_token(self) -> str:
+        mtime = os.stat(self._web_identity_token_file).st_mtime_ns
+        # the mtime and token are swapped in as one tuple, so concurrent refreshes always see a matching pair
+        web_identity_token = self._web_identity_token
+        if web_identity_token is None or web_identity_token[0] != mtime:
+            with open(self._web_identity_token_file) as token_file:
+                web_identity_token = (mtime, token_file.read().strip())
+
+            self._web_identity_token = web_identity_token
+
+        return web_identity_token[1]
+
+
+    def _sts_call_kwargs(self) -> Dict[str, Any]:
+        return {**self._assume_role_kwargs, "WebIdentityToken": self._read_web_identity_token()}
+
+
+class AssumeRoleWithSAMLRefresh(_FederatedRefresh):
+    """Refresh credentials with ``AssumeRoleWithSAML``, getting a new assertion for every STS call.
+    """
+
+    _STS_OPERATION = "assume_role_with_saml"
+
+    def __init__(self, saml_assertion: Callable[[], str], **kwargs):
+        super().__init__(**kwargs)
+        self._saml_assertion = saml_assertion
+
+
+    def _sts_call_kwargs(self) -> Dict[str, Any]:
+        return {**self._assume_role_kwargs, "SAMLAssertion": self._saml_assertion()}
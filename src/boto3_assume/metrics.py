@@ -0,0 +1,264 @@
+"""Instrumentation hooks for assume role credential refreshes.
+"""
+import bisect
+import socket
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from botocore.exceptions import ClientError
+
+
+def _error_code(error: Exception) -> str:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code", "Unknown")
+
+    return type(error).__name__
+
+
+class RefreshMetrics:
+    """Base class for receiving refresh events from assume role sessions.
+
+    Every method does nothing by default, subclass it and override the events you need.
+    Methods are called on the thread (or event loop) doing the refresh, so they should be quick and thread safe.
+    """
+
+    def on_refresh(self, role_arn: str, time_to_expiry: Optional[float]) -> None:
+        """Called every time botocore asks a session for new credentials.
+
+        Parameters
+        ----------
+        role_arn : str
+            Role being refreshed.
+        time_to_expiry : Optional[float]
+            Seconds the session's current credentials had left, ``None`` on the first refresh.
+        """
+        pass
+
+
+    def on_sts_call(self, role_arn: str, latency: float, error_code: Optional[str]) -> None:
+        """Called after every STS call.
+
+        Parameters
+        ----------
+        role_arn : str
+            Role that was assumed.
+        latency : float
+            Seconds the call took.
+        error_code : Optional[str]
+            AWS error code, or the exception class name for other errors. ``None`` if the call succeeded.
+        """
+        pass
+
+
+    def on_rate_limit(self, role_arn: str, wait: float, queue_depth: int) -> None:
+        """Called when an STS call gets through the ``STSRateLimiter``.
+
+        Parameters
+        ----------
+        role_arn : str
+            Role about to be assumed.
+        wait : float
+            Seconds the call waited for the limiter.
+        queue_depth : int
+            Number of other STS calls that were already waiting when this one started.
+        """
+        pass
+
+
+    def on_cache_hit(self, role_arn: str) -> None:
+        """Called when a refresh is served from the credential cache without calling STS.
+        """
+        pass
+
+
+    def on_cache_miss(self, role_arn: str) -> None:
+        """Called when a refresh has to call STS because the credential cache had nothing usable.
+        """
+        pass
+
+
+class InMemoryRefreshMetrics(RefreshMetrics):
+    """Aggregates refresh events in memory and renders them in the Prometheus text format.
+
+    Parameters
+    ----------
+    latency_buckets : Sequence[float]
+        Upper bounds in seconds of the STS latency and rate limit wait histogram buckets.
+    expiry_buckets : Sequence[float]
+        Upper bounds in seconds of the time to expiry at refresh histogram buckets.
+    """
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+        expiry_buckets: Sequence[float] = (0, 60, 300, 600, 900, 1800, 3600)
+    ):
+        self.latency_buckets: Tuple[float, ...] = tuple(sorted(latency_buckets))
+        self.expiry_buckets: Tuple[float, ...] = tuple(sorted(expiry_buckets))
+        self.refreshes: Dict[str, int] = {}
+        self.sts_calls: Dict[str, int] = {}
+        self.failures: Dict[Tuple[str, str], int] = {}
+        self.cache_hits: Dict[str, int] = {}
+        self.cache_misses: Dict[str, int] = {}
+        self.latency: Dict[str, List[float]] = {}
+        self.time_to_expiry: Dict[str, List[float]] = {}
+        self.rate_limit_wait: Dict[str, List[float]] = {}
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def _observe(histograms: Dict[str, List[float]], buckets: Tuple[float, ...], role_arn: str, value: float) -> None:
+        # precondition: self._lock is held
+        # each histogram is [count per bucket..., count above the last bucket, sum]
+        histogram = histograms.setdefault(role_arn, [0] * (len(buckets) + 2))
+        histogram[bisect.bisect_left(buckets, value)] += 1
+        histogram[-1] += value
+
+
+    def on_refresh(self, role_arn: str, time_to_expiry: Optional[float]) -> None:
+        with self._lock:
+            self.refreshes[role_arn] = self.refreshes.get(role_arn, 0) + 1
+            if time_to_expiry is not None:
+                self._observe(self.time_to_expiry, self.expiry_buckets, role_arn, time_to_expiry)
+
+
+    def on_sts_call(self, role_arn: str, latency: float, error_code: Optional[str]) -> None:
+        with self._lock:
+            self.sts_calls[role_arn] = self.sts_calls.get(role_arn, 0) + 1
+            self._observe(self.latency, self.latency_buckets, role_arn, latency)
+            if error_code is not None:
+                self.failures[(role_arn, error_code)] = self.failures.get((role_arn, error_code), 0) + 1
+
+
+    def on_rate_limit(self, role_arn: str, wait: float, queue_depth: int) -> None:
+        with self._lock:
+            self._observe(self.rate_limit_wait, self.latency_buckets, role_arn, wait)
+            self.queue_depth = queue_depth
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+
+    def on_cache_hit(self, role_arn: str) -> None:
+        with self._lock:
+            self.cache_hits[role_arn] = self.cache_hits.get(role_arn, 0) + 1
+
+
+    def on_cache_miss(self, role_arn: str) -> None:
+        with self._lock:
+            self.cache_misses[role_arn] = self.cache_misses.get(role_arn, 0) + 1
+
+
+    def _histogram_lines(self, name: str, buckets: Tuple[float, ...], histograms: Dict[str, List[float]]) -> List[str]:
+        lines = [f"# TYPE {name} histogram"]
+        for role_arn, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for upper_bound, count in zip(buckets, histogram):
+                cumulative += count
+                lines.append(f'{name}_bucket{{role_arn="{role_arn}",le="{upper_bound}"}} {cumulative}')
+
+            cumulative += histogram[-2]
+            lines.append(f'{name}_bucket{{role_arn="{role_arn}",le="+Inf"}} {cumulative}')
+            lines.append(f'{name}_sum{{role_arn="{role_arn}"}} {histogram[-1]}')
+            lines.append(f'{name}_count{{role_arn="{role_arn}"}} {cumulative}')
+
+        return lines
+
+
+    def prometheus_text(self, prefix: str = "boto3_assume") -> str:
+        """Render the metrics in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        prefix : str, default="boto3_assume"
+            Prefix for every metric name.
+
+        Returns
+        -------
+        str
+            Metrics to serve from a ``/metrics`` endpoint.
+        """
+        with self._lock:
+            lines = []
+            for name, counts in [
+                ("refreshes_total", self.refreshes),
+                ("sts_calls_total", self.sts_calls),
+                ("cache_hits_total", self.cache_hits),
+                ("cache_misses_total", self.cache_misses)
+            ]:
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                lines.extend(f'{prefix}_{name}{{role_arn="{role_arn}"}} {count}' for role_arn, count in sorted(counts.items()))
+
+            lines.append(f"# TYPE {prefix}_sts_failures_total counter")
+            lines.extend(
+                f'{prefix}_sts_failures_total{{role_arn="{role_arn}",error_code="{error_code}"}} {count}'
+                for (role_arn, error_code), count in sorted(self.failures.items())
+            )
+            lines.extend(self._histogram_lines(f"{prefix}_sts_latency_seconds", self.latency_buckets, self.latency))
+            lines.extend(self._histogram_lines(f"{prefix}_time_to_expiry_seconds", self.expiry_buckets, self.time_to_expiry))
+            lines.extend(self._histogram_lines(f"{prefix}_sts_rate_limit_wait_seconds", self.latency_buckets, self.rate_limit_wait))
+            lines.append(f"# TYPE {prefix}_sts_queue_depth gauge")
+            lines.append(f"{prefix}_sts_queue_depth {self.queue_depth}")
+            lines.append(f"# TYPE {prefix}_sts_queue_depth_max gauge")
+            lines.append(f"{prefix}_sts_queue_depth_max {self.max_queue_depth}")
+
+        return "\n".join(lines) + "\n"
+
+
+class StatsDRefreshMetrics(RefreshMetrics):
+    """Sends refresh events to a StatsD server over UDP.
+
+    Role ARNs are not included in the metric names to keep their number bounded.
+
+    Parameters
+    ----------
+    host : str, default="127.0.0.1"
+        StatsD host.
+    port : int, default=8125
+        StatsD port.
+    prefix : str, default="boto3_assume"
+        Prefix for every metric name.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8125,
+        prefix: str = "boto3_assume"
+    ):
+        self._address = (host, port)
+        self._prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+
+    def _send(self, metric: str) -> None:
+        try:
+            self._socket.sendto(f"{self._prefix}.{metric}".encode("utf-8"), self._address)
+        except OSError:
+            # metrics must never break a refresh
+            pass
+
+
+    def on_refresh(self, role_arn: str, time_to_expiry: Optional[float]) -> None:
+        self._send("refresh:1|c")
+        if time_to_expiry is not None:
+            self._send(f"time_to_expiry:{int(time_to_expiry * 1000)}|ms")
+
+
+    def on_sts_call(self, role_arn: str, latency: float, error_code: Optional[str]) -> None:
+        self._send(f"sts_latency:{int(latency * 1000)}|ms")
+        if error_code is not None:
+            self._send(f"sts_failure.{error_code}:1|c")
+
+
+    def on_rate_limit(self, role_arn: str, wait: float, queue_depth: int) -> None:
+        self._send(f"sts_rate_limit_wait:{int(wait * 1000)}|ms")
+        self._send(f"sts_queue_depth:{queue_depth}|g")
+
+
+    def on_cache_hit(self, role_arn: str) -> None:
+        self._send("cache_hit:1|c")
+
+
+    def on_cache_miss(self, role_arn: str) -> None:
+        self._send("cache_miss:1|c")
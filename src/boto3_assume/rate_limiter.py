@@ -0,0 +1,158 @@
+"""Client side rate limit for STS calls, shared by every assume role session in a process.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from boto3_assume.utils import register_fork_reset
+
+
+class STSRateLimiter:
+    """Thread safe token bucket that STS calls wait on before they are sent.
+
+    Pass the same limiter to every ``assume_role`` call to keep the whole process under the STS request rate limit,
+    instead of tripping throttling and letting botocore's retries make it worse.
+    Waiting calls are let through in priority order, refreshes of the credentials closest to expiry first,
+    and first time fetches, which have no credentials to lose, last.
+
+    Parameters
+    ----------
+    rate : float, default=10.0
+        STS calls per second allowed on average.
+    burst : int, default=10
+        STS calls allowed at once after the limiter has been idle.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 10):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[float, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        # futures of waiting coroutines and their event loops, woken up alongside the waiting threads
+        self._async_waiters: Dict[asyncio.Future, asyncio.AbstractEventLoop] = {}
+        register_fork_reset(self._reset)
+
+
+    def _reset(self) -> None:
+        # the waiting threads do not exist in a forked child, and the lock may have been held by one of them
+        self._waiters = []
+        self._async_waiters = {}
+        self._condition = threading.Condition()
+
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of STS calls waiting for the limiter.
+        """
+        return len(self._waiters)
+
+
+    def _refill(self) -> None:
+        # precondition: self._condition is held
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+    def _notify_all(self) -> None:
+        # precondition: self._condition is held
+        self._condition.notify_all()
+        for future, loop in self._async_waiters.items():
+            loop.call_soon_threadsafe(_wake_up, future)
+
+
+    def _entry(self, time_to_expiry: Optional[float]) -> Tuple[float, int]:
+        priority = float("inf") if time_to_expiry is None else time_to_expiry
+        return (priority, next(self._sequence))
+
+
+    def _take_token(self, entry: Tuple[float, int]) -> Optional[float]:
+        # precondition: self._condition is held
+        # returns None when the token was taken, otherwise how long to wait before trying again, inf until notified
+        self._refill()
+        if self._waiters[0] != entry:
+            return float("inf")
+
+        if self._tokens < 1:
+            return (1 - self._tokens) / self._rate
+
+        heapq.heappop(self._waiters)
+        self._tokens -= 1
+        # the next waiter in line becomes the head
+        self._notify_all()
+        return None
+
+
+    def acquire(self, time_to_expiry: Optional[float] = None) -> float:
+        """Wait until an STS call is allowed.
+
+        Parameters
+        ----------
+        time_to_expiry : Optional[float], default=None
+            Seconds the caller's current credentials have left, calls with less time left go first.
+            ``None`` for a first time fetch, which goes after every refresh.
+
+        Returns
+        -------
+        float
+            Seconds spent waiting.
+        """
+        start = time.monotonic()
+        entry = self._entry(time_to_expiry)
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            while True:
+                wait = self._take_token(entry)
+                if wait is None:
+                    return time.monotonic() - start
+
+                self._condition.wait(None if wait == float("inf") else wait)
+
+
+    async def acquire_async(self, time_to_expiry: Optional[float] = None) -> float:
+        """Wait until an STS call is allowed without blocking the event loop, see ``acquire``.
+
+        Sync and async sessions share the same bucket and queue.
+        The coroutine waits on a future of its own event loop, so waiting does not hold an executor thread.
+        """
+        start = time.monotonic()
+        entry = self._entry(time_to_expiry)
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+
+        try:
+            while True:
+                future = loop.create_future()
+                with self._condition:
+                    wait = self._take_token(entry)
+                    if wait is None:
+                        return time.monotonic() - start
+
+                    self._async_waiters[future] = loop
+
+                try:
+                    await asyncio.wait([future], timeout=None if wait == float("inf") else wait)
+                finally:
+                    with self._condition:
+                        self._async_waiters.pop(future, None)
+        except BaseException:
+            # a cancelled waiter leaves the queue, so the ones behind it are not stuck
+            with self._condition:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._notify_all()
+
+            raise
+
+
+def _wake_up(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,113 @@
+"""Keep serving valid credentials while STS is slow or failing.
+"""
+import random
+import threading
+import time
+from typing import Optional
+
+
+class ResiliencePolicy:
+    """Stale while revalidate settings for assume role sessions.
+
+    While the current credentials are still valid, API calls never wait on STS or see its errors.
+    Refreshes happen on a background thread, retried with exponential backoff,
+    and a circuit breaker stops calling STS for a while after repeated failures.
+    Errors are only raised to API calls once the credentials have actually expired.
+
+    Parameters
+    ----------
+    backoff_base : float, default=1.0
+        Seconds to wait before retrying the first failed refresh. Doubles on every failure.
+    backoff_max : float, default=60.0
+        Maximum seconds to wait between refresh attempts.
+    failure_threshold : int, default=5
+        Consecutive failed refreshes that open the circuit breaker.
+    reset_timeout : float, default=30.0
+        Seconds the circuit breaker stays open before letting one refresh through to test STS again.
+        While it is open, API calls with expired credentials fail immediately with ``RefreshCircuitOpenError``.
+    """
+
+    def __init__(
+        self,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait after the failed refresh ``attempt``, starting at 0, with jitter.
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+
+        return random.uniform(delay / 2, delay)
+
+
+class _CircuitBreaker:
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.last_error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a call through, 0 if it is closed.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+
+            return max(0.0, self._opened_at + self._reset_timeout - time.monotonic())
+
+
+    def allow(self) -> bool:
+        """Whether a call may go to STS.
+
+        Once the reset timeout has passed only one caller is let through as the probe,
+        the rest are refused until it records a success or failure, or releases the probe.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+
+            if self._probing or time.monotonic() < self._opened_at + self._reset_timeout:
+                return False
+
+            self._probing = True
+
+            return True
+
+
+    def release_probe(self) -> None:
+        """Let another caller probe after a call that neither succeeded nor failed.
+        """
+        with self._lock:
+            self._probing = False
+
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+            self.last_error = None
+
+
+    def record_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            self.last_error = error
+            # when half open a single failure opens the breaker again
+            if self._failures >= self._failure_threshold:
+                self._opened_at = time.monotonic()
@@ -0,0 +1,310 @@
+"""Resolve assume role credentials for named profiles from a role config file, through botocore's credential resolver.
+"""
+import configparser
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import boto3
+import botocore.session
+from botocore.credentials import CredentialProvider, RefreshableCredentials
+
+from boto3_assume.core import _ROLE_CHAINING_MAX_DURATION, assume_role
+from boto3_assume.exceptions import ForbiddenKWArgError, RoleConfigError
+
+
+# role config keys and the assume_role_kwargs they map to
+_ASSUME_ROLE_KEYS = {
+    "role_arn": "RoleArn",
+    "role_session_name": "RoleSessionName",
+    "duration_seconds": "DurationSeconds",
+    "external_id": "ExternalId",
+    "source_identity": "SourceIdentity"
+}
+
+
+class _RoleProfile(NamedTuple):
+    assume_role_kwargs: Dict[str, Any]
+    source_profile: Optional[str]
+    region: Optional[str]
+
+
+def _profile_name(section: str) -> Optional[str]:
+    if section.startswith("profile "):
+        return section[len("profile "):].strip()
+
+    # the credentials file style, and the AWS config default profile
+    if " " not in section:
+        return section
+
+    return None
+
+
+def _parse_profile(profile_name: str, section: configparser.SectionProxy) -> _RoleProfile:
+    assume_role_kwargs = {
+        kwarg: section[key]
+        for key, kwarg in _ASSUME_ROLE_KEYS.items()
+        if key in section
+    }
+    assume_role_kwargs.setdefault("RoleSessionName", f"boto3-assume-{int(time.time())}")
+    if "DurationSeconds" in assume_role_kwargs:
+        try:
+            assume_role_kwargs["DurationSeconds"] = int(assume_role_kwargs["DurationSeconds"])
+        except ValueError:
+            raise RoleConfigError(f"duration_seconds for profile '{profile_name}' must be an integer.")
+
+    return _RoleProfile(
+        assume_role_kwargs=assume_role_kwargs,
+        source_profile=section.get("source_profile"),
+        region=section.get("region")
+    )
+
+
+class RoleConfig:
+    """Role map parsed once from a config file, that hands out one shared set of refreshable credentials per profile.
+
+    The file uses the AWS config file format, so it can be a separate file or ``~/.aws/config`` itself.
+    Use ``session`` to create sessions for the profiles in a separate file,
+    botocore only knows the profiles in its own config file, so ``boto3.Session(profile_name=...)`` raises ``ProfileNotFound`` for them.
+    Every profile with a ``role_arn`` is a role profile and supports the keys
+    ``role_arn``, ``role_session_name``, ``duration_seconds``, ``external_id``, ``source_identity``, ``source_profile`` and ``region``.
+
+    A ``source_profile`` that is another role profile in the file makes a role chain.
+    Any other ``source_profile`` is loaded with ``boto3.Session(profile_name=source_profile)``,
+    and profiles without one assume their role from ``source_session``.
+
+    Credentials for a profile are created on first use and then shared by every session that uses the profile,
+    so looking a profile up again is a dictionary lookup and does not parse config or call STS.
+
+    Parameters
+    ----------
+    path : str
+        Path of the role config file.
+    source_session : Optional[boto3.Session], default=None
+        Session to assume roles from for profiles without a ``source_profile``.
+        By default a new ``boto3.Session()``.
+    **assume_role_options
+        Other keyword arguments passed to ``assume_role`` for every profile, ie ``credential_cache`` or ``metrics``.
+
+    Raises
+    ------
+    ForbiddenKWArgError
+        ``assume_role_options`` includes an option that the role config sets itself.
+    RoleConfigError
+        The file can not be parsed, has an invalid value, or has a ``source_profile`` loop.
+
+    Examples
+    --------
+    .. code-block:: ini
+
+        [profile hub]
+        role_arn = arn:aws:iam::123412341234:role/hub_role
+
+        [profile spoke]
+        role_arn = arn:aws:iam::432143214321:role/spoke_role
+        source_profile = hub
+        duration_seconds = 900
+
+    .. code-block:: python
+
+        from boto3_assume import RoleConfig
+
+        role_config = RoleConfig("/etc/my-app/roles.ini")
+        spoke_session = role_config.session("spoke")
+    """
+
+    def __init__(
+        self,
+        path: str,
+        source_session: Optional[boto3.Session] = None,
+        **assume_role_options
+    ):
+        for forbidden_key in ["source_session", "assume_role_kwargs", "target_session_kwargs"]:
+            if forbidden_key in assume_role_options:
+                raise ForbiddenKWArgError(f"'{forbidden_key}' can not be passed to RoleConfig as an assume_role option.")
+
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            with open(path) as config_file:
+                parser.read_file(config_file)
+        except (OSError, configparser.Error) as error:
+            raise RoleConfigError(f"Could not read role config '{path}': {error}")
+
+        self._profiles: Dict[str, _RoleProfile] = {}
+        for section in parser.sections():
+            profile_name = _profile_name(section)
+            if profile_name is not None and "role_arn" in parser[section]:
+                self._profiles[profile_name] = _parse_profile(profile_name, parser[section])
+
+        for profile_name in self._profiles:
+            self._check_chain(profile_name)
+
+        self._source_session = source_session
+        self._assume_role_options = assume_role_options
+        self._credentials: Dict[str, RefreshableCredentials] = {}
+        self._source_sessions: Dict[str, boto3.Session] = {}
+        self._lock = threading.RLock()
+
+
+    def __contains__(self, profile_name: str) -> bool:
+        return profile_name in self._profiles
+
+
+    @property
+    def profiles(self) -> List[str]:
+        """Names of the role profiles in the config.
+        """
+        return list(self._profiles)
+
+
+    def _check_chain(self, profile_name: str) -> None:
+        seen = [profile_name]
+        source_profile = self._profiles[profile_name].source_profile
+        while source_profile in self._profiles:
+            if source_profile in seen:
+                raise RoleConfigError(f"source_profile loop: {' -> '.join([*seen, source_profile])}")
+
+            seen.append(source_profile)
+            source_profile = self._profiles[source_profile].source_profile
+
+
+    def _source_session_for(self, role_profile: _RoleProfile) -> boto3.Session:
+        source_profile = role_profile.source_profile
+        if source_profile is None:
+            if self._source_session is None:
+                self._source_session = boto3.Session()
+
+            return self._source_session
+
+        if source_profile in self._profiles:
+            return self.session(source_profile)
+
+        if source_profile not in self._source_sessions:
+            self._source_sessions[source_profile] = boto3.Session(profile_name=source_profile)
+
+        return self._source_sessions[source_profile]
+
+
+    def credentials(self, profile_name: str) -> RefreshableCredentials:
+        """Shared refreshable credentials for a role profile, created on first use.
+
+        Parameters
+        ----------
+        profile_name : str
+            Name of the role profile.
+
+        Returns
+        -------
+        RefreshableCredentials
+            The credentials for the profile, the same object every time.
+
+        Raises
+        ------
+        RoleConfigError
+            ``profile_name`` is not a role profile in the config.
+        """
+        credentials = self._credentials.get(profile_name)
+        if credentials is not None:
+            return credentials
+
+        if profile_name not in self._profiles:
+            raise RoleConfigError(f"Profile '{profile_name}' is not a role profile in the role config.")
+
+        with self._lock:
+            if profile_name not in self._credentials:
+                role_profile = self._profiles[profile_name]
+                assume_role_kwargs = role_profile.assume_role_kwargs
+                if (
+                    role_profile.source_profile in self._profiles
+                    and assume_role_kwargs.get("DurationSeconds", 0) > _ROLE_CHAINING_MAX_DURATION
+                ):
+                    assume_role_kwargs = {**assume_role_kwargs, "DurationSeconds": _ROLE_CHAINING_MAX_DURATION}
+
+                assume_sess = assume_role(
+                    source_session=self._source_session_for(role_profile),
+                    assume_role_kwargs=assume_role_kwargs,
+                    **self._assume_role_options
+                )
+                self._credentials[profile_name] = assume_sess._session._credentials
+
+        return self._credentials[profile_name]
+
+
+    def session(self, profile_name: str, region_name: Optional[str] = None) -> boto3.Session:
+        """Create a ``boto3`` session that uses the shared credentials for a role profile.
+
+        Parameters
+        ----------
+        profile_name : str
+            Name of the role profile.
+        region_name : Optional[str], default=None
+            Region for the session. By default the profile's ``region``.
+
+        Returns
+        -------
+        boto3.Session
+            New session with the profile's shared credentials.
+
+        Raises
+        ------
+        RoleConfigError
+            ``profile_name`` is not a role profile in the config.
+        """
+        credentials = self.credentials(profile_name)
+        if region_name is None:
+            region_name = self._profiles[profile_name].region
+
+        botocore_session = botocore.session.get_session()
+        botocore_session._credentials = credentials
+
+        return boto3.Session(botocore_session=botocore_session, region_name=region_name)
+
+
+    def register(self, session: boto3.Session) -> None:
+        """Add a ``RoleConfigProvider`` to the front of a session's credential resolver.
+
+        The session resolves its credentials from this role config when its profile is a role profile,
+        and falls back to the rest of botocore's resolver chain otherwise.
+        Register the provider before the session first loads its credentials.
+
+        boto3 checks the profile against botocore's config file when the session is created, so this only works
+        when the role profiles are in that file too, ie the role config is ``~/.aws/config`` or ``AWS_CONFIG_FILE``.
+        For a separate role config file use ``session`` instead.
+
+        Parameters
+        ----------
+        session : boto3.Session
+            Session to add the provider to.
+        """
+        resolver = session._session.get_component("credential_provider")
+        # botocore leaves the env provider out when the session has an explicit profile, so put it first instead of before "env"
+        resolver.providers.insert(0, RoleConfigProvider(role_config=self, botocore_session=session._session))
+
+
+class RoleConfigProvider(CredentialProvider):
+    """botocore credential provider that loads the shared credentials for the session's profile from a ``RoleConfig``.
+
+    Usually added to a session with ``RoleConfig.register``.
+
+    Parameters
+    ----------
+    role_config : RoleConfig
+        Role config to load the credentials from.
+    botocore_session : botocore.session.Session
+        Session whose profile is looked up.
+    """
+
+    METHOD = "boto3-assume-role-config"
+    CANONICAL_NAME = "boto3-assume-role-config"
+
+    def __init__(self, role_config: RoleConfig, botocore_session: botocore.session.Session):
+        super().__init__(session=botocore_session)
+        self._role_config = role_config
+
+
+    def load(self) -> Optional[RefreshableCredentials]:
+        profile_name = self.session.profile
+        if profile_name is None or profile_name not in self._role_config:
+            return None
+
+        return self._role_config.credentials(profile_name)
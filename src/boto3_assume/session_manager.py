@@ -0,0 +1,185 @@
+"""Hand out assume role sessions for many accounts from a bounded pool.
+"""
+import collections
+import threading
+from typing import Any, Dict, Hashable, Optional
+
+import boto3
+
+from boto3_assume.core import assume_role
+from boto3_assume.credential_cache import BaseCredentialCache, CredentialCache
+from boto3_assume.exceptions import ForbiddenKWArgError
+from boto3_assume.single_flight import SingleFlight
+from boto3_assume.sts_client_pool import STSClientPool
+from boto3_assume.utils import hashable_kwargs
+
+
+class AssumeRoleSessionManager:
+    """Thread safe, bounded LRU of assume role sessions, created on demand with ``assume_role``.
+
+    Every session shares one ``STSClientPool`` and one credential cache.
+    When a cold session is evicted its credentials stay in the cache,
+    so creating the session again later does not call STS until the credentials need refreshing.
+    Sessions whose credentials have expired are dropped whenever a new session is created,
+    so idle accounts do not keep a session, its clients and its refresher alive until they are evicted.
+
+    Parameters
+    ----------
+    source_session : boto3.Session
+        Source session to assume the roles from. Must be a session that will automatically refresh its own credentials.
+    max_sessions : int, default=128
+        Maximum number of sessions to keep. The least recently used session is evicted first.
+    sts_client_kwargs : Dict[str, Any], default=None
+        Kwargs to pass when creating the STS client, see ``assume_role``.
+    target_session_kwargs : Dict[str, Any], default=None
+        Keyword arguments to pass when creating each session, see ``assume_role``.
+    credential_cache : Optional[BaseCredentialCache], default=None
+        Cache shared by every session. By default a ``CredentialCache`` 8 times the size of ``max_sessions``.
+    sts_client_pool : Optional[STSClientPool], default=None
+        Pool shared by every session. By default a new pool, so all of the sessions share one STS client.
+    **assume_role_options
+        Other keyword arguments passed to ``assume_role`` for every session, ie ``metrics`` or ``resilience``.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import boto3
+        from boto3_assume import AssumeRoleSessionManager
+
+        manager = AssumeRoleSessionManager(source_session=boto3.Session(), max_sessions=500)
+
+        def handle_request(account_id: str):
+            customer_session = manager.get({
+                "RoleArn": f"arn:aws:iam::{account_id}:role/customer_role",
+                "RoleSessionName": "control-plane"
+            })
+            customer_session.client("s3").list_buckets()
+    """
+
+    def __init__(
+        self,
+        source_session: boto3.Session,
+        max_sessions: int = 128,
+        sts_client_kwargs: Dict[str, Any] = None,
+        target_session_kwargs: Dict[str, Any] = None,
+        credential_cache: Optional[BaseCredentialCache] = None,
+        sts_client_pool: Optional[STSClientPool] = None,
+        **assume_role_options
+    ):
+        for forbidden_key in ["source_session", "assume_role_kwargs", "prefetch"]:
+            if forbidden_key in assume_role_options:
+                raise ForbiddenKWArgError(f"'{forbidden_key}' can not be passed to AssumeRoleSessionManager as an assume_role option.")
+
+        if credential_cache is None:
+            credential_cache = CredentialCache(max_size=8 * max_sessions)
+
+        if sts_client_pool is None:
+            sts_client_pool = STSClientPool()
+
+        self._source_session = source_session
+        self._max_sessions = max_sessions
+        self._sts_client_kwargs = sts_client_kwargs
+        self._target_session_kwargs = target_session_kwargs
+        self._credential_cache = credential_cache
+        self._sts_client_pool = sts_client_pool
+        self._assume_role_options = assume_role_options
+        self._sessions: "collections.OrderedDict[Hashable, boto3.Session]" = collections.OrderedDict()
+        self._single_flight = SingleFlight()
+        self._lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+    @staticmethod
+    def _is_expired(assume_sess: boto3.Session) -> bool:
+        credentials = assume_sess._session._credentials
+        return credentials._expiry_time is not None and credentials._seconds_remaining() <= 0
+
+
+    def _drop_expired(self) -> None:
+        # precondition: self._lock is held
+        for key in [key for key, assume_sess in self._sessions.items() if self._is_expired(assume_sess)]:
+            del self._sessions[key]
+
+
+    def _create(self, key: Hashable, assume_role_kwargs: Dict[str, Any]) -> boto3.Session:
+        with self._lock:
+            # another thread may have created it since this one looked
+            assume_sess = self._sessions.get(key)
+            if assume_sess is not None and not self._is_expired(assume_sess):
+                return assume_sess
+
+        assume_sess = assume_role(
+            source_session=self._source_session,
+            assume_role_kwargs=assume_role_kwargs,
+            sts_client_kwargs=self._sts_client_kwargs,
+            target_session_kwargs=self._target_session_kwargs,
+            credential_cache=self._credential_cache,
+            sts_client_pool=self._sts_client_pool,
+            **self._assume_role_options
+        )
+        with self._lock:
+            self._drop_expired()
+            self._sessions[key] = assume_sess
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+        return assume_sess
+
+
+    def get(self, assume_role_kwargs: Dict[str, Any]) -> boto3.Session:
+        """Get the session for a role, creating it if needed.
+
+        Parameters
+        ----------
+        assume_role_kwargs : Dict[str, Any]
+            Keyword arguments to pass when calling ``assume_role``, see ``assume_role``.
+            Sessions are looked up by these kwargs.
+
+        Returns
+        -------
+        boto3.Session
+            The assumed role session.
+
+        Raises
+        ------
+        ForbiddenKWArgError
+            One of the kwargs function parameters includes a keyword argument that is not allowed for boto3-assume.
+        MissingKWArgError
+            One of the kwargs function parameters is missing a necessary keyword argument.
+        """
+        key = hashable_kwargs(assume_role_kwargs)
+        with self._lock:
+            assume_sess = self._sessions.get(key)
+            if assume_sess is not None:
+                if not self._is_expired(assume_sess):
+                    self._sessions.move_to_end(key)
+                    return assume_sess
+
+                del self._sessions[key]
+
+        # only one thread creates the session for a key, the rest share it
+        return self._single_flight.do(key=key, function=lambda: self._create(key=key, assume_role_kwargs=assume_role_kwargs))
+
+
+    def evict(self, assume_role_kwargs: Dict[str, Any]) -> None:
+        """Drop the session for a role. Its credentials stay in the credential cache.
+
+        Parameters
+        ----------
+        assume_role_kwargs : Dict[str, Any]
+            Same kwargs the session was created with.
+        """
+        with self._lock:
+            self._sessions.pop(hashable_kwargs(assume_role_kwargs), None)
+
+
+    def clear(self) -> None:
+        """Drop every session. Their credentials stay in the credential cache.
+        """
+        with self._lock:
+            self._sessions.clear()
@@ -0,0 +1,73 @@
+"""Collapse concurrent calls for the same key into one call whose result is shared.
+"""
+from concurrent.futures import Future
+import threading
+from typing import Callable, Dict, Hashable, TypeVar
+
+from boto3_assume.utils import register_fork_reset
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Thread safe coordinator that lets only one caller at a time run the function for a key.
+
+    Callers that ask for a key while it is in flight wait for and share the first caller's result or error.
+    Nothing is kept once the call completes, so the next caller runs the function again.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        register_fork_reset(self._reset)
+
+
+    def _reset(self) -> None:
+        # calls in flight belong to threads that do not exist in a forked child
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        """Run ``function``, or wait for the call already in flight for ``key``.
+
+        Parameters
+        ----------
+        key : Hashable
+            Calls with equal keys are collapsed.
+        function : Callable[[], T]
+            Function to run if no call is in flight for ``key``.
+
+        Returns
+        -------
+        T
+            Result of ``function``, shared by every caller that waited on the same call.
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = Future()
+                self._in_flight[key] = in_flight
+
+        if not is_leader:
+            return in_flight.result()
+
+        try:
+            result = function()
+        except BaseException as error:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            in_flight.set_exception(error)
+            raise
+
+        with self._lock:
+            self._in_flight.pop(key, None)
+        in_flight.set_result(result)
+
+        return result
@@ -0,0 +1,99 @@
+"""Pool of STS clients that can be shared between assume role sessions.
+"""
+import threading
+from typing import Any, Dict, Hashable, List, Tuple
+
+import boto3
+
+from boto3_assume.utils import hashable_kwargs, register_fork_reset
+
+
+class STSClientPool:
+    """Thread safe pool that hands out one shared STS client per source session and client kwargs.
+
+    botocore clients are thread safe, so every assume role session created from the same ``source_session``
+    and ``sts_client_kwargs`` can use the same client and HTTP connection pool.
+    Clients are reference counted and removed from the pool when the last session using them is garbage collected.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Hashable, List[Any]] = {}
+        self._lock = threading.Lock()
+        register_fork_reset(self._reset)
+
+
+    def _reset(self) -> None:
+        # inherited clients are not fork safe, and the lock may have been held by a thread that does not exist in the child
+        self._clients = {}
+        self._lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+    def _key(
+        self,
+        source_session: boto3.Session,
+        sts_client_kwargs: Dict[str, Any]
+    ) -> Hashable:
+        # the id of the source session is safe to use since it is kept alive by every session holding a reference
+        return (
+            id(source_session),
+            sts_client_kwargs.get("region_name", source_session.region_name),
+            sts_client_kwargs.get("endpoint_url"),
+            hashable_kwargs(sts_client_kwargs)
+        )
+
+
+    def acquire(
+        self,
+        source_session: boto3.Session,
+        sts_client_kwargs: Dict[str, Any]
+    ) -> Tuple[Hashable, Any]:
+        """Get the shared STS client and increment its reference count.
+
+        Parameters
+        ----------
+        source_session : boto3.Session
+            Source session to create the client from.
+        sts_client_kwargs : Dict[str, Any]
+            Kwargs to pass when creating the STS client.
+
+        Returns
+        -------
+        Tuple[Hashable, Any]
+            The pool key to pass to ``release`` and the STS client.
+        """
+        key = self._key(source_session=source_session, sts_client_kwargs=sts_client_kwargs)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                entry = [source_session.client("sts", **sts_client_kwargs), 0]
+                self._clients[key] = entry
+
+            entry[1] += 1
+
+            return key, entry[0]
+
+
+    def release(self, key: Hashable) -> None:
+        """Decrement the reference count of a shared STS client, and remove it from the pool when no longer used.
+
+        Parameters
+        ----------
+        key : Hashable
+            Pool key returned from ``acquire``.
+        """
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                return
+
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+
+            del self._clients[key]
+
+        entry[0].close()
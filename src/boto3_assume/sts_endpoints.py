@@ -0,0 +1,127 @@
+"""Route STS calls to the fastest healthy regional endpoint.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError, ConnectionError, ReadTimeoutError
+
+from boto3_assume.utils import _THROTTLING_ERROR_CODES
+
+
+def _should_fail_over(error: Exception) -> bool:
+    if isinstance(error, (ConnectionError, ReadTimeoutError)):
+        return True
+
+    if isinstance(error, ClientError):
+        if error.response.get("Error", {}).get("Code") in _THROTTLING_ERROR_CODES:
+            return True
+
+        return error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500
+
+    return False
+
+
+class STSEndpointSelector:
+    """Thread safe record of STS latency and health per region, used to pick the endpoint for each refresh.
+
+    Share one selector between sessions so they all benefit from the same measurements.
+    Regions that have not been measured yet are tried after the measured ones, in priority order,
+    so refreshes stay on the primary region until a failover region has been used and measured.
+
+    Parameters
+    ----------
+    endpoint_urls : Optional[Dict[str, str]], default=None
+        ``endpoint_url`` to use for each region, ie for VPC endpoints or testing.
+        By default botocore resolves the regional STS endpoint from the region name.
+    smoothing : float, default=0.3
+        Weight of the newest latency in each region's moving average.
+    failure_cooldown : float, default=30
+        Seconds a region is tried last after a connection error, timeout, throttling or server error.
+    """
+
+    def __init__(
+        self,
+        endpoint_urls: Optional[Dict[str, str]] = None,
+        smoothing: float = 0.3,
+        failure_cooldown: float = 30
+    ):
+        self._endpoint_urls = endpoint_urls or {}
+        self._smoothing = smoothing
+        self._failure_cooldown = failure_cooldown
+        self._latency: Dict[str, float] = {}
+        self._unhealthy_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+
+    def client_kwargs(self, region: str, sts_client_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """STS client kwargs for a region.
+
+        Parameters
+        ----------
+        region : str
+            Region of the STS endpoint.
+        sts_client_kwargs : Dict[str, Any]
+            Base kwargs, ``region_name`` and ``endpoint_url`` are replaced.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Kwargs to create the STS client for ``region`` with.
+        """
+        client_kwargs = {**sts_client_kwargs, "region_name": region}
+        client_kwargs.pop("endpoint_url", None)
+        if region in self._endpoint_urls:
+            client_kwargs["endpoint_url"] = self._endpoint_urls[region]
+
+        return client_kwargs
+
+
+    def latency(self, region: str) -> Optional[float]:
+        """Moving average latency in seconds of STS calls to ``region``, ``None`` if it has not been measured.
+        """
+        with self._lock:
+            return self._latency.get(region)
+
+
+    def order(self, regions: List[str]) -> List[str]:
+        """Sort regions in the order they should be tried.
+
+        Healthy regions come first, fastest first, with regions that have not been measured yet after them in the order given.
+        Regions that recently failed come last, in the order given.
+
+        Parameters
+        ----------
+        regions : List[str]
+            Candidate regions in priority order.
+
+        Returns
+        -------
+        List[str]
+            The same regions in the order to try them.
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [region for region in regions if self._unhealthy_until.get(region, 0) <= now]
+            unhealthy = [region for region in regions if region not in healthy]
+            # the sort is stable, so unmeasured regions keep their priority order
+            healthy.sort(key=lambda region: self._latency.get(region, float("inf")))
+
+        return healthy + unhealthy
+
+
+    def record_success(self, region: str, latency: float) -> None:
+        with self._lock:
+            self._unhealthy_until.pop(region, None)
+            if region not in self._latency:
+                self._latency[region] = latency
+            else:
+                self._latency[region] += self._smoothing * (latency - self._latency[region])
+
+
+    def record_failure(self, region: str) -> None:
+        with self._lock:
+            self._unhealthy_until[region] = time.monotonic() + self._failure_cooldown
+
+
+_default_sts_endpoint_selector = STSEndpointSelector()
@@ -0,0 +1,79 @@
+"""Internal helpers for boto3-assume.
+"""
+import os
+from typing import Any, Callable, Dict, Hashable, Tuple
+import weakref
+
+from botocore.config import Config
+
+
+_THROTTLING_ERROR_CODES = [
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException"
+]
+
+# live objects mapped to the method that resets them in forked children
+_fork_resets: "weakref.WeakKeyDictionary[Any, Callable[[Any], None]]" = weakref.WeakKeyDictionary()
+
+
+def register_fork_reset(reset: Callable[[], None]) -> None:
+    """Call the bound method ``reset`` in every child process forked while its object is alive.
+
+    Use it for locks that may be held by threads that do not exist in the child,
+    and for clients and threads that must not be shared with the parent.
+    Only a weak reference to the object is kept, so registering does not keep it alive.
+
+    Parameters
+    ----------
+    reset : Callable[[], None]
+        Bound method of the object to reset.
+    """
+    _fork_resets[reset.__self__] = reset.__func__
+
+
+def _reset_after_fork() -> None:
+    for instance, reset in list(_fork_resets.items()):
+        reset(instance)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def hashable_kwargs(kwargs: Dict[str, Any]) -> Tuple[Tuple[str, Hashable], ...]:
+    """Convert a kwargs dict into a hashable, order independent tuple.
+
+    Values that are not hashable (like dicts and lists) are converted recursively.
+    ``botocore.config.Config`` objects match by the options they were created with,
+    other objects hash by identity, so only the same instance will match.
+
+    Parameters
+    ----------
+    kwargs : Dict[str, Any]
+        Keyword arguments to convert.
+
+    Returns
+    -------
+    Tuple[Tuple[str, Hashable], ...]
+        Sorted ``(key, value)`` pairs.
+    """
+    return tuple(sorted((key, _hashable(value)) for key, value in kwargs.items()))
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return hashable_kwargs(value)
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+
+    if isinstance(value, set):
+        return frozenset(_hashable(item) for item in value)
+
+    if isinstance(value, Config):
+        # a new Config per call is common, ie session.client("s3", config=Config(...))
+        return (Config, hashable_kwargs(value._user_provided_options))
+
+    return value
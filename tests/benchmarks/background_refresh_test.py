@@ -0,0 +1,66 @@
+
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+import boto3
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from boto3_assume import assume_role, BackgroundRefresher
+
+
+STS_LATENCY = 0.05
+RUN_SECONDS = 5
+
+
+def _request_latencies(credentials) -> List[float]:
+    latencies = []
+    end = time.monotonic() + RUN_SECONDS
+    while time.monotonic() < end:
+        start = time.perf_counter()
+        credentials.get_frozen_credentials()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+
+    return latencies
+
+
+@pytest.mark.parametrize("background", [False, True], ids=["inline-refresh", "background-refresh"])
+def test_request_latency_across_refreshes(
+    benchmark: BenchmarkFixture,
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    role_arn: str,
+    session_name: str,
+    background: bool
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    # simulate a slow STS endpoint
+    sess.events.register("before-call.sts.AssumeRole", lambda **kwargs: time.sleep(STS_LATENCY))
+    refresher: Optional[BackgroundRefresher] = None
+    if background:
+        refresher = BackgroundRefresher(lead_time=0.5, jitter=0.1, retry_interval=0.1, poll_interval=0.1)
+
+    assume_sess = assume_role(
+        source_session=sess,
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name,
+            "DurationSeconds": 900
+        },
+        sts_client_kwargs=moto_server_sts_client_kwargs,
+        background_refresher=refresher
+    )
+    credentials = assume_sess.get_credentials()
+    credentials.get_frozen_credentials()
+    # shrink the refresh windows so the 900 second credentials need refreshing every couple of seconds
+    credentials._advisory_refresh_timeout = 898
+    credentials._mandatory_refresh_timeout = 0
+    latencies = benchmark.pedantic(_request_latencies, args=(credentials,), rounds=1)
+    if refresher is not None:
+        refresher.stop()
+
+    benchmark.extra_info["requests"] = len(latencies)
+    benchmark.extra_info["slow_requests"] = len([latency for latency in latencies if latency >= STS_LATENCY])
+    benchmark.extra_info["p99_ms"] = statistics.quantiles(latencies, n=100)[98] * 1000
+    benchmark.extra_info["max_ms"] = max(latencies) * 1000
@@ -0,0 +1,34 @@
+from typing import Any, Dict
+
+import boto3
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from boto3_assume import assume_role
+
+
+@pytest.mark.parametrize("cache_clients", [False, True], ids=["client-per-request", "cached-clients"])
+def test_client_per_request(
+    benchmark: BenchmarkFixture,
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    role_arn: str,
+    session_name: str,
+    cache_clients: bool
+) -> None:
+    assume_sess = assume_role(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        },
+        target_session_kwargs={"region_name": "us-east-1"},
+        sts_client_kwargs=moto_server_sts_client_kwargs,
+        cache_clients=cache_clients
+    )
+    assume_sess.get_credentials().get_frozen_credentials()
+
+    def handle_request() -> None:
+        # the common pattern of creating a client in every request handler
+        assume_sess.client("s3")
+
+    benchmark(handle_request)
@@ -0,0 +1,57 @@
+
+import tracemalloc
+from typing import Any, Dict
+
+import boto3
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from boto3_assume import assume_role
+
+
+def _assume_role_kwargs(role_arn: str, session_name: str) -> Dict[str, Any]:
+    return {
+        "RoleArn": role_arn,
+        "RoleSessionName": session_name
+    }
+
+
+def test_assume_role_construction(
+    benchmark: BenchmarkFixture,
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    role_arn: str,
+    session_name: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    benchmark(
+        assume_role,
+        source_session=sess,
+        assume_role_kwargs=_assume_role_kwargs(role_arn, session_name),
+        sts_client_kwargs=moto_server_sts_client_kwargs
+    )
+
+
+def test_assume_role_construction_memory(
+    benchmark: BenchmarkFixture,
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    role_arn: str,
+    session_name: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    num_sessions = 100
+
+    def build_sessions() -> list:
+        return [
+            assume_role(
+                source_session=sess,
+                assume_role_kwargs=_assume_role_kwargs(role_arn, session_name),
+                sts_client_kwargs=moto_server_sts_client_kwargs
+            )
+            for _ in range(num_sessions)
+        ]
+
+    tracemalloc.start()
+    sessions = build_sessions()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    benchmark.extra_info["bytes_per_session"] = current / len(sessions)
+    benchmark.pedantic(build_sessions, rounds=3)
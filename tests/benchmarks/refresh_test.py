@@ -0,0 +1,112 @@
+
+import datetime
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+import boto3
+from dateutil.tz import tzlocal
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from boto3_assume import CredentialCache
+
+
+def _expire(credentials) -> None:
+    # inside the mandatory refresh window, so the next call has to wait for STS
+    credentials._expiry_time = datetime.datetime.now(tzlocal())
+
+
+def test_first_call_latency(
+    benchmark: BenchmarkFixture,
+    assume_session: Callable[..., boto3.Session],
+    moto_server_sts_client_kwargs: Dict[str, Any]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+
+    def setup() -> Tuple[tuple, Dict[str, Any]]:
+        assume_sess = assume_session(sess, sts_client_kwargs=moto_server_sts_client_kwargs)
+        return (assume_sess.get_credentials(),), {}
+
+    # includes creating the STS client, which happens on the first refresh
+    benchmark.pedantic(lambda credentials: credentials.get_frozen_credentials(), setup=setup, rounds=20)
+
+
+def test_steady_state_refresh_latency(
+    benchmark: BenchmarkFixture,
+    assume_session: Callable[..., boto3.Session],
+    moto_server_sts_client_kwargs: Dict[str, Any]
+) -> None:
+    assume_sess = assume_session(sts_client_kwargs=moto_server_sts_client_kwargs)
+    credentials = assume_sess.get_credentials()
+    credentials.get_frozen_credentials()
+
+    def setup() -> Tuple[tuple, Dict[str, Any]]:
+        _expire(credentials)
+        return (), {}
+
+    benchmark.pedantic(credentials.get_frozen_credentials, setup=setup, rounds=50)
+
+
+def _contended_refresh(credentials_list: List[Any], num_threads: int) -> None:
+    barrier = threading.Barrier(num_threads)
+
+    def worker(credentials) -> None:
+        barrier.wait()
+        credentials.get_frozen_credentials()
+
+    threads = [
+        threading.Thread(target=worker, args=(credentials_list[i % len(credentials_list)],))
+        for i in range(num_threads)
+    ]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+
+def test_threaded_refresh_contention_one_session(
+    benchmark: BenchmarkFixture,
+    assume_session: Callable[..., boto3.Session],
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    credentials = assume_session(sess, sts_client_kwargs=moto_server_sts_client_kwargs).get_credentials()
+    credentials.get_frozen_credentials()
+    rounds = 10
+
+    def setup() -> Tuple[tuple, Dict[str, Any]]:
+        _expire(credentials)
+        return ([credentials], 16), {}
+
+    calls.clear()
+    benchmark.pedantic(_contended_refresh, setup=setup, rounds=rounds)
+    benchmark.extra_info["sts_calls_per_round"] = len(calls) / rounds
+
+
+def test_threaded_refresh_contention_shared_cache(
+    benchmark: BenchmarkFixture,
+    assume_session: Callable[..., boto3.Session],
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    cache = CredentialCache()
+    credentials_list = [
+        assume_session(sess, sts_client_kwargs=moto_server_sts_client_kwargs, credential_cache=cache).get_credentials()
+        for _ in range(16)
+    ]
+    rounds = 10
+
+    def setup() -> Tuple[tuple, Dict[str, Any]]:
+        cache.clear()
+        for credentials in credentials_list:
+            _expire(credentials)
+
+        return (credentials_list, 16), {}
+
+    calls.clear()
+    benchmark.pedantic(_contended_refresh, setup=setup, rounds=rounds)
+    benchmark.extra_info["sts_calls_per_round"] = len(calls) / rounds
@@ -0,0 +1,64 @@
+import tracemalloc
+from typing import Any, Dict, List
+
+import boto3
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from boto3_assume import assume_role
+
+
+# every unshared session keeps its own parsed models, 1,000 of them need several GB,
+# so measure a sample and report the total for 1,000 sessions
+NUM_SESSIONS = 25
+REPORTED_SESSIONS = 1000
+
+
+def _build_sessions(
+    source_session: boto3.Session,
+    role_arn: str,
+    session_name: str,
+    sts_client_kwargs: Dict[str, Any],
+    share_loader: bool
+) -> List[boto3.Session]:
+    assume_sessions = []
+    for _ in range(NUM_SESSIONS):
+        assume_sess = assume_role(
+            source_session=source_session,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            target_session_kwargs={"region_name": "us-east-1"},
+            sts_client_kwargs=sts_client_kwargs,
+            share_loader=share_loader
+        )
+        # loads the service model and endpoint data
+        assume_sess.client("sqs")
+        assume_sessions.append(assume_sess)
+
+    return assume_sessions
+
+
+@pytest.mark.parametrize("share_loader", [False, True], ids=["private-loaders", "shared-loader"])
+def test_sessions_with_client_memory(
+    benchmark: BenchmarkFixture,
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    role_arn: str,
+    session_name: str,
+    share_loader: bool
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    # the source session loads the models once up front, as it would in a long running worker
+    sess.client("sqs")
+    tracemalloc.start()
+    assume_sessions = _build_sessions(sess, role_arn, session_name, moto_server_sts_client_kwargs, share_loader)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    benchmark.extra_info["bytes_per_session"] = current / len(assume_sessions)
+    benchmark.extra_info[f"bytes_per_{REPORTED_SESSIONS}_sessions"] = current / len(assume_sessions) * REPORTED_SESSIONS
+    benchmark.pedantic(
+        _build_sessions,
+        args=(sess, role_arn, session_name, moto_server_sts_client_kwargs, share_loader),
+        rounds=1
+    )
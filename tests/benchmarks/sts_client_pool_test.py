@@ -0,0 +1,60 @@
+
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import boto3
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from boto3_assume import assume_role, STSClientPool
+
+
+NUM_SESSIONS = 100
+
+
+def _build_sessions(
+    source_session: boto3.Session,
+    role_arn: str,
+    session_name: str,
+    sts_client_kwargs: Dict[str, Any],
+    sts_client_pool: Optional[STSClientPool]
+) -> List[boto3.Session]:
+    assume_sessions = []
+    for _ in range(NUM_SESSIONS):
+        assume_sess = assume_role(
+            source_session=source_session,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            sts_client_kwargs=sts_client_kwargs,
+            sts_client_pool=sts_client_pool
+        )
+        # force the STS client to be created
+        assume_sess.get_credentials()._refresh_using.__self__._sts_client
+        assume_sessions.append(assume_sess)
+
+    return assume_sessions
+
+
+@pytest.mark.parametrize("pooled", [False, True], ids=["private-clients", "pooled-clients"])
+def test_sessions_with_sts_client_memory(
+    benchmark: BenchmarkFixture,
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    role_arn: str,
+    session_name: str,
+    pooled: bool
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    pool = STSClientPool() if pooled else None
+    tracemalloc.start()
+    assume_sessions = _build_sessions(sess, role_arn, session_name, moto_server_sts_client_kwargs, pool)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    benchmark.extra_info["num_sessions"] = len(assume_sessions)
+    benchmark.extra_info["bytes_per_session"] = current / len(assume_sessions)
+    benchmark.pedantic(
+        _build_sessions,
+        args=(sess, role_arn, session_name, moto_server_sts_client_kwargs, pool),
+        rounds=3
+    )
@@ -0,0 +1,111 @@
+
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+import boto3
+from moto import mock_aws
+from moto.server import ThreadedMotoServer
+import pytest
+
+from boto3_assume import assume_role
+
+
+@pytest.fixture(scope="session")
+def moto_creds() -> None:
+    cred_env_vars = [
+        "AWS_ACCESS_KEY_ID",
+        "AWS_SECRET_ACCESS_KEY",
+        "AWS_SECURITY_TOKEN",
+        "AWS_SESSION_TOKEN"
+    ]
+    aws_creds = {}
+    for env_var in cred_env_vars:
+        aws_creds[env_var] = os.environ.get(env_var, None)
+        os.environ[env_var] = "testing"
+
+    yield
+
+    for cred in aws_creds:
+        if aws_creds[cred] is None:
+            os.environ.pop(cred)
+        else:
+            os.environ[cred] = aws_creds[cred]
+
+
+@pytest.fixture(scope="function")
+def sts_moto(moto_creds: None) -> None:
+    with mock_aws():
+        yield 
+
+
+@pytest.fixture(scope="function")
+def moto_server(moto_creds: None) -> str:
+    server = ThreadedMotoServer()
+    server.start()
+
+    yield "http://localhost:5000"
+
+    server.stop()
+
+
+@pytest.fixture(scope="function")
+def moto_server_sts_client_kwargs(moto_server: str) -> Dict[str, Any]:
+    return {
+        "endpoint_url": moto_server,
+        "region_name": "us-east-1"
+    }
+
+
+@pytest.fixture(scope="function")
+def role_arn() -> str:
+    return "arn:aws:iam::123412341234:role/my_role"
+
+
+@pytest.fixture(scope="function")
+def session_name() -> str:
+    return "tester-session"
+
+
+@pytest.fixture(scope="function")
+def sts_arn() -> str:
+    return "arn:aws:sts::123412341234:assumed-role/my_role/tester-session"
+
+
+@pytest.fixture(scope="function")
+def assume_session(role_arn: str, session_name: str) -> Callable[..., boto3.Session]:
+    """Create assume role sessions for ``role_arn`` and ``session_name``.
+
+    ``assume_role_kwargs`` are merged over the default ones and other keyword arguments are passed to ``assume_role``.
+    """
+    def create(
+        source_session: Optional[boto3.Session] = None,
+        assume_role_kwargs: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> boto3.Session:
+        if source_session is None:
+            source_session = boto3.Session(region_name="us-east-1")
+
+        return assume_role(
+            source_session=source_session,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name,
+                **(assume_role_kwargs or {})
+            },
+            **kwargs
+        )
+
+    return create
+
+
+@pytest.fixture(scope="function")
+def count_assume_role_calls() -> Callable[[boto3.Session], List[Dict[str, Any]]]:
+    """Record every ``AssumeRole`` call made by STS clients of a source session.
+    """
+    def count(session: boto3.Session) -> List[Dict[str, Any]]:
+        calls = []
+        session.events.register("before-call.sts.AssumeRole", lambda **kwargs: calls.append(kwargs))
+
+        return calls
+
+    return count
@@ -7,7 +7,15 @@ from botocore.config import Config
 import pytest
 import pytz
 
-from boto3_assume import assume_role_aio_session
+from boto3_assume import (
+    AIOAssumeRoleResult,
+    AIOAssumeSession,
+    assume_role_aio_session,
+    assume_role_async,
+    assume_roles_async,
+    ForbiddenKWArgError,
+    MissingKWArgError
+)
 from boto3_assume.aio_assume_refresh import AIOAssumeRefresh
 
 
@@ -159,3 +167,190 @@ async def test_refresh_creds(
     
 
 
+
+
+@pytest.mark.asyncio
+async def test_assume_role_async(
+    moto_server: str,
+    role_arn: str,
+    session_name: str,
+    sts_arn: str
+) -> None:
+    sess = aioboto3.Session()
+    async with assume_role_async(
+        source_session=sess,
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name,
+            "DurationSeconds": 900
+        },
+        sts_client_kwargs={
+            "endpoint_url": moto_server,
+            "region_name": "us-east-1"
+        },
+        target_session_kwargs={
+            "region_name": "us-east-1"
+        }
+    ) as assume_sess:
+        assert isinstance(assume_sess, AIOAssumeSession)
+        assert assume_sess.region_name == "us-east-1"
+        sts_client_holder = assume_sess._assume_refresh._sts_client_holder
+        # credentials and the STS client should only be created once an API call is made
+        creds = await assume_sess.get_credentials()
+        assert creds._expiry_time == None
+        assert sts_client_holder._sts_client is None
+        async with assume_sess.client("sts", endpoint_url=moto_server) as sts_client:
+            identity = await sts_client.get_caller_identity()
+            assert identity['Arn'] == sts_arn
+            sts_client_instance = sts_client_holder._sts_client
+            assert sts_client_instance is not None
+            # force a refresh, the STS client should be reused
+            original_expire = assume_sess._session._credentials._expiry_time
+            assume_sess._session._credentials._expiry_time = pytz.UTC.localize(datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None))
+            time.sleep(1)
+            identity = await sts_client.get_caller_identity()
+            assert identity['Arn'] == sts_arn
+            assert assume_sess._session._credentials._expiry_time > original_expire
+            assert sts_client_holder._sts_client is sts_client_instance
+
+    assert assume_sess._assume_refresh._sts_client_holder is None
+    assert sts_client_holder._sts_client is None
+    assert sts_client_holder._sts_client_context is None
+
+
+@pytest.mark.asyncio
+async def test_assume_role_async_aclose(
+    moto_server: str,
+    role_arn: str,
+    session_name: str
+) -> None:
+    assume_sess = assume_role_async(
+        source_session=aioboto3.Session(),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        },
+        sts_client_kwargs={
+            "endpoint_url": moto_server,
+            "region_name": "us-east-1"
+        }
+    )
+    await (await assume_sess.get_credentials()).get_frozen_credentials()
+    sts_client_holder = assume_sess._assume_refresh._sts_client_holder
+    assert sts_client_holder._sts_client is not None
+    await assume_sess.aclose()
+    assert sts_client_holder._sts_client is None
+    # closing twice is fine
+    await assume_sess.aclose()
+
+
+def test_assume_role_async_invalid_kwargs(
+    role_arn: str,
+    session_name: str
+) -> None:
+    with pytest.raises(MissingKWArgError):
+        assume_role_async(
+            source_session=aioboto3.Session(),
+            assume_role_kwargs={
+                "RoleArn": role_arn
+            }
+        )
+
+    with pytest.raises(ForbiddenKWArgError):
+        assume_role_async(
+            source_session=aioboto3.Session(),
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            target_session_kwargs={
+                "profile_name": "idc"
+            }
+        )
+
+
+@pytest.mark.asyncio
+async def test_assume_roles_async(
+    moto_server: str,
+    session_name: str
+) -> None:
+    role_arns = [f"arn:aws:iam::{100000000000 + i}:role/my_role" for i in range(20)]
+    assume_role_kwargs_list = [
+        {
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        }
+        for role_arn in role_arns
+    ]
+    # invalid duration fails client side validation
+    assume_role_kwargs_list[3]["DurationSeconds"] = 1
+    results = []
+    async for result in assume_roles_async(
+        source_session=aioboto3.Session(),
+        assume_role_kwargs_list=assume_role_kwargs_list,
+        sts_client_kwargs={
+            "endpoint_url": moto_server,
+            "region_name": "us-east-1"
+        },
+        max_concurrency=5
+    ):
+        assert isinstance(result, AIOAssumeRoleResult)
+        results.append(result)
+
+    assert len(results) == 20
+    failed = [result for result in results if result.error is not None]
+    assert len(failed) == 1
+    assert failed[0].session is None
+    assert failed[0].assume_role_kwargs["RoleArn"] == role_arns[3]
+    sessions = [result.session for result in results if result.session is not None]
+    sts_client_holders = {id(assume_sess._assume_refresh._sts_client_holder) for assume_sess in sessions}
+    assert len(sts_client_holders) == 1
+    sts_client_holder = sessions[0]._assume_refresh._sts_client_holder
+    assert sts_client_holder._sts_client is not None
+    for assume_sess in sessions:
+        assert (await assume_sess.get_credentials())._expiry_time is not None
+        await assume_sess.aclose()
+
+    assert sts_client_holder._sts_client is None
+
+
+@pytest.mark.asyncio
+async def test_assume_roles_async_stop_early(
+    moto_server: str,
+    session_name: str
+) -> None:
+    results = assume_roles_async(
+        source_session=aioboto3.Session(),
+        assume_role_kwargs_list=[
+            {
+                "RoleArn": f"arn:aws:iam::{100000000000 + i}:role/my_role",
+                "RoleSessionName": session_name
+            }
+            for i in range(10)
+        ],
+        sts_client_kwargs={
+            "endpoint_url": moto_server,
+            "region_name": "us-east-1"
+        },
+        max_concurrency=2
+    )
+    async for result in results:
+        break
+
+    await results.aclose()
+    sts_client_holder = result.session._assume_refresh._sts_client_holder
+    assert sts_client_holder._references == 1
+    await result.session.aclose()
+    assert sts_client_holder._sts_client is None
+
+
+@pytest.mark.asyncio
+async def test_assume_roles_async_empty() -> None:
+    results = [
+        result
+        async for result in assume_roles_async(
+            source_session=aioboto3.Session(),
+            assume_role_kwargs_list=[]
+        )
+    ]
+    assert results == []
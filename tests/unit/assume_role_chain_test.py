@@ -0,0 +1,100 @@
+
+import datetime
+from typing import Any, Callable, Dict, List
+
+import boto3
+from dateutil.tz import tzlocal
+import pytest
+
+from boto3_assume import assume_role_chain, CachedClientSession, CredentialCache, InMemoryRefreshMetrics, MissingKWArgError
+
+
+HUB_ROLE_ARN = "arn:aws:iam::123412341234:role/hub_role"
+SPOKE_ROLE_ARN = "arn:aws:iam::432143214321:role/spoke_role"
+
+
+def _role_arns(calls: List[Dict[str, Any]]) -> List[str]:
+    return [call["params"]["body"]["RoleArn"] for call in calls]
+
+
+def _chain(source_session: boto3.Session, **kwargs) -> boto3.Session:
+    return assume_role_chain(
+        source_session=source_session,
+        assume_role_kwargs_list=[
+            {
+                "RoleArn": HUB_ROLE_ARN,
+                "RoleSessionName": "hub-session",
+                "DurationSeconds": 7200
+            },
+            {
+                "RoleArn": SPOKE_ROLE_ARN,
+                "RoleSessionName": "spoke-session",
+                "DurationSeconds": 7200
+            }
+        ],
+        target_session_kwargs={
+            "region_name": "us-east-1"
+        },
+        **kwargs
+    )
+
+
+def test_assume_role_chain(sts_moto: None) -> None:
+    assume_sess = _chain(boto3.Session(region_name="us-east-1"))
+    identity = assume_sess.client("sts").get_caller_identity()
+    assert identity["Arn"] == "arn:aws:sts::432143214321:assumed-role/spoke_role/spoke-session"
+    spoke_refresh = assume_sess.get_credentials()._refresh_using.__self__
+    hub_session = spoke_refresh._source_session
+    hub_refresh = hub_session.get_credentials()._refresh_using.__self__
+    assert hub_session.region_name == "us-east-1"
+    # the first hop keeps the requested duration, chained hops are capped at 1 hour
+    assert hub_refresh._assume_role_kwargs["DurationSeconds"] == 7200
+    assert spoke_refresh._assume_role_kwargs["DurationSeconds"] == 3600
+
+
+def test_hops_refresh_independently(
+    sts_moto: None,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    source_session = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(source_session)
+    assume_sess = _chain(source_session)
+    # the spoke's STS client is created from the hub session on the first refresh
+    hub_session = assume_sess.get_credentials()._refresh_using.__self__._source_session
+    spoke_calls = count_assume_role_calls(hub_session)
+    assume_sess.get_credentials().get_frozen_credentials()
+    assert _role_arns(calls) == [HUB_ROLE_ARN]
+    assert _role_arns(spoke_calls) == [SPOKE_ROLE_ARN]
+    # expire only the spoke credentials
+    assume_sess.get_credentials()._expiry_time = datetime.datetime.now(tzlocal())
+    assume_sess.client("sts").get_caller_identity()
+    assert _role_arns(calls) == [HUB_ROLE_ARN]
+    assert _role_arns(spoke_calls) == [SPOKE_ROLE_ARN] * 2
+    assume_sess.client("sts").get_caller_identity()
+    assert _role_arns(spoke_calls) == [SPOKE_ROLE_ARN] * 2
+
+
+def test_options_reach_every_hop(sts_moto: None) -> None:
+    credential_cache = CredentialCache()
+    metrics = InMemoryRefreshMetrics()
+    assume_sess = _chain(
+        boto3.Session(region_name="us-east-1"),
+        credential_cache=credential_cache,
+        metrics=metrics,
+        prefetch=True,
+        cache_clients=True
+    )
+    assert set(metrics.sts_calls) == {HUB_ROLE_ARN, SPOKE_ROLE_ARN}
+    assert len(credential_cache) == 2
+    # only the returned session caches its clients
+    hub_session = assume_sess.get_credentials()._refresh_using.__self__._source_session
+    assert isinstance(assume_sess, CachedClientSession)
+    assert not isinstance(hub_session, CachedClientSession)
+
+
+def test_assume_role_chain_empty() -> None:
+    with pytest.raises(MissingKWArgError):
+        assume_role_chain(
+            source_session=boto3.Session(),
+            assume_role_kwargs_list=[]
+        )
@@ -210,3 +210,24 @@ def test_assume_role_target_session_forbidden_keys(
                     k: "idc"
                 }
             )
+
+
+def test_sts_client_created_on_first_refresh(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    assume_sess = assume_role(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        }
+    )
+    refresh = assume_sess.get_credentials()._refresh_using.__self__
+    assert refresh._sts_client_instance is None
+    refresh.refresh()
+    sts_client = refresh._sts_client_instance
+    assert sts_client is not None
+    refresh.refresh()
+    assert refresh._sts_client_instance is sts_client
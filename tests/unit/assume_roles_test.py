@@ -0,0 +1,181 @@
+
+from typing import Any, Dict, List
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+import pytest
+
+from boto3_assume import assume_roles, BackgroundRefresher, CredentialCache, InMemoryRefreshMetrics, MissingKWArgError
+
+
+def _role_arns(num_roles: int) -> List[str]:
+    return [f"arn:aws:iam::{100000000000 + i}:role/my_role" for i in range(num_roles)]
+
+
+def _fail_assume_role(session: boto3.Session, failures: Dict[str, List[str]]) -> None:
+    """Make STS return the error codes in ``failures`` for each RoleArn, one call at a time.
+    """
+    def before_call(params: Dict[str, Any], **kwargs) -> Any:
+        codes = failures.get(params["body"]["RoleArn"])
+        if not codes:
+            return None
+
+        code = codes.pop(0)
+        return (
+            AWSResponse(url="https://sts.amazonaws.com", status_code=400, headers={}, raw=None),
+            {
+                "Error": {"Code": code, "Message": code},
+                "ResponseMetadata": {"HTTPStatusCode": 400}
+            }
+        )
+
+    session.events.register("before-call.sts.AssumeRole", before_call)
+
+
+def test_assume_roles(
+    sts_moto: None,
+    session_name: str
+) -> None:
+    role_arns = _role_arns(5)
+    sessions, errors = assume_roles(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs_list=[
+            {
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            }
+            for role_arn in role_arns
+        ]
+    )
+    assert errors == {}
+    assert list(sessions) == list(range(5))
+    refreshes = [assume_sess.get_credentials()._refresh_using.__self__ for assume_sess in sessions.values()]
+    # credentials are not fetched without prefetch, but all sessions share one STS client
+    for assume_sess in sessions.values():
+        assert assume_sess.get_credentials()._expiry_time is None
+
+    assert len({id(refresh._sts_client) for refresh in refreshes}) == 1
+    account = sessions[2].client("sts").get_caller_identity()["Account"]
+    assert account == "100000000002"
+
+
+def test_assume_roles_prefetch(
+    sts_moto: None,
+    session_name: str
+) -> None:
+    role_arns = _role_arns(20)
+    sess = boto3.Session(region_name="us-east-1")
+    _fail_assume_role(
+        session=sess,
+        failures={
+            role_arns[0]: ["Throttling", "Throttling"],
+            role_arns[1]: ["AccessDenied"],
+            role_arns[2]: ["Throttling"] * 3
+        }
+    )
+    sessions, errors = assume_roles(
+        source_session=sess,
+        assume_role_kwargs_list=[
+            {
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            }
+            for role_arn in role_arns
+        ],
+        prefetch=True,
+        max_workers=4,
+        max_attempts=3,
+        backoff_base=0.01,
+        backoff_max=0.05
+    )
+    assert set(errors) == {1, 2}
+    assert isinstance(errors[1], ClientError)
+    assert errors[2].response["Error"]["Code"] == "Throttling"
+    assert len(sessions) == 18
+    for assume_sess in sessions.values():
+        assert assume_sess.get_credentials()._expiry_time is not None
+
+
+def test_assume_roles_same_role(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    session_names = [session_name, "other-session", session_name]
+    sessions, errors = assume_roles(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs_list=[
+            {
+                "RoleArn": role_arn,
+                "RoleSessionName": name
+            }
+            for name in session_names
+        ],
+        prefetch=True
+    )
+    assert errors == {}
+    assert list(sessions) == [0, 1, 2]
+    for i, name in enumerate(session_names):
+        identity = sessions[i].client("sts").get_caller_identity()
+        assert identity["Arn"].endswith(f"/{name}")
+
+
+def test_assume_roles_forwards_options(
+    sts_moto: None,
+    session_name: str
+) -> None:
+    role_arns = _role_arns(3)
+    credential_cache = CredentialCache()
+    metrics = InMemoryRefreshMetrics()
+    with BackgroundRefresher() as background_refresher:
+        sessions, errors = assume_roles(
+            source_session=boto3.Session(region_name="us-east-1"),
+            assume_role_kwargs_list=[
+                {
+                    "RoleArn": role_arn,
+                    "RoleSessionName": session_name
+                }
+                for role_arn in role_arns
+            ],
+            prefetch=True,
+            credential_cache=credential_cache,
+            metrics=metrics,
+            background_refresher=background_refresher,
+            cache_clients=True
+        )
+        assert errors == {}
+        assert len(background_refresher) == 3
+
+    # every assume_role option reaches every session
+    assert set(metrics.sts_calls) == set(role_arns)
+    assert len(credential_cache) == 3
+    for assume_sess in sessions.values():
+        assert assume_sess.client("sts") is assume_sess.client("sts")
+
+    with pytest.raises(TypeError):
+        assume_roles(
+            source_session=boto3.Session(region_name="us-east-1"),
+            assume_role_kwargs_list=[
+                {
+                    "RoleArn": role_arns[0],
+                    "RoleSessionName": session_name
+                }
+            ],
+            not_an_option=True
+        )
+
+
+def test_assume_roles_invalid_kwargs(
+    sts_moto: None,
+    role_arn: str
+) -> None:
+    with pytest.raises(MissingKWArgError):
+        assume_roles(
+            source_session=boto3.Session(),
+            assume_role_kwargs_list=[
+                {
+                    "RoleArn": role_arn
+                }
+            ]
+        )
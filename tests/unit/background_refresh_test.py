@@ -0,0 +1,88 @@
+
+import datetime
+import gc
+import time
+
+from typing import Callable
+
+import boto3
+from dateutil.tz import tzlocal
+
+from boto3_assume import BackgroundRefresher
+
+
+def test_refresh_before_advisory_window(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    with BackgroundRefresher(lead_time=0.5, jitter=0, retry_interval=0.1, poll_interval=0.1) as refresher:
+        assume_sess = assume_session(assume_role_kwargs={"DurationSeconds": 3600}, background_refresher=refresher)
+        creds = assume_sess.get_credentials()
+        # not fetched yet, so the refresher keeps polling
+        time.sleep(0.3)
+        assert creds._expiry_time is None
+        creds.get_frozen_credentials()
+        # move the expiry so the creds are 1 second away from the advisory window
+        soon = datetime.datetime.now(tzlocal()) + datetime.timedelta(seconds=creds._advisory_refresh_timeout + 1)
+        creds._expiry_time = soon
+        time.sleep(1)
+        assert creds._expiry_time > soon
+        # a request thread should not need to refresh
+        assert not creds.refresh_needed()
+
+
+def test_jitter_spreads_refreshes(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    refresh_times = []
+    sess.events.register("before-call.sts.AssumeRole", lambda **kwargs: refresh_times.append(time.monotonic()))
+    with BackgroundRefresher(lead_time=0.1, jitter=2, retry_interval=0.1, poll_interval=0.1) as refresher:
+        credentials_list = [
+            assume_session(sess, assume_role_kwargs={"DurationSeconds": 3600}, background_refresher=refresher).get_credentials()
+            for _ in range(20)
+        ]
+        # every session is 3 seconds away from the advisory window at the same moment
+        soon = datetime.datetime.now(tzlocal()) + datetime.timedelta(seconds=credentials_list[0]._advisory_refresh_timeout + 3)
+        for creds in credentials_list:
+            creds.get_frozen_credentials()
+            creds._expiry_time = soon
+
+        refresh_times.clear()
+        time.sleep(3.5)
+
+    assert len(refresh_times) == 20
+    assert all(creds._expiry_time > soon for creds in credentials_list)
+    # the refreshes are spread over most of the 2 second jitter, not bunched up at the lead time
+    assert max(refresh_times) - min(refresh_times) > 1
+
+
+def test_unreferenced_credentials_are_dropped(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    with BackgroundRefresher(poll_interval=0.1) as refresher:
+        assume_sess = assume_session(assume_role_kwargs={"DurationSeconds": 3600}, background_refresher=refresher)
+        assert len(refresher) == 1
+        del assume_sess
+        gc.collect()
+        time.sleep(0.3)
+        assert len(refresher) == 0
+
+
+def test_stop(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    refresher = BackgroundRefresher()
+    assume_sess = assume_session(assume_role_kwargs={"DurationSeconds": 3600}, background_refresher=refresher)
+    thread = refresher._thread
+    assert thread.is_alive()
+    refresher.stop()
+    assert not thread.is_alive()
+    assert len(refresher) == 0
+    # registering again restarts the thread
+    refresher.register(assume_sess.get_credentials())
+    assert refresher._thread.is_alive()
+    refresher.stop()
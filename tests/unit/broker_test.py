@@ -0,0 +1,109 @@
+
+import gc
+import multiprocessing
+import os
+from typing import Any, Callable, Dict, List
+import weakref
+
+import boto3
+import pytest
+
+from boto3_assume import (
+    broker_session,
+    CredentialBroker,
+    CredentialBrokerError,
+    STSClientPool
+)
+from boto3_assume import utils
+
+
+def test_broker_sessions_share_credentials(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]],
+    tmp_path
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    assume_sess = assume_session(sess)
+    socket_path = str(tmp_path / "broker.sock")
+    with CredentialBroker(session=assume_sess, socket_path=socket_path) as broker:
+        assert oct(os.stat(socket_path).st_mode & 0o777) == oct(0o600)
+        access_keys = {
+            broker_session(broker.socket_path, target_session_kwargs={"region_name": "us-east-1"})
+            .get_credentials().get_frozen_credentials().access_key
+            for _ in range(5)
+        }
+
+    assert len(calls) == 1
+    assert access_keys == {assume_sess.get_credentials().get_frozen_credentials().access_key}
+    assert not os.path.exists(socket_path)
+
+
+def test_broker_errors(tmp_path) -> None:
+    with pytest.raises(CredentialBrokerError):
+        broker_session(str(tmp_path / "missing.sock"), timeout=1).get_credentials().get_frozen_credentials()
+
+    failing_sess = boto3.Session(region_name="us-east-1")
+    failing_sess.get_credentials = lambda: None
+    with CredentialBroker(session=failing_sess, socket_path=str(tmp_path / "broker.sock")) as broker:
+        with pytest.raises(CredentialBrokerError, match="failed to get credentials"):
+            broker_session(broker.socket_path).get_credentials().get_frozen_credentials()
+
+
+def _access_key_in_child(socket_path: str, queue) -> None:
+    queue.put(broker_session(socket_path).get_credentials().get_frozen_credentials().access_key)
+
+
+def test_forked_workers_use_broker(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    tmp_path
+) -> None:
+    assume_sess = assume_session()
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    with CredentialBroker(session=assume_sess, socket_path=str(tmp_path / "broker.sock")) as broker:
+        processes = [
+            context.Process(target=_access_key_in_child, args=(broker.socket_path, queue))
+            for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+
+        access_keys = {queue.get(timeout=30) for _ in processes}
+        for process in processes:
+            process.join()
+
+    assert [process.exitcode for process in processes] == [0] * 3
+    assert access_keys == {assume_sess.get_credentials().get_frozen_credentials().access_key}
+
+
+def test_reset_after_fork(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    pool = STSClientPool()
+    assume_sess = assume_session(sts_client_pool=pool)
+    assume_sess.get_credentials().get_frozen_credentials()
+    refresh = assume_sess.get_credentials()._refresh_using.__self__
+    assert refresh._sts_client_instance is not None
+    assert len(pool) == 1
+
+    # what the fork hook runs in the child process
+    utils._reset_after_fork()
+    assert refresh._sts_client_instance is None
+    assert len(pool) == 0
+    # the next refresh creates a new client
+    refresh.refresh()
+    assert len(pool) == 1
+
+
+def test_fork_reset_does_not_keep_objects_alive() -> None:
+    pool = STSClientPool()
+    assert pool in utils._fork_resets
+    pool_ref = weakref.ref(pool)
+
+    del pool
+    gc.collect()
+    assert pool_ref() is None
@@ -0,0 +1,95 @@
+
+import datetime
+import threading
+from typing import Callable
+
+import boto3
+from botocore.config import Config
+from dateutil.tz import tzlocal
+
+from boto3_assume import assume_role_chain, CachedClientSession
+
+
+_TARGET_SESSION_KWARGS = {"region_name": "us-east-1"}
+
+
+def test_clients_are_cached(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    assume_sess = assume_session(target_session_kwargs=_TARGET_SESSION_KWARGS, cache_clients=True)
+    assert isinstance(assume_sess, CachedClientSession)
+    config = Config(retries={"max_attempts": 2})
+    s3_client = assume_sess.client("s3")
+    assert assume_sess.client("s3") is s3_client
+    assert assume_sess.client(service_name="s3") is not s3_client
+    assert assume_sess.client("s3", region_name="us-west-2") is not s3_client
+    assert assume_sess.client("s3", config=config) is assume_sess.client("s3", config=config)
+    # equal configs created per call share one client
+    for _ in range(50):
+        assume_sess.client("s3", config=Config(retries={"max_attempts": 2}))
+
+    assert len(assume_sess._clients) == 4
+    assert assume_sess.client("s3", config=Config(retries={"max_attempts": 3})) is not s3_client
+    assert len(assume_sess._clients) == 5
+
+    assume_sess.clear_cache()
+    assert assume_sess.client("s3") is not s3_client
+
+
+def test_resources_are_cached_per_thread(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    assume_sess = assume_session(target_session_kwargs=_TARGET_SESSION_KWARGS, cache_clients=True)
+    s3_resource = assume_sess.resource("s3")
+    assert assume_sess.resource("s3") is s3_resource
+    other_thread_resources = []
+    thread = threading.Thread(target=lambda: other_thread_resources.append(assume_sess.resource("s3")))
+    thread.start()
+    thread.join()
+    assert other_thread_resources[0] is not s3_resource
+    # clients created for resources are not cached
+    assert len(assume_sess._clients) == 0
+
+
+def test_cached_client_after_refresh(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    sts_arn: str
+) -> None:
+    assume_sess = assume_session(target_session_kwargs=_TARGET_SESSION_KWARGS, cache_clients=True)
+    sts_client = assume_sess.client("sts")
+    assert sts_client.get_caller_identity()["Arn"] == sts_arn
+    credentials = assume_sess.get_credentials()
+    access_key = credentials.get_frozen_credentials().access_key
+    credentials._expiry_time = datetime.datetime.now(tzlocal())
+    assert assume_sess.client("sts") is sts_client
+    assert sts_client.get_caller_identity()["Arn"] == sts_arn
+    assert credentials.get_frozen_credentials().access_key != access_key
+
+
+def test_default_session_is_not_cached(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    role_arn: str,
+    session_name: str
+) -> None:
+    assert type(assume_session(target_session_kwargs=_TARGET_SESSION_KWARGS)) is boto3.Session
+    assume_sess = assume_role_chain(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs_list=[
+            {
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            {
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            }
+        ],
+        cache_clients=True
+    )
+    assert isinstance(assume_sess, CachedClientSession)
+    # only the last hop caches clients
+    assert type(assume_sess.get_credentials()._refresh_using.__self__._source_session) is boto3.Session
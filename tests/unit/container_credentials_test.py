@@ -0,0 +1,86 @@
+
+import json
+import os
+import subprocess
+import sys
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Dict, List
+
+import boto3
+from botocore.credentials import ContainerProvider
+import pytest
+
+from boto3_assume import ContainerCredentialsServer
+
+
+def test_botocore_container_provider(
+    assume_session: Callable[..., boto3.Session],
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    assume_sess = assume_session(sess, sts_client_kwargs=moto_server_sts_client_kwargs)
+    with ContainerCredentialsServer(session=assume_sess) as server:
+        assert server.url.startswith("http://127.0.0.1:")
+        for _ in range(3):
+            credentials = ContainerProvider(environ=server.environ).load()
+            assert credentials.get_frozen_credentials() == assume_sess.get_credentials().get_frozen_credentials()
+
+    # every client shares the server's credentials
+    assert len(calls) == 1
+
+
+def test_subprocess_uses_server(
+    assume_session: Callable[..., boto3.Session],
+    moto_server: str,
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    sts_arn: str
+) -> None:
+    assume_sess = assume_session(sts_client_kwargs=moto_server_sts_client_kwargs)
+    with ContainerCredentialsServer(session=assume_sess) as server:
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if not key.startswith("AWS_") or key == "AWS_DEFAULT_REGION"
+        }
+        env.update(server.environ)
+        env["AWS_CONFIG_FILE"] = os.devnull
+        env["AWS_SHARED_CREDENTIALS_FILE"] = os.devnull
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"import boto3; print(boto3.client('sts', endpoint_url='{moto_server}', region_name='us-east-1').get_caller_identity()['Arn'])"
+            ],
+            env=env,
+            capture_output=True,
+            check=True,
+            text=True
+        )
+
+    assert result.stdout.strip() == sts_arn
+
+
+def test_requests_need_token(
+    assume_session: Callable[..., boto3.Session],
+    moto_server_sts_client_kwargs: Dict[str, Any]
+) -> None:
+    assume_sess = assume_session(sts_client_kwargs=moto_server_sts_client_kwargs)
+    with ContainerCredentialsServer(session=assume_sess, auth_token="secret") as server:
+        for headers in [{}, {"Authorization": "wrong"}]:
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(urllib.request.Request(server.url, headers=headers))
+
+            assert error.value.code == 401
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(urllib.request.Request(server.url + "/other", headers={"Authorization": "secret"}))
+
+        assert error.value.code == 404
+        with urllib.request.urlopen(urllib.request.Request(server.url, headers={"Authorization": "secret"})) as response:
+            body = json.loads(response.read())
+
+        assert body["Expiration"].endswith("Z")
+        assert body["AccessKeyId"] == assume_sess.get_credentials().get_frozen_credentials().access_key
@@ -0,0 +1,367 @@
+
+import datetime
+import json
+import multiprocessing
+import os
+import stat
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+import boto3
+from dateutil.tz import tzlocal
+import pytest
+
+from boto3_assume import assume_role, CredentialCache, FileCredentialCache
+from boto3_assume.credential_cache import credential_cache_key, fcntl
+
+
+def _fake_creds(expires_in: int) -> Dict[str, Any]:
+    expiry = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=expires_in)
+
+    return {
+        "access_key": "AKID",
+        "secret_key": "SECRET",
+        "token": "TOKEN",
+        "expiry_time": expiry.strftime('%Y-%m-%dT%H:%M:%S%Z')
+    }
+
+
+def test_sessions_share_credentials(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str,
+    sts_arn: str,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    cache = CredentialCache()
+    assume_sessions = [
+        assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            credential_cache=cache
+        )
+        for _ in range(5)
+    ]
+    access_keys = set()
+    for assume_sess in assume_sessions:
+        identity = assume_sess.client("sts", region_name="us-east-1").get_caller_identity()
+        assert identity['Arn'] == sts_arn
+        access_keys.add(assume_sess.get_credentials().get_frozen_credentials().access_key)
+
+    assert len(calls) == 1
+    assert len(access_keys) == 1
+    assert len(cache) == 1
+
+
+def test_different_kwargs_do_not_share(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    cache = CredentialCache()
+    for name in [session_name, "other-session"]:
+        assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": name
+            },
+            credential_cache=cache
+        ).get_credentials().get_frozen_credentials()
+
+    assert len(calls) == 2
+    assert len(cache) == 2
+
+
+def _expire_in(credentials, seconds: float) -> None:
+    credentials._expiry_time = datetime.datetime.now(tzlocal()) + datetime.timedelta(seconds=seconds)
+
+
+def test_advisory_refresh_gets_new_credentials(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    cache = CredentialCache()
+    creds = assume_session(sess, credential_cache=cache).get_credentials()
+    creds.get_frozen_credentials()
+    # the session and the cache both hold credentials inside the advisory window, but outside the mandatory one
+    _expire_in(creds, 800)
+    expiry_time = creds._expiry_time
+    for key, cached in cache._entries.items():
+        cache._expiry_times[key] = expiry_time
+        cached["expiry_time"] = expiry_time.isoformat()
+
+    creds.get_frozen_credentials()
+    assert len(calls) == 2
+    assert creds._expiry_time > expiry_time
+
+
+def test_refresh_window_wider_than_cache(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    creds = assume_session(
+        sess,
+        assume_role_kwargs={"DurationSeconds": 3600},
+        credential_cache=CredentialCache(),
+        advisory_refresh_timeout=3000
+    ).get_credentials()
+    access_key = creds.get_frozen_credentials().access_key
+    # the session's credentials look old to it, but the cache still holds the same ones with their real expiry
+    _expire_in(creds, 2000)
+    assert creds.get_frozen_credentials().access_key != access_key
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize(
+    "refresh_windows,refresh_calls",
+    [
+        ({}, 10),
+        ({"advisory_refresh_timeout": 300, "mandatory_refresh_timeout": 60}, 1)
+    ],
+    ids=["default-windows", "custom-windows"]
+)
+def test_short_lived_role_shares_credentials(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]],
+    refresh_windows: Dict[str, Any],
+    refresh_calls: int
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    cache = CredentialCache()
+    credentials_list = [
+        assume_session(sess, assume_role_kwargs={"DurationSeconds": 900}, credential_cache=cache, **refresh_windows).get_credentials()
+        for _ in range(10)
+    ]
+    # first fetches share credentials outside the mandatory window
+    access_keys = {creds.get_frozen_credentials().access_key for creds in credentials_list}
+    assert len(access_keys) == 1
+    assert len(calls) == 1
+
+    # every session refreshes inside its advisory window, one STS call serves the ones that have a window shorter than the credentials
+    for creds in credentials_list:
+        _expire_in(creds, 200)
+        creds.get_frozen_credentials()
+
+    assert len(calls) == 1 + refresh_calls
+
+
+def test_credential_cache_key(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    key = credential_cache_key(
+        source_session=sess,
+        sts_client_kwargs={},
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        }
+    )
+    # key order should not matter
+    assert key == credential_cache_key(
+        source_session=sess,
+        sts_client_kwargs={},
+        assume_role_kwargs={
+            "RoleSessionName": session_name,
+            "RoleArn": role_arn
+        }
+    )
+    assert key != credential_cache_key(
+        source_session=sess,
+        sts_client_kwargs={"region_name": "us-west-2"},
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        }
+    )
+
+
+def test_lru_eviction() -> None:
+    cache = CredentialCache(max_size=2)
+    for key in ["a", "b"]:
+        cache.get_or_fetch(key=key, fetch=lambda: _fake_creds(3600))
+
+    # use "a" so "b" is the least recently used
+    assert cache.get("a") is not None
+    cache.get_or_fetch(key="c", fetch=lambda: _fake_creds(3600))
+    assert len(cache) == 2
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_expiring_credentials_are_refetched() -> None:
+    cache = CredentialCache(min_remaining=600)
+    fetches = []
+
+    def fetch() -> Dict[str, Any]:
+        fetches.append(None)
+        return _fake_creds(300)
+
+    cache.get_or_fetch(key="a", fetch=fetch)
+    cache.get_or_fetch(key="a", fetch=fetch)
+    assert len(fetches) == 2
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.get_or_fetch(key="a", fetch=lambda: _fake_creds(3600))
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_single_flight() -> None:
+    cache = CredentialCache()
+    fetches = []
+    results = []
+
+    def fetch() -> Dict[str, Any]:
+        fetches.append(None)
+        time.sleep(0.2)
+        return _fake_creds(3600)
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch(key="a", fetch=fetch)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(fetches) == 1
+    assert len(results) == 10
+
+
+def test_single_flight_error() -> None:
+    cache = CredentialCache()
+    errors = []
+
+    def fetch() -> Dict[str, Any]:
+        time.sleep(0.2)
+        raise ValueError("STS is down")
+
+    def get() -> None:
+        try:
+            cache.get_or_fetch(key="a", fetch=fetch)
+        except ValueError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=get) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 5
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        cache.get_or_fetch(key="a", fetch=fetch)
+
+
+def test_file_cache_shared_between_instances(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str,
+    tmp_path,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    access_keys = set()
+    for _ in range(3):
+        # a new cache instance for each session, like separate processes would have
+        assume_sess = assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            credential_cache=FileCredentialCache(directory=str(tmp_path / "cache"))
+        )
+        access_keys.add(assume_sess.get_credentials().get_frozen_credentials().access_key)
+
+    assert len(calls) == 1
+    assert len(access_keys) == 1
+    cache_files = [name for name in os.listdir(tmp_path / "cache") if name.endswith(".json")]
+    assert len(cache_files) == 1
+    assert not [name for name in os.listdir(tmp_path / "cache") if name.endswith(".tmp")]
+    assert stat.S_IMODE(os.stat(tmp_path / "cache" / cache_files[0]).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(tmp_path / "cache").st_mode) == 0o700
+
+
+def test_file_cache_expiry_and_corruption(tmp_path) -> None:
+    cache = FileCredentialCache(directory=str(tmp_path), min_remaining=600)
+    cache.get_or_fetch(key="a", fetch=lambda: _fake_creds(300))
+    assert cache.get("a") is None
+    cache.get_or_fetch(key="a", fetch=lambda: _fake_creds(3600))
+    assert cache.get("a")["access_key"] == "AKID"
+
+    with open(tmp_path / "a.json", "w") as creds_file:
+        creds_file.write("{not json")
+
+    assert cache.get("a") is None
+    with open(tmp_path / "a.json", "w") as creds_file:
+        json.dump({"access_key": "AKID"}, creds_file)
+
+    assert cache.get("a") is None
+
+    cache.get_or_fetch(key="a", fetch=lambda: _fake_creds(3600))
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.invalidate("a")
+    cache.get_or_fetch(key="b", fetch=lambda: _fake_creds(3600))
+    cache.clear()
+    assert cache.get("b") is None
+    FileCredentialCache(directory=str(tmp_path / "missing")).clear()
+
+
+def _fetch_in_process(directory: str, counter_path: str) -> None:
+    def fetch() -> Dict[str, Any]:
+        with open(counter_path, "a") as counter:
+            counter.write("fetch\n")
+
+        time.sleep(0.3)
+        return _fake_creds(3600)
+
+    FileCredentialCache(directory=directory).get_or_fetch(key="a", fetch=fetch)
+
+
+@pytest.mark.skipif(fcntl is None, reason="file locking requires fcntl")
+def test_file_cache_single_fetch_across_processes(tmp_path) -> None:
+    counter_path = str(tmp_path / "counter")
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_fetch_in_process, args=(str(tmp_path / "cache"), counter_path))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join()
+
+    assert [process.exitcode for process in processes] == [0] * 4
+    with open(counter_path) as counter:
+        assert counter.read().splitlines() == ["fetch"]
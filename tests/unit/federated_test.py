@@ -0,0 +1,164 @@
+
+import base64
+import datetime
+import os
+import pathlib
+from typing import List
+
+import boto3
+from dateutil.tz import tzlocal
+import pytest
+
+from boto3_assume import assume_role_with_saml, assume_role_with_web_identity, ForbiddenKWArgError, MissingKWArgError
+
+
+SAML_ASSERTION = """<?xml version="1.0"?>
+<samlp:Response xmlns:samlp="urn:oasis:names:tc:SAML:2.0:protocol">
+  <saml:Assertion xmlns:saml="urn:oasis:names:tc:SAML:2.0:assertion">
+    <saml:AttributeStatement>
+      <saml:Attribute Name="https://aws.amazon.com/SAML/Attributes/Role">
+        <saml:AttributeValue>arn:aws:iam::123412341234:role/my_role,arn:aws:iam::123412341234:saml-provider/my_idp</saml:AttributeValue>
+      </saml:Attribute>
+      <saml:Attribute Name="https://aws.amazon.com/SAML/Attributes/RoleSessionName">
+        <saml:AttributeValue>tester-session</saml:AttributeValue>
+      </saml:Attribute>
+    </saml:AttributeStatement>
+  </saml:Assertion>
+</samlp:Response>
+"""
+
+
+def _capture_param(session: boto3.Session, operation: str, param: str) -> List[str]:
+    values = []
+    session.events.register(
+        f"provide-client-params.sts.{operation}",
+        lambda params, **kwargs: values.append(params[param])
+    )
+
+    return values
+
+
+def _expire(assume_sess: boto3.Session) -> None:
+    assume_sess.get_credentials()._expiry_time = datetime.datetime.now(tzlocal())
+
+
+def test_web_identity_token_file(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str,
+    sts_arn: str,
+    tmp_path: pathlib.Path
+) -> None:
+    token_file = tmp_path / "token"
+    token_file.write_text("first-token\n")
+    sess = boto3.Session(region_name="us-east-1")
+    tokens = _capture_param(sess, "AssumeRoleWithWebIdentity", "WebIdentityToken")
+    assume_sess = assume_role_with_web_identity(
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        },
+        web_identity_token_file=str(token_file),
+        source_session=sess
+    )
+    assert assume_sess.get_credentials().method == "sts-assume-role-with-web-identity"
+    assert assume_sess.client("sts", region_name="us-east-1").get_caller_identity()["Arn"] == sts_arn
+    assume_refresh = assume_sess.get_credentials()._refresh_using.__self__
+    mtime = assume_refresh._web_identity_token[0]
+
+    # unchanged files are not read again
+    _expire(assume_sess)
+    assume_sess.get_credentials().get_frozen_credentials()
+    assert assume_refresh._web_identity_token[0] == mtime
+
+    token_file.write_text("rotated-token\n")
+    os.utime(token_file, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+    _expire(assume_sess)
+    assume_sess.get_credentials().get_frozen_credentials()
+    assert tokens == ["first-token", "first-token", "rotated-token"]
+
+
+def test_web_identity_from_environment(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str,
+    sts_arn: str,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    token_file = tmp_path / "token"
+    token_file.write_text("token")
+    monkeypatch.setenv("AWS_ROLE_ARN", role_arn)
+    monkeypatch.setenv("AWS_ROLE_SESSION_NAME", session_name)
+    monkeypatch.setenv("AWS_WEB_IDENTITY_TOKEN_FILE", str(token_file))
+    assume_sess = assume_role_with_web_identity(target_session_kwargs={"region_name": "us-east-1"}, prefetch=True)
+    assert assume_sess.client("sts").get_caller_identity()["Arn"] == sts_arn
+
+
+def test_web_identity_from_irsa_environment(
+    sts_moto: None,
+    role_arn: str,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    token_file = tmp_path / "token"
+    token_file.write_text("token")
+    # EKS only sets these two
+    monkeypatch.setenv("AWS_ROLE_ARN", role_arn)
+    monkeypatch.setenv("AWS_WEB_IDENTITY_TOKEN_FILE", str(token_file))
+    monkeypatch.delenv("AWS_ROLE_SESSION_NAME", raising=False)
+    assume_sess = assume_role_with_web_identity(target_session_kwargs={"region_name": "us-east-1"}, prefetch=True)
+    identity_arn = assume_sess.client("sts").get_caller_identity()["Arn"]
+    assert identity_arn.startswith("arn:aws:sts::123412341234:assumed-role/my_role/botocore-session-")
+
+
+def test_web_identity_kwargs(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("AWS_WEB_IDENTITY_TOKEN_FILE", raising=False)
+    assume_role_kwargs = {
+        "RoleArn": role_arn,
+        "RoleSessionName": session_name
+    }
+    with pytest.raises(MissingKWArgError):
+        assume_role_with_web_identity(assume_role_kwargs=assume_role_kwargs)
+
+    with pytest.raises(ForbiddenKWArgError):
+        assume_role_with_web_identity(
+            assume_role_kwargs={**assume_role_kwargs, "WebIdentityToken": "token"},
+            web_identity_token_file="token"
+        )
+
+
+def test_saml(
+    sts_moto: None,
+    role_arn: str
+) -> None:
+    assertions = []
+
+    def saml_assertion() -> str:
+        assertions.append(None)
+        return base64.b64encode(SAML_ASSERTION.encode("utf-8")).decode("utf-8")
+
+    assume_sess = assume_role_with_saml(
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "PrincipalArn": "arn:aws:iam::123412341234:saml-provider/my_idp"
+        },
+        saml_assertion=saml_assertion,
+        source_session=boto3.Session(region_name="us-east-1"),
+        target_session_kwargs={"region_name": "us-east-1"}
+    )
+    assert assume_sess.get_credentials().method == "sts-assume-role-with-saml"
+    # moto does not map SAML credentials back to the role for get_caller_identity
+    assert assume_sess.get_credentials().get_frozen_credentials().access_key.startswith("ASIA")
+    _expire(assume_sess)
+    assume_sess.get_credentials().get_frozen_credentials()
+    # a new assertion for every STS call
+    assert len(assertions) == 2
+
+    with pytest.raises(MissingKWArgError):
+        assume_role_with_saml(assume_role_kwargs={"RoleArn": role_arn}, saml_assertion=saml_assertion)
@@ -0,0 +1,61 @@
+
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+import boto3_assume
+
+
+# cumulative microseconds, generous enough for slow CI runners
+IMPORT_BUDGET_US = 100_000
+HEAVY_MODULES = ["boto3", "botocore", "aioboto3", "aiobotocore", "aiohttp"]
+
+
+def _import_times(statement: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every module imported by ``statement`` in a fresh interpreter.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, module = line.split("|")
+        import_times[module.strip()] = int(cumulative)
+
+    return import_times
+
+
+def test_import_is_lazy() -> None:
+    import_times = _import_times("import boto3_assume")
+    for module in HEAVY_MODULES:
+        assert module not in import_times
+
+    assert import_times["boto3_assume"] < IMPORT_BUDGET_US
+
+
+def test_sync_api_does_not_import_aio() -> None:
+    import_times = _import_times("from boto3_assume import assume_role")
+    assert "boto3" in import_times
+    assert "aioboto3" not in import_times
+    assert "boto3_assume.aio_core" not in import_times
+
+
+def test_lazy_attributes() -> None:
+    from boto3_assume.core import assume_role
+
+    assert boto3_assume.assume_role is assume_role
+    assert set(boto3_assume.__all__) <= set(dir(boto3_assume))
+    with pytest.raises(AttributeError):
+        boto3_assume.not_a_name
+
+    from boto3_assume import assume_role_async
+    from boto3_assume.aio_core import assume_role_async as aio_assume_role_async
+    assert assume_role_async is aio_assume_role_async
@@ -0,0 +1,178 @@
+
+import datetime
+import socket
+from typing import Any, Dict
+
+import aioboto3
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+from dateutil.tz import tzlocal
+import pytest
+
+from boto3_assume import (
+    assume_role,
+    assume_role_async,
+    CredentialCache,
+    InMemoryRefreshMetrics,
+    RefreshMetrics,
+    StatsDRefreshMetrics
+)
+
+
+def _throttle_once(session: boto3.Session) -> None:
+    codes = ["Throttling"]
+
+    def before_call(params: Dict[str, Any], **kwargs) -> Any:
+        if not codes:
+            return None
+
+        code = codes.pop(0)
+        return (
+            AWSResponse(url="https://sts.amazonaws.com", status_code=400, headers={}, raw=None),
+            {
+                "Error": {"Code": code, "Message": code},
+                "ResponseMetadata": {"HTTPStatusCode": 400}
+            }
+        )
+
+    session.events.register("before-call.sts.AssumeRole", before_call)
+
+
+def test_refresh_metrics(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    _throttle_once(sess)
+    metrics = InMemoryRefreshMetrics()
+    assume_sess = assume_role(
+        source_session=sess,
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        },
+        metrics=metrics
+    )
+    creds = assume_sess.get_credentials()
+    with pytest.raises(ClientError):
+        creds.get_frozen_credentials()
+
+    creds.get_frozen_credentials()
+    # force a refresh 5 minutes before expiry
+    creds._expiry_time = datetime.datetime.now(tzlocal()) + datetime.timedelta(seconds=300)
+    creds._refresh_using.__self__._expiry_time = creds._expiry_time
+    creds.get_frozen_credentials()
+
+    assert metrics.refreshes == {role_arn: 3}
+    assert metrics.sts_calls == {role_arn: 3}
+    assert metrics.failures == {(role_arn, "Throttling"): 1}
+    assert sum(metrics.latency[role_arn][:-1]) == 3
+    # only the last refresh had credentials to report on, it lands in the 300 second bucket
+    expiry_histogram = metrics.time_to_expiry[role_arn]
+    assert sum(expiry_histogram[:-1]) == 1
+    assert expiry_histogram[metrics.expiry_buckets.index(300)] == 1
+    assert metrics.cache_hits == {}
+    assert metrics.cache_misses == {}
+
+    text = metrics.prometheus_text()
+    assert f'boto3_assume_refreshes_total{{role_arn="{role_arn}"}} 3' in text
+    assert f'boto3_assume_sts_failures_total{{role_arn="{role_arn}",error_code="Throttling"}} 1' in text
+    assert f'boto3_assume_sts_latency_seconds_bucket{{role_arn="{role_arn}",le="+Inf"}} 3' in text
+    assert f'boto3_assume_time_to_expiry_seconds_count{{role_arn="{role_arn}"}} 1' in text
+
+
+def test_cache_metrics(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    metrics = InMemoryRefreshMetrics()
+    cache = CredentialCache()
+    for _ in range(3):
+        assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            credential_cache=cache,
+            metrics=metrics
+        ).get_credentials().get_frozen_credentials()
+
+    assert metrics.refreshes == {role_arn: 3}
+    assert metrics.sts_calls == {role_arn: 1}
+    assert metrics.cache_misses == {role_arn: 1}
+    assert metrics.cache_hits == {role_arn: 2}
+
+
+def test_custom_metrics(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    events = []
+
+    class Recorder(RefreshMetrics):
+
+        def on_sts_call(self, role_arn: str, latency: float, error_code: str) -> None:
+            events.append((role_arn, error_code))
+
+    assume_role(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        },
+        metrics=Recorder()
+    ).get_credentials().get_frozen_credentials()
+    assert events == [(role_arn, None)]
+
+
+def test_statsd_metrics() -> None:
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(5)
+    metrics = StatsDRefreshMetrics(port=server.getsockname()[1], prefix="app")
+    metrics.on_refresh(role_arn="arn", time_to_expiry=1.5)
+    metrics.on_sts_call(role_arn="arn", latency=0.25, error_code="Throttling")
+    metrics.on_cache_hit(role_arn="arn")
+    metrics.on_cache_miss(role_arn="arn")
+    received = [server.recv(1024).decode("utf-8") for _ in range(6)]
+    server.close()
+    assert received == [
+        "app.refresh:1|c",
+        "app.time_to_expiry:1500|ms",
+        "app.sts_latency:250|ms",
+        "app.sts_failure.Throttling:1|c",
+        "app.cache_hit:1|c",
+        "app.cache_miss:1|c"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_refresh_metrics(
+    moto_server: str,
+    role_arn: str,
+    session_name: str
+) -> None:
+    metrics = InMemoryRefreshMetrics()
+    async with assume_role_async(
+        source_session=aioboto3.Session(),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        },
+        sts_client_kwargs={
+            "endpoint_url": moto_server,
+            "region_name": "us-east-1"
+        },
+        metrics=metrics
+    ) as assume_sess:
+        await (await assume_sess.get_credentials()).get_frozen_credentials()
+
+    assert metrics.refreshes == {role_arn: 1}
+    assert metrics.sts_calls == {role_arn: 1}
+    assert metrics.failures == {}
@@ -0,0 +1,145 @@
+
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+import aioboto3
+import boto3
+import pytest
+
+from boto3_assume import assume_role, assume_role_async, InMemoryRefreshMetrics, STSRateLimiter
+
+
+def test_token_bucket() -> None:
+    limiter = STSRateLimiter(rate=20, burst=2)
+    start = time.monotonic()
+    waits = [limiter.acquire() for _ in range(6)]
+    # the burst goes through at once, the rest wait for new tokens
+    assert waits[0] < 0.01 and waits[1] < 0.01
+    assert time.monotonic() - start >= (6 - 2) / 20 * 0.9
+    assert limiter.queue_depth == 0
+
+
+def test_closest_to_expiry_first() -> None:
+    limiter = STSRateLimiter(rate=5, burst=1)
+    limiter.acquire()
+    order: List[Optional[float]] = []
+
+    def worker(time_to_expiry: Optional[float]) -> None:
+        limiter.acquire(time_to_expiry=time_to_expiry)
+        order.append(time_to_expiry)
+
+    threads = []
+    for time_to_expiry in [None, 600, 60]:
+        threads.append(threading.Thread(target=worker, args=(time_to_expiry,)))
+        threads[-1].start()
+        while limiter.queue_depth < len(threads):
+            time.sleep(0.001)
+
+    for thread in threads:
+        thread.join()
+
+    # first time fetches go last
+    assert order == [60, 600, None]
+
+
+@pytest.mark.asyncio
+async def test_acquire_async_does_not_use_executor(monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = STSRateLimiter(rate=20, burst=1)
+    limiter.acquire()
+    monkeypatch.setattr(asyncio.get_running_loop(), "run_in_executor", None)
+    order: List[Optional[float]] = []
+
+    async def worker(time_to_expiry: Optional[float]) -> None:
+        await limiter.acquire_async(time_to_expiry=time_to_expiry)
+        order.append(time_to_expiry)
+
+    tasks = [asyncio.create_task(worker(time_to_expiry)) for time_to_expiry in [None, 600, 60]]
+    # a thread waiting on the same limiter wakes the coroutines up when it takes its token
+    thread = threading.Thread(target=limiter.acquire, args=(1,))
+    await asyncio.sleep(0.01)
+    thread.start()
+    await asyncio.gather(*tasks)
+    thread.join()
+
+    assert order == [60, 600, None]
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_acquire_async_leaves_queue() -> None:
+    limiter = STSRateLimiter(rate=10, burst=1)
+    limiter.acquire()
+    cancelled = asyncio.create_task(limiter.acquire_async(time_to_expiry=1))
+    waiting = asyncio.create_task(limiter.acquire_async())
+    await asyncio.sleep(0.01)
+    assert limiter.queue_depth == 2
+
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    assert limiter.queue_depth == 1
+    await waiting
+    assert limiter.queue_depth == 0
+
+
+def test_assume_role_rate_limited(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    limiter = STSRateLimiter(rate=100, burst=1)
+    metrics = InMemoryRefreshMetrics()
+    sessions = [
+        assume_role(
+            source_session=boto3.Session(region_name="us-east-1"),
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": f"{session_name}-{i}"
+            },
+            metrics=metrics,
+            sts_rate_limiter=limiter
+        )
+        for i in range(3)
+    ]
+    for assume_sess in sessions:
+        assume_sess.get_credentials().get_frozen_credentials()
+
+    assert metrics.rate_limit_wait[role_arn][-1] > 0
+    assert sum(metrics.rate_limit_wait[role_arn][:-1]) == 3
+    assert "boto3_assume_sts_queue_depth 0" in metrics.prometheus_text()
+    # the expiry is known after the first fetch, so refreshes are queued ahead of first time fetches
+    assert sessions[0].get_credentials()._refresh_using.__self__._time_to_expiry() > 0
+
+
+@pytest.mark.asyncio
+async def test_assume_role_async_rate_limited(
+    moto_server: str,
+    role_arn: str,
+    session_name: str,
+    sts_arn: str
+) -> None:
+    limiter = STSRateLimiter(rate=100, burst=1)
+    metrics = InMemoryRefreshMetrics()
+    limiter.acquire()
+    async with assume_role_async(
+        source_session=aioboto3.Session(),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        },
+        sts_client_kwargs={
+            "endpoint_url": moto_server,
+            "region_name": "us-east-1"
+        },
+        metrics=metrics,
+        sts_rate_limiter=limiter
+    ) as assume_sess:
+        async with assume_sess.client("sts", endpoint_url=moto_server, region_name="us-east-1") as sts_client:
+            identity = await sts_client.get_caller_identity()
+            assert identity["Arn"] == sts_arn
+
+    # the sync call used the only token, so the async refresh had to wait
+    assert metrics.rate_limit_wait[role_arn][-1] > 0
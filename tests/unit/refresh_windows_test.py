@@ -0,0 +1,163 @@
+
+from typing import Any, Callable, Dict, List
+
+import aioboto3
+import boto3
+import pytest
+
+from boto3_assume import assume_role, assume_role_async, RefreshWindowError
+
+
+def _count_sts_calls(
+    assume_session: Callable[..., boto3.Session],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]],
+    num_calls: int,
+    **kwargs
+) -> int:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    assume_sess = assume_session(sess, assume_role_kwargs={"DurationSeconds": 900}, **kwargs)
+    creds = assume_sess.get_credentials()
+    for _ in range(num_calls):
+        creds.get_frozen_credentials()
+
+    return len(calls)
+
+
+def test_default_windows_refresh_short_lived_credentials(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    # 15 minute credentials are always inside botocore's 15 minute advisory window
+    assert _count_sts_calls(assume_session, count_assume_role_calls, num_calls=5) == 5
+
+
+def test_custom_windows(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]],
+    role_arn: str,
+    session_name: str
+) -> None:
+    assert _count_sts_calls(
+        assume_session,
+        count_assume_role_calls,
+        num_calls=5,
+        advisory_refresh_timeout=300,
+        mandatory_refresh_timeout=60
+    ) == 1
+    creds = assume_role(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name
+        },
+        advisory_refresh_timeout=300,
+        mandatory_refresh_timeout=60
+    ).get_credentials()
+    assert creds._advisory_refresh_timeout == 300
+    assert creds._mandatory_refresh_timeout == 60
+
+
+def test_invalid_windows(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    # botocore's 10 minute mandatory window would swallow the advisory one
+    with pytest.raises(RefreshWindowError):
+        assume_session(advisory_refresh_timeout=60)
+
+    with pytest.raises(RefreshWindowError):
+        assume_session(advisory_refresh_timeout=300, mandatory_refresh_timeout=300)
+
+    with pytest.raises(RefreshWindowError):
+        assume_session(mandatory_refresh_timeout=1200)
+
+
+def test_adaptive_windows(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]],
+    role_arn: str,
+    session_name: str
+) -> None:
+    assert _count_sts_calls(assume_session, count_assume_role_calls, num_calls=5, adaptive_refresh=True) == 1
+
+    creds = assume_role(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name,
+            "DurationSeconds": 900
+        },
+        adaptive_refresh=True
+    ).get_credentials()
+    creds.get_frozen_credentials()
+    # moto is fast, so the mandatory window is the minimum
+    assert creds._mandatory_refresh_timeout == 30
+    assert 320 < creds._advisory_refresh_timeout <= 330
+    assert creds._sts_latency is not None
+
+    # long lived credentials keep botocore's windows as the maximum
+    creds = assume_role(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name,
+            "DurationSeconds": 43200
+        },
+        adaptive_refresh=True,
+        mandatory_refresh_timeout=120
+    ).get_credentials()
+    creds.get_frozen_credentials()
+    assert creds._mandatory_refresh_timeout == 30
+    assert creds._advisory_refresh_timeout == 900
+
+
+def test_adaptive_windows_slow_sts(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    creds = assume_role(
+        source_session=boto3.Session(region_name="us-east-1"),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name,
+            "DurationSeconds": 3600
+        },
+        adaptive_refresh=True
+    ).get_credentials()
+    creds.get_frozen_credentials()
+    creds._adapt_refresh_windows(latency=12)
+    # a slow STS call widens the mandatory window so a refresh can finish before expiry
+    assert creds._mandatory_refresh_timeout > 30
+    assert creds._mandatory_refresh_timeout <= 600
+    assert creds._advisory_refresh_timeout > creds._mandatory_refresh_timeout
+
+
+@pytest.mark.asyncio
+async def test_async_adaptive_windows(
+    moto_server: str,
+    role_arn: str,
+    session_name: str
+) -> None:
+    async with assume_role_async(
+        source_session=aioboto3.Session(),
+        assume_role_kwargs={
+            "RoleArn": role_arn,
+            "RoleSessionName": session_name,
+            "DurationSeconds": 900
+        },
+        sts_client_kwargs={
+            "endpoint_url": moto_server,
+            "region_name": "us-east-1"
+        },
+        adaptive_refresh=True
+    ) as assume_sess:
+        creds = await assume_sess.get_credentials()
+        await creds.get_frozen_credentials()
+        assert creds._mandatory_refresh_timeout == 30
+        assert 320 < creds._advisory_refresh_timeout <= 330
+        assert not creds.refresh_needed()
@@ -0,0 +1,175 @@
+
+import datetime
+import threading
+import time
+from typing import Any, Callable, Dict
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+from dateutil.tz import tzlocal
+import pytest
+
+from boto3_assume import RefreshCircuitOpenError, ResiliencePolicy
+from boto3_assume.resilience import _CircuitBreaker
+
+
+class _STSOutage:
+    """Make STS throttle or hang while ``failing`` or ``delay`` are set, and count the calls.
+    """
+
+    def __init__(self, session: boto3.Session):
+        self.failing = False
+        self.delay = 0.0
+        self.calls = 0
+        session.events.register("before-call.sts.AssumeRole", self.before_call)
+
+
+    def before_call(self, params: Dict[str, Any], **kwargs) -> Any:
+        self.calls += 1
+        time.sleep(self.delay)
+        if not self.failing:
+            return None
+
+        return (
+            AWSResponse(url="https://sts.amazonaws.com", status_code=400, headers={}, raw=None),
+            {
+                "Error": {"Code": "Throttling", "Message": "Rate exceeded"},
+                "ResponseMetadata": {"HTTPStatusCode": 400}
+            }
+        )
+
+
+def _expire_in(creds, seconds: float) -> None:
+    creds._expiry_time = datetime.datetime.now(tzlocal()) + datetime.timedelta(seconds=seconds)
+
+
+def test_without_resilience_errors_surface(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    outage = _STSOutage(sess)
+    creds = assume_session(sess).get_credentials()
+    creds.get_frozen_credentials()
+    outage.failing = True
+    _expire_in(creds, 300)
+    with pytest.raises(ClientError):
+        creds.get_frozen_credentials()
+
+
+def test_serve_valid_credentials_while_sts_fails(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    outage = _STSOutage(sess)
+    creds = assume_session(
+        sess,
+        resilience=ResiliencePolicy(backoff_base=0.05, backoff_max=0.1, failure_threshold=100)
+    ).get_credentials()
+    access_key = creds.get_frozen_credentials().access_key
+    outage.failing = True
+    _expire_in(creds, 300)
+    # inside the mandatory window, but still valid, so no errors
+    for _ in range(5):
+        assert creds.get_frozen_credentials().access_key == access_key
+
+    time.sleep(0.5)
+    assert outage.calls > 2
+    outage.failing = False
+    time.sleep(0.5)
+    assert creds.get_frozen_credentials().access_key != access_key
+    assert not creds.refresh_needed()
+    assert not creds._revalidation_thread.is_alive()
+
+
+def test_slow_sts_does_not_block(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    outage = _STSOutage(sess)
+    creds = assume_session(sess, resilience=ResiliencePolicy()).get_credentials()
+    creds.get_frozen_credentials()
+    outage.delay = 1
+    _expire_in(creds, 300)
+    start = time.perf_counter()
+    creds.get_frozen_credentials()
+    assert time.perf_counter() - start < 0.5
+    creds._revalidation_thread.join()
+    assert not creds.refresh_needed()
+
+
+def test_circuit_breaker(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    outage = _STSOutage(sess)
+    creds = assume_session(
+        sess,
+        resilience=ResiliencePolicy(backoff_base=0.01, backoff_max=0.01, failure_threshold=3, reset_timeout=0.5)
+    ).get_credentials()
+    creds.get_frozen_credentials()
+    outage.failing = True
+    outage.calls = 0
+    _expire_in(creds, 300)
+    creds.get_frozen_credentials()
+    time.sleep(0.3)
+    # the breaker opened after 3 failures and stops STS calls until the reset timeout
+    assert outage.calls == 3
+    _expire_in(creds, -1)
+    with pytest.raises(RefreshCircuitOpenError) as error:
+        creds.get_frozen_credentials()
+
+    assert isinstance(error.value.__cause__, ClientError)
+    assert outage.calls == 3
+
+    # once half open, a successful refresh closes it again
+    outage.failing = False
+    time.sleep(0.5)
+    creds.get_frozen_credentials()
+    assert not creds.refresh_needed()
+    assert creds._circuit_breaker.allow()
+
+
+def test_half_open_circuit_breaker_lets_one_probe_through() -> None:
+    breaker = _CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    breaker.record_failure(RuntimeError("throttled"))
+
+    def allowed_calls() -> int:
+        barrier = threading.Barrier(20)
+        results = []
+
+        def call() -> None:
+            barrier.wait()
+            results.append(breaker.allow())
+
+        threads = [threading.Thread(target=call) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return results.count(True)
+
+    assert allowed_calls() == 0
+    time.sleep(0.2)
+    # only the probe goes to STS, the others are refused until it finishes
+    assert allowed_calls() == 1
+    assert allowed_calls() == 0
+
+    # a failed probe opens the breaker again
+    breaker.record_failure(RuntimeError("throttled"))
+    assert allowed_calls() == 0
+    time.sleep(0.2)
+    assert allowed_calls() == 1
+
+    # a probe that neither succeeded nor failed hands over to the next caller
+    breaker.release_probe()
+    assert allowed_calls() == 1
+
+    breaker.record_success()
+    assert allowed_calls() == 20
@@ -0,0 +1,133 @@
+
+import pathlib
+from typing import Any, Callable, Dict, List
+
+import boto3
+from botocore.exceptions import ProfileNotFound
+import pytest
+
+from boto3_assume import ForbiddenKWArgError, RoleConfig, RoleConfigError
+
+
+ROLE_CONFIG = """
+[default]
+region = us-east-1
+
+[profile hub]
+role_arn = arn:aws:iam::123412341234:role/hub_role
+role_session_name = hub-session
+duration_seconds = 7200
+
+[profile spoke]
+role_arn = arn:aws:iam::432143214321:role/spoke_role
+role_session_name = spoke-session
+source_profile = hub
+duration_seconds = 7200
+region = us-west-2
+
+[sso-session my-sso]
+sso_region = us-east-1
+"""
+
+
+@pytest.fixture(scope="function")
+def role_config_path(tmp_path: pathlib.Path) -> str:
+    path = tmp_path / "roles.ini"
+    path.write_text(ROLE_CONFIG)
+
+    return str(path)
+
+
+def test_profiles_share_credentials(
+    sts_moto: None,
+    role_config_path: str,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    role_config = RoleConfig(role_config_path, source_session=sess)
+    assert role_config.profiles == ["hub", "spoke"]
+    hub_session = role_config.session("hub")
+    assert role_config.session("hub").get_credentials() is hub_session.get_credentials()
+    assert role_config.credentials("hub") is hub_session.get_credentials()
+    identity = hub_session.client("sts").get_caller_identity()
+    assert identity["Arn"] == "arn:aws:sts::123412341234:assumed-role/hub_role/hub-session"
+    role_config.session("hub").client("sts").get_caller_identity()
+    assert len(calls) == 1
+    assert hub_session.get_credentials()._refresh_using.__self__._assume_role_kwargs["DurationSeconds"] == 7200
+
+
+def test_chained_profile(
+    sts_moto: None,
+    role_config_path: str
+) -> None:
+    role_config = RoleConfig(role_config_path, source_session=boto3.Session(region_name="us-east-1"))
+    spoke_session = role_config.session("spoke")
+    assert spoke_session.region_name == "us-west-2"
+    identity = spoke_session.client("sts").get_caller_identity()
+    assert identity["Arn"] == "arn:aws:sts::432143214321:assumed-role/spoke_role/spoke-session"
+    spoke_refresh = spoke_session.get_credentials()._refresh_using.__self__
+    # chained hops are capped at 1 hour
+    assert spoke_refresh._assume_role_kwargs["DurationSeconds"] == 3600
+    assert spoke_refresh._source_session.get_credentials() is role_config.credentials("hub")
+
+
+def test_provider_resolves_profile(
+    sts_moto: None,
+    role_config_path: str,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("AWS_CONFIG_FILE", role_config_path)
+    role_config = RoleConfig(role_config_path, source_session=boto3.Session(region_name="us-east-1"))
+    spoke_session = boto3.Session(profile_name="spoke")
+    role_config.register(spoke_session)
+    assert spoke_session.get_credentials() is role_config.credentials("spoke")
+    assert spoke_session.get_credentials().method == "sts-assume-role"
+    # profiles that are not role profiles fall through to the rest of the chain
+    default_session = boto3.Session()
+    role_config.register(default_session)
+    assert default_session.get_credentials().method == "env"
+
+
+def test_separate_role_config_file(
+    sts_moto: None,
+    role_config_path: str,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    aws_config_path = tmp_path / "config"
+    aws_config_path.write_text("[default]\nregion = us-east-1\n")
+    monkeypatch.setenv("AWS_CONFIG_FILE", str(aws_config_path))
+    role_config = RoleConfig(role_config_path, source_session=boto3.Session(region_name="us-east-1"))
+    identity = role_config.session("spoke").client("sts").get_caller_identity()
+    assert identity["Arn"] == "arn:aws:sts::432143214321:assumed-role/spoke_role/spoke-session"
+    # botocore does not know the profiles of a separate file, so sessions have to come from RoleConfig.session
+    with pytest.raises(ProfileNotFound):
+        boto3.Session(profile_name="spoke")
+
+
+def test_invalid_config(
+    tmp_path: pathlib.Path,
+    role_config_path: str
+) -> None:
+    with pytest.raises(RoleConfigError):
+        RoleConfig(str(tmp_path / "missing.ini"))
+
+    loop_path = tmp_path / "loop.ini"
+    loop_path.write_text(
+        "[profile a]\nrole_arn = arn:aws:iam::123412341234:role/a\nsource_profile = b\n"
+        "[profile b]\nrole_arn = arn:aws:iam::123412341234:role/b\nsource_profile = a\n"
+    )
+    with pytest.raises(RoleConfigError):
+        RoleConfig(str(loop_path))
+
+    duration_path = tmp_path / "duration.ini"
+    duration_path.write_text("[profile a]\nrole_arn = arn:aws:iam::123412341234:role/a\nduration_seconds = 1h\n")
+    with pytest.raises(RoleConfigError):
+        RoleConfig(str(duration_path))
+
+    with pytest.raises(RoleConfigError):
+        RoleConfig(role_config_path).credentials("default")
+
+    with pytest.raises(ForbiddenKWArgError):
+        RoleConfig(role_config_path, target_session_kwargs={})
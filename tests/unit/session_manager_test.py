@@ -0,0 +1,121 @@
+
+import datetime
+import threading
+from typing import Any, Callable, Dict, List
+
+import boto3
+from dateutil.tz import tzlocal
+import pytest
+
+from boto3_assume import AssumeRoleSessionManager, ForbiddenKWArgError, InMemoryRefreshMetrics
+
+
+def _kwargs(account: int, session_name: str) -> Dict[str, Any]:
+    return {
+        "RoleArn": f"arn:aws:iam::{100000000000 + account}:role/my_role",
+        "RoleSessionName": session_name
+    }
+
+
+def test_sessions_are_reused(
+    sts_moto: None,
+    session_name: str,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    metrics = InMemoryRefreshMetrics()
+    manager = AssumeRoleSessionManager(source_session=sess, max_sessions=2, metrics=metrics)
+    assume_sess = manager.get(_kwargs(0, session_name))
+    assert manager.get(_kwargs(0, session_name)) is assume_sess
+    # key order does not matter
+    assert manager.get(dict(reversed(list(_kwargs(0, session_name).items())))) is assume_sess
+    assume_sess.get_credentials().get_frozen_credentials()
+    assert len(calls) == 1
+    assert metrics.sts_calls == {_kwargs(0, session_name)["RoleArn"]: 1}
+
+
+def test_lru_eviction_keeps_credentials(
+    sts_moto: None,
+    session_name: str,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    manager = AssumeRoleSessionManager(source_session=sess, max_sessions=2)
+    first_sess = manager.get(_kwargs(0, session_name))
+    access_key = first_sess.get_credentials().get_frozen_credentials().access_key
+    manager.get(_kwargs(1, session_name))
+    # use 0 so 1 is the least recently used
+    manager.get(_kwargs(0, session_name))
+    manager.get(_kwargs(2, session_name))
+    assert len(manager) == 2
+    assert manager.get(_kwargs(0, session_name)) is first_sess
+
+    manager.evict(_kwargs(0, session_name))
+    recreated_sess = manager.get(_kwargs(0, session_name))
+    assert recreated_sess is not first_sess
+    # the credentials come from the cache, not STS
+    assert recreated_sess.get_credentials().get_frozen_credentials().access_key == access_key
+    assert len(calls) == 1
+
+    manager.clear()
+    assert len(manager) == 0
+
+
+def test_expired_sessions_are_replaced(
+    sts_moto: None,
+    session_name: str
+) -> None:
+    manager = AssumeRoleSessionManager(source_session=boto3.Session(region_name="us-east-1"))
+    assume_sess = manager.get(_kwargs(0, session_name))
+    credentials = assume_sess.get_credentials()
+    credentials.get_frozen_credentials()
+    credentials._expiry_time = datetime.datetime.now(tzlocal()) - datetime.timedelta(seconds=1)
+    assert manager.get(_kwargs(0, session_name)) is not assume_sess
+
+
+def test_idle_expired_sessions_are_dropped(
+    sts_moto: None,
+    session_name: str
+) -> None:
+    manager = AssumeRoleSessionManager(source_session=boto3.Session(region_name="us-east-1"))
+    idle_sess = manager.get(_kwargs(0, session_name))
+    credentials = idle_sess.get_credentials()
+    credentials.get_frozen_credentials()
+    credentials._expiry_time = datetime.datetime.now(tzlocal()) - datetime.timedelta(seconds=1)
+    # sessions that have not been fetched yet are kept
+    unfetched_sess = manager.get(_kwargs(1, session_name))
+    assert len(manager) == 1
+    manager.get(_kwargs(2, session_name))
+    assert len(manager) == 2
+    assert manager.get(_kwargs(1, session_name)) is unfetched_sess
+
+
+def test_concurrent_get(
+    sts_moto: None,
+    session_name: str
+) -> None:
+    manager = AssumeRoleSessionManager(source_session=boto3.Session(region_name="us-east-1"), max_sessions=10)
+    barrier = threading.Barrier(20)
+    sessions = []
+
+    def worker(account: int) -> None:
+        barrier.wait()
+        sessions.append((account, manager.get(_kwargs(account, session_name))))
+
+    threads = [threading.Thread(target=worker, args=(i % 4,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(manager) == 4
+    for account, assume_sess in sessions:
+        assert manager.get(_kwargs(account, session_name)) is assume_sess
+
+
+def test_forbidden_options(sts_moto: None) -> None:
+    with pytest.raises(ForbiddenKWArgError):
+        AssumeRoleSessionManager(source_session=boto3.Session(), prefetch=True)
@@ -0,0 +1,75 @@
+
+from typing import Callable
+
+import boto3
+
+from boto3_assume import assume_role_chain
+
+
+_TARGET_SESSION_KWARGS = {"region_name": "us-east-1"}
+
+
+def test_loader_is_shared(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    sts_arn: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    source_loader = sess._session.get_component("data_loader")
+    search_paths = list(source_loader.search_paths)
+    assume_sessions = [assume_session(sess, target_session_kwargs=_TARGET_SESSION_KWARGS, share_loader=True) for _ in range(3)]
+    loader = assume_sessions[0]._session.get_component("data_loader")
+    for assume_sess in assume_sessions:
+        assert assume_sess._session.get_component("data_loader") is loader
+        assert assume_sess._loader is loader
+        assert assume_sess.client("sts").get_caller_identity()["Arn"] == sts_arn
+
+    # boto3 does not add its data path again for every session, and the source loader is left alone
+    assert loader.search_paths == search_paths
+    assert source_loader.search_paths == search_paths
+    # resources still load their models from boto3's data path
+    assert assume_sessions[0].resource("s3").meta.service_name == "s3"
+
+
+def test_loader_is_not_shared_by_default(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    assume_sess = assume_session(sess, target_session_kwargs=_TARGET_SESSION_KWARGS)
+    assert assume_sess._session.get_component("data_loader") is not sess._session.get_component("data_loader")
+
+
+def test_chain_shares_loader(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str,
+    sts_arn: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    assume_sess = assume_role_chain(
+        source_session=sess,
+        assume_role_kwargs_list=[
+            {
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            {
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            }
+        ],
+        share_loader=True
+    )
+    hop_sess = assume_role_chain(
+        source_session=sess,
+        assume_role_kwargs_list=[
+            {
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            }
+        ],
+        share_loader=True
+    )
+    assert assume_sess._session.get_component("data_loader") is hop_sess._session.get_component("data_loader")
+    assert assume_sess.client("sts").get_caller_identity()["Arn"] == sts_arn
@@ -0,0 +1,122 @@
+
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+import boto3
+import pytest
+
+from boto3_assume import assume_role
+from boto3_assume.single_flight import SingleFlight
+
+
+def _slow_assume_role(session: boto3.Session) -> None:
+    # keep the call in flight long enough for every thread to pile up behind it
+    session.events.register("before-call.sts.AssumeRole", lambda **kwargs: time.sleep(0.5))
+
+
+def _refresh_concurrently(credentials_list: List[Any], threads_per_session: int) -> List[str]:
+    barrier = threading.Barrier(len(credentials_list) * threads_per_session)
+    access_keys = []
+
+    def worker(credentials) -> None:
+        barrier.wait()
+        access_keys.append(credentials.get_frozen_credentials().access_key)
+
+    threads = [
+        threading.Thread(target=worker, args=(credentials,))
+        for credentials in credentials_list
+        for _ in range(threads_per_session)
+    ]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return access_keys
+
+
+def test_concurrent_refreshes_share_one_sts_call(
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    role_arn: str,
+    session_name: str,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    _slow_assume_role(sess)
+    credentials_list = [
+        assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            sts_client_kwargs=moto_server_sts_client_kwargs
+        ).get_credentials()
+        for _ in range(10)
+    ]
+    access_keys = _refresh_concurrently(credentials_list, threads_per_session=10)
+    assert len(access_keys) == 100
+    assert len(set(access_keys)) == 1
+    assert len(calls) == 1
+
+    # once the call completes nothing is kept, so the next refresh calls STS again
+    credentials_list[0]._frozen_credentials = None
+    credentials_list[0].get_frozen_credentials()
+    assert len(calls) == 2
+
+
+def test_different_roles_are_not_collapsed(
+    moto_server_sts_client_kwargs: Dict[str, Any],
+    session_name: str,
+    count_assume_role_calls: Callable[[boto3.Session], List[Dict[str, Any]]]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    calls = count_assume_role_calls(sess)
+    _slow_assume_role(sess)
+    credentials_list = [
+        assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": f"arn:aws:iam::10000000000{i}:role/my_role",
+                "RoleSessionName": session_name
+            },
+            sts_client_kwargs=moto_server_sts_client_kwargs
+        ).get_credentials()
+        for i in range(3)
+    ]
+    access_keys = _refresh_concurrently(credentials_list, threads_per_session=5)
+    assert len(set(access_keys)) == 3
+    assert len(calls) == 3
+
+
+def test_single_flight_error() -> None:
+    single_flight = SingleFlight()
+    calls = []
+    errors = []
+
+    def fail() -> None:
+        calls.append(None)
+        time.sleep(0.2)
+        raise ValueError("STS is down")
+
+    def worker() -> None:
+        try:
+            single_flight.do(key="a", function=fail)
+        except ValueError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(errors) == 5
+    assert len(single_flight) == 0
+    with pytest.raises(ValueError):
+        single_flight.do(key="a", function=fail)
@@ -0,0 +1,103 @@
+
+import gc
+
+import boto3
+from botocore.config import Config
+
+from boto3_assume import assume_role, STSClientPool
+from boto3_assume.utils import hashable_kwargs
+
+
+def _sts_client(assume_sess: boto3.Session):
+    return assume_sess.get_credentials()._refresh_using.__self__._sts_client
+
+
+def test_sessions_share_sts_client(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str,
+    sts_arn: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    pool = STSClientPool()
+    assume_sessions = [
+        assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            sts_client_pool=pool
+        )
+        for _ in range(3)
+    ]
+    for assume_sess in assume_sessions:
+        identity = assume_sess.client("sts").get_caller_identity()
+        assert identity['Arn'] == sts_arn
+
+    assert len(pool) == 1
+    assert len({id(_sts_client(assume_sess)) for assume_sess in assume_sessions}) == 1
+
+
+def test_different_kwargs_get_different_clients(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    pool = STSClientPool()
+    config = Config(retries={"mode": "adaptive"})
+    for sts_client_kwargs in [{}, {"region_name": "us-west-2"}, {"config": config}, {"config": config}]:
+        assume_sess = assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            sts_client_kwargs=sts_client_kwargs,
+            sts_client_pool=pool
+        )
+        _sts_client(assume_sess)
+        # keep a reference so the client stays in the pool
+        sts_client_kwargs["session"] = assume_sess
+
+    assert len(pool) == 3
+
+
+def test_clients_released_with_sessions(
+    sts_moto: None,
+    role_arn: str,
+    session_name: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    pool = STSClientPool()
+    assume_sessions = [
+        assume_role(
+            source_session=sess,
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            sts_client_pool=pool
+        )
+        for _ in range(2)
+    ]
+    for assume_sess in assume_sessions:
+        _sts_client(assume_sess)
+
+    del assume_sess
+    assert len(pool) == 1
+    assume_sessions.pop()
+    gc.collect()
+    assert len(pool) == 1
+    assume_sessions.pop()
+    gc.collect()
+    assert len(pool) == 0
+
+
+def test_hashable_kwargs() -> None:
+    config = Config()
+    assert hashable_kwargs({"b": [1, {"c": 2}], "a": config}) == hashable_kwargs({"a": config, "b": [1, {"c": 2}]})
+    assert hash(hashable_kwargs({"a": {1, 2}, "b": {"c": [3]}}))
+    assert hashable_kwargs({"config": Config(retries={"max_attempts": 2})}) == hashable_kwargs({"config": Config(retries={"max_attempts": 2})})
+    assert hashable_kwargs({"config": Config(retries={"max_attempts": 2})}) != hashable_kwargs({"config": Config()})
@@ -0,0 +1,153 @@
+
+from typing import Callable, Dict
+
+import boto3
+from botocore.config import Config
+from moto.server import ThreadedMotoServer
+import pytest
+
+from boto3_assume import assume_role, MissingKWArgError, STSEndpointSelector
+
+
+@pytest.fixture(scope="function")
+def regional_moto_servers(moto_creds: None) -> Dict[str, str]:
+    """Local moto servers standing in for the STS endpoints of different regions.
+    """
+    servers = {
+        "us-east-1": ThreadedMotoServer(port=5001),
+        "us-west-2": ThreadedMotoServer(port=5002)
+    }
+    for server in servers.values():
+        server.start()
+
+    yield {
+        "us-east-1": "http://localhost:5001",
+        "us-west-2": "http://localhost:5002",
+        # nothing listens here
+        "eu-west-1": "http://localhost:5009"
+    }
+
+    for server in servers.values():
+        server.stop()
+
+
+def _assume_refresh(assume_sess: boto3.Session):
+    return assume_sess.get_credentials()._refresh_using.__self__
+
+
+# fail fast instead of retrying unreachable endpoints
+_STS_CLIENT_KWARGS = {"config": Config(retries={"max_attempts": 0}, connect_timeout=1)}
+
+
+def test_regional_sts(
+    regional_moto_servers: Dict[str, str],
+    assume_session: Callable[..., boto3.Session],
+    sts_arn: str
+) -> None:
+    selector = STSEndpointSelector(endpoint_urls=regional_moto_servers)
+    assume_sess = assume_session(
+        sts_client_kwargs=_STS_CLIENT_KWARGS,
+        target_session_kwargs={"region_name": "us-west-2"},
+        regional_sts=True,
+        sts_endpoint_selector=selector
+    )
+    identity = assume_sess.client("sts", endpoint_url=regional_moto_servers["us-west-2"]).get_caller_identity()
+    assert identity["Arn"] == sts_arn
+    sts_clients = _assume_refresh(assume_sess)._regional_sts_clients
+    assert list(sts_clients) == ["us-west-2"]
+    assert sts_clients["us-west-2"].meta.endpoint_url == regional_moto_servers["us-west-2"]
+    assert selector.latency("us-west-2") is not None
+    assert selector.latency("us-east-1") is None
+
+
+def test_failover(
+    regional_moto_servers: Dict[str, str],
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    selector = STSEndpointSelector(endpoint_urls=regional_moto_servers)
+    assume_sess = assume_session(
+        sts_client_kwargs=_STS_CLIENT_KWARGS,
+        target_session_kwargs={"region_name": "eu-west-1"},
+        sts_failover_regions=["us-east-1"],
+        sts_endpoint_selector=selector
+    )
+    assume_sess.get_credentials().get_frozen_credentials()
+    assert selector.latency("us-east-1") is not None
+    assert selector.latency("eu-west-1") is None
+    # the failed region is tried last until its cooldown ends
+    assert selector.order(["eu-west-1", "us-east-1"]) == ["us-east-1", "eu-west-1"]
+
+
+def test_fastest_region(
+    regional_moto_servers: Dict[str, str],
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    selector = STSEndpointSelector(endpoint_urls=regional_moto_servers)
+    selector.record_success(region="us-east-1", latency=1.0)
+    selector.record_success(region="us-west-2", latency=0.05)
+    assume_sess = assume_session(
+        sts_client_kwargs=_STS_CLIENT_KWARGS,
+        target_session_kwargs={"region_name": "us-east-1"},
+        sts_failover_regions=["us-west-2"],
+        sts_endpoint_selector=selector
+    )
+    assume_sess.get_credentials().get_frozen_credentials()
+    assert list(_assume_refresh(assume_sess)._regional_sts_clients) == ["us-west-2"]
+
+
+def test_measured_primary_before_untried_failover(
+    regional_moto_servers: Dict[str, str],
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    selector = STSEndpointSelector(endpoint_urls=regional_moto_servers)
+    selector.record_success(region="us-east-1", latency=1.0)
+    assume_sess = assume_session(
+        sts_client_kwargs=_STS_CLIENT_KWARGS,
+        target_session_kwargs={"region_name": "us-east-1"},
+        sts_failover_regions=["us-west-2"],
+        sts_endpoint_selector=selector
+    )
+    assume_sess.get_credentials().get_frozen_credentials()
+    # only the healthy primary is called, the failover region is left until it is needed
+    assert list(_assume_refresh(assume_sess)._regional_sts_clients) == ["us-east-1"]
+    assert selector.latency("us-west-2") is None
+
+
+def test_selector_order() -> None:
+    selector = STSEndpointSelector(smoothing=0.5, failure_cooldown=60)
+    regions = ["us-east-1", "us-west-2", "eu-west-1"]
+    # nothing measured, keep the priority order
+    assert selector.order(regions) == regions
+    selector.record_success(region="us-east-1", latency=0.2)
+    # the measured primary stays ahead of failover regions that have not been tried yet
+    assert selector.order(regions) == regions
+    selector.record_success(region="us-west-2", latency=0.1)
+    assert selector.order(regions) == ["us-west-2", "us-east-1", "eu-west-1"]
+    selector.record_success(region="us-west-2", latency=0.5)
+    assert selector.latency("us-west-2") == pytest.approx(0.3)
+    selector.record_failure(region="eu-west-1")
+    assert selector.order(regions) == ["us-east-1", "us-west-2", "eu-west-1"]
+    assert selector.client_kwargs(region="eu-west-1", sts_client_kwargs={"endpoint_url": "http://other", "verify": False}) == {
+        "region_name": "eu-west-1",
+        "verify": False
+    }
+
+
+def test_regional_sts_needs_region(
+    moto_creds: None,
+    role_arn: str,
+    session_name: str,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("AWS_DEFAULT_REGION", raising=False)
+    monkeypatch.delenv("AWS_REGION", raising=False)
+    monkeypatch.setenv("AWS_CONFIG_FILE", "/dev/null")
+    with pytest.raises(MissingKWArgError):
+        assume_role(
+            source_session=boto3.Session(region_name="us-east-1"),
+            assume_role_kwargs={
+                "RoleArn": role_arn,
+                "RoleSessionName": session_name
+            },
+            regional_sts=True
+        )
@@ -0,0 +1,78 @@
+
+from typing import Any, Callable, Dict
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+import pytest
+
+from boto3_assume import warm, warm_sessions
+
+
+def _deny_role(session: boto3.Session, denied_role_arn: str) -> None:
+    def before_call(params: Dict[str, Any], **kwargs) -> Any:
+        if params["body"]["RoleArn"] != denied_role_arn:
+            return None
+
+        return (
+            AWSResponse(url="https://sts.amazonaws.com", status_code=403, headers={}, raw=None),
+            {
+                "Error": {"Code": "AccessDenied", "Message": "AccessDenied"},
+                "ResponseMetadata": {"HTTPStatusCode": 403}
+            }
+        )
+
+    session.events.register("before-call.sts.AssumeRole", before_call)
+
+
+def test_assume_role_prefetch(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    role_arn: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    assume_sess = assume_session(sess, prefetch=True)
+    assert assume_sess.get_credentials()._expiry_time is not None
+
+    _deny_role(sess, role_arn)
+    with pytest.raises(ClientError):
+        assume_session(sess, prefetch=True)
+
+
+def test_warm(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session],
+    role_arn: str
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    assume_sess = assume_session(sess)
+    assert warm(assume_sess) is None
+    assert assume_sess.get_credentials()._expiry_time is not None
+
+    assume_sess = assume_session(sess)
+    future = warm(assume_sess, background=True)
+    assert future.result(timeout=10) is None
+    assert assume_sess.get_credentials()._expiry_time is not None
+
+    _deny_role(sess, role_arn)
+    future = warm(assume_session(sess), background=True)
+    with pytest.raises(ClientError):
+        future.result(timeout=10)
+
+
+def test_warm_sessions(
+    sts_moto: None,
+    assume_session: Callable[..., boto3.Session]
+) -> None:
+    sess = boto3.Session(region_name="us-east-1")
+    denied_role_arn = "arn:aws:iam::100000000002:role/my_role"
+    _deny_role(sess, denied_role_arn)
+    assume_sessions = {
+        i: assume_session(sess, assume_role_kwargs={"RoleArn": f"arn:aws:iam::10000000000{i}:role/my_role"})
+        for i in range(4)
+    }
+    errors = warm_sessions(assume_sessions, max_workers=2)
+    assert list(errors) == [2]
+    assert isinstance(errors[2], ClientError)
+    for i, assume_sess in assume_sessions.items():
+        assert (assume_sess.get_credentials()._expiry_time is None) == (i == 2)